@@ -1,20 +1,24 @@
 # -*- coding: utf-8 -*-
 """狼人杀AI智能体具体实现 - 重构版本"""
 
+import asyncio
 import time
 import os
+import random
 from typing import Dict, List, Any, Optional
 from agentscope.agent import ReActAgent
 from agentscope.message import Msg
 from agentscope.formatter import DashScopeMultiAgentFormatter
-from agentscope.model import DashScopeChatModel
 
 # 导入核心组件
 from core.message_handler import MessageHandler
 from core.strategy_manager import StrategyManager
 from core.response_generator import ResponseGenerator
 from core.intelligent_responder import IntelligentResponder
+from core.model_pool import get_model_pool
+from core.deadline import Deadline
 from models.memory import MemoryManager
+from models.roster import Roster
 from utils.logger import WerewolfLogger
 
 
@@ -31,37 +35,47 @@ class PlayerAgent(ReActAgent):
     5. 动态策略切换
     """
 
-    def __init__(self, name: str):
+    def __init__(self, name: str, headless: bool = False):
         """初始化智能体
         
         Args:
             name: 智能体名称，由系统分配的固定字符串
+            headless: 无头模式，仅由规则策略驱动，不创建大模型、不输出到控制台，
+                用于大批量的本地模拟对局
         """
         # 基础属性
         self.name = name
+        self.headless = headless
         
         # 初始化系统提示词
         system_prompt = self._build_system_prompt()
         
-        # 初始化模型
-        model = DashScopeChatModel(
-            api_key=os.environ.get("DASHSCOPE_API_KEY"),
-            model_name="qwen-max",
-        )
+        # 初始化模型（无头模式下不创建模型）
+        # 模型实例由进程内的模型池共享，智能体只持有轻量句柄
+        model = None
+        formatter = None
+        if not headless:
+            model = get_model_pool().get_model(
+                "qwen-max",
+                api_key=os.environ.get("DASHSCOPE_API_KEY"),
+            )
+            formatter = DashScopeMultiAgentFormatter()
         
         # 初始化ReActAgent父类
         super().__init__(
             name=name,
             sys_prompt=system_prompt,
             model=model,
-            formatter=DashScopeMultiAgentFormatter(),
+            formatter=formatter,
         )
         
-        # 初始化核心组件
-        self.message_handler = MessageHandler(name)
-        self.strategy_manager = StrategyManager(name)
-        self.response_generator = ResponseGenerator(name, model)
+        # 初始化核心组件，存活名册由消息处理器维护，策略和记忆共用
+        self.roster = Roster()
+        self.message_handler = MessageHandler(name, roster=self.roster)
+        self.strategy_manager = StrategyManager(name, roster=self.roster)
         self.memory_manager = MemoryManager()
+        # 上次同步到记忆和策略时的（名册版本, 策略）
+        self._roster_synced: Optional[tuple] = None
         self.logger = WerewolfLogger(name)
         
         # 初始化智能响应器（集成策略系统）
@@ -76,6 +90,28 @@ class PlayerAgent(ReActAgent):
         # 游戏状态
         self.current_round = 0
         self.reflection_log = []
+        
+        # 每次__call__的耗时记录（秒），用于对局统计
+        self.call_latencies: List[float] = []
+        
+        # 预先起草的发言（起草时的决策依据, 发言）
+        self._speech_draft: Optional[tuple] = None
+        
+        # observe排入的分析，由按需启动的后台任务依次处理
+        self._analysis_queue: asyncio.Queue = asyncio.Queue()
+        self._analysis_worker: Optional[asyncio.Task] = None
+        
+        # 无头模式：关闭控制台输出，只保留错误日志
+        if headless:
+            self.set_console_output_enabled(False)
+            self.logger.set_level("ERROR")
+        else:
+            self.logger.set_level("INFO")
+    
+    @property
+    def response_generator(self) -> ResponseGenerator:
+        """响应生成器，与智能响应器共用，首次使用时才创建"""
+        return self.intelligent_responder.response_generator
 
     def _build_system_prompt(self) -> str:
         """构建系统提示词"""
@@ -86,6 +122,7 @@ class PlayerAgent(ReActAgent):
 
 # 游戏规则
 - 9人局配置：3狼人、3村民、1先知、1女巫、1猎人
+- 其他人数（6/12/15/18人局）：约三分之一为狼人，先知、女巫、猎人各1名，其余为村民
 - 狼人阵营：夜晚杀人，白天隐藏身份
 - 好人阵营：找出并投票淘汰狼人
 - 游戏流程：夜晚行动 → 白天讨论 → 投票淘汰
@@ -142,6 +179,11 @@ class PlayerAgent(ReActAgent):
         - 更新智能体内部状态
         - 支持跨局学习和记忆管理
         
+        这里只做必要的部分：解析消息更新名册和角色，把消息记入对话历史，
+        更新玩家状态和轮次。更新发言者画像、记录投票、同步策略观察、
+        刷新决策候选等分析排入本智能体的分析队列，由后台任务处理，广播
+        不必等待分析完成；__call__开始时等待此前排入的分析完成。
+        
         Args:
             msg: 来自游戏环境的消息或消息列表
         """
@@ -149,7 +191,12 @@ class PlayerAgent(ReActAgent):
             if msg is None:
                 return
             
-            # 使用MessageHandler处理消息
+            # 任何新消息都使缓存的决策不再命中
+            self.intelligent_responder.decision_cache.record(
+                msg if isinstance(msg, list) else [msg]
+            )
+            
+            # 使用MessageHandler处理消息，同时更新存活名册
             parsed_info = self.message_handler.process_message(msg)
             
             # 处理角色分配
@@ -160,16 +207,26 @@ class PlayerAgent(ReActAgent):
                 # 设置策略
                 self.strategy_manager.set_role(role)
             
-            # 更新记忆管理器
+            # 更新记忆管理器：同一轮次的消息一次性写入对话历史，
+            # 发言者画像的更新交给后台分析。批量到达的消息中每遇到一次入夜，
+            # 其后的消息属于下一轮
+            round_num = self.current_round
+            conversations = []
+            profile_actions = []
             for msg_data in parsed_info['messages']:
-                sender = msg_data['sender']
-                content = msg_data['content']
-                
-                # 添加到对话历史
-                self.memory_manager.add_conversation(
-                    speaker=sender,
-                    content=content,
-                    round_num=self.current_round
+                conversations.append({
+                    'speaker': msg_data['sender'],
+                    'content': msg_data['content']
+                })
+                if msg_data['phase_change'] == 'night':
+                    profile_actions.append(
+                        self.memory_manager.record_conversations(conversations, round_num)
+                    )
+                    conversations = []
+                    round_num += 1
+            if conversations:
+                profile_actions.append(
+                    self.memory_manager.record_conversations(conversations, round_num)
                 )
             
             # 处理死亡信息
@@ -184,15 +241,117 @@ class PlayerAgent(ReActAgent):
             
             # 更新游戏轮次
             if parsed_info['phase_change']:
-                phase = parsed_info['phase_change']
-                self.logger.debug(f"阶段变化: {phase}")
-                if phase == 'night':
-                    self.current_round += 1
+                self.logger.debug(f"阶段变化: {parsed_info['phase_change']}")
+            self.current_round = round_num
+            
+            self._queue_analysis((msg, profile_actions))
             
         except Exception as e:
             # 记录错误但不中断游戏
             self.logger.error(f"observe错误: {e}")
+    
+    def _analyze(self, msg, profile_actions: list) -> None:
+        """分析一次observe收到的消息：更新发言者画像，记录投票矩阵，
+        把名册和角色的变化同步到记忆和当前策略，并刷新决策候选"""
+        try:
+            # 每个阶段中每个发言者的画像只更新一次
+            for actions_by_speaker in profile_actions:
+                self.memory_manager.update_profiles(actions_by_speaker)
+            
+            # 记录投票矩阵（主持人在投票结果消息中附带）
+            if self.strategy_manager.has_strategy():
+                strategy = self.strategy_manager.get_current_strategy()
+                for m in msg if isinstance(msg, list) else [msg]:
+                    vote_result = (getattr(m, 'metadata', None) or {}).get('vote_result')
+                    if vote_result:
+                        strategy.record_votes(
+                            vote_result['voters'],
+                            vote_result['targets'],
+                            vote_result['matrix']
+                        )
+            
+            # 名册或角色变化后，同步到记忆和当前策略
+            self._sync_roster()
+            
+            # 在回合之间刷新决策候选，__call__中只需查表
+            self.intelligent_responder.refresh_candidates()
+            
+        except Exception as e:
+            # 记录错误但不中断游戏
+            self.logger.error(f"observe分析错误: {e}")
+    
+    def _queue_analysis(self, item) -> None:
+        """把一项分析或一个屏障排入分析队列，必要时启动后台任务
+        
+        后台任务处理完队列后即退出，下次排入时再启动，不会在对局结束后
+        留下挂起的任务。后台任务属于启动它的事件循环；换了事件循环（例如
+        又一次asyncio.run）时，先同步处理旧循环中没来得及处理的分析。
+        
+        Args:
+            item: observe收到的消息及其发言行动，或者屏障（Future）
+        """
+        loop = asyncio.get_running_loop()
+        worker = self._analysis_worker
+        if worker is not None and worker.get_loop() is not loop:
+            self.drain_analysis()
+            worker = None
+        self._analysis_queue.put_nowait(item)
+        if worker is None or worker.done():
+            self._analysis_worker = loop.create_task(self._run_analysis())
+    
+    async def _run_analysis(self) -> None:
+        """后台任务：按到达顺序处理分析队列，遇到屏障时通知等待方，
+        每项之间让出事件循环"""
+        queue = self._analysis_queue
+        while not queue.empty():
+            self._process_analysis(queue.get_nowait())
+            await asyncio.sleep(0)
+    
+    def _process_analysis(self, item) -> None:
+        """处理分析队列中的一项"""
+        if isinstance(item, asyncio.Future):
+            if not item.done():
+                item.set_result(None)
+        else:
+            self._analyze(*item)
+    
+    async def wait_for_analysis(self) -> None:
+        """等待此前排入的分析全部完成
+        
+        在队尾放一个屏障，后台任务处理到屏障时此前的分析都已完成；
+        之后才排入的分析不必等待。
+        """
+        if self._analysis_queue.empty():
+            return
+        fence = asyncio.get_running_loop().create_future()
+        self._queue_analysis(fence)
+        await fence
+    
+    def drain_analysis(self) -> None:
+        """在当前调用中同步处理分析队列中剩下的分析
+        
+        用于保存、加载状态等不能等待后台任务的场合。
+        """
+        queue = self._analysis_queue
+        while not queue.empty():
+            self._process_analysis(queue.get_nowait())
 
+    def _sync_roster(self) -> None:
+        """把存活名册同步到记忆，并把最新的游戏观察交给当前策略"""
+        strategy = self.strategy_manager.get_current_strategy()
+        synced = (self.roster.revision, id(strategy))
+        if synced == self._roster_synced:
+            return
+        
+        if self._roster_synced is None or self._roster_synced[0] != self.roster.revision:
+            self.memory_manager.update_game_state({
+                'alive_players': self.roster.alive_players,
+                'dead_players': self.roster.dead_players
+            })
+        if strategy is not None:
+            self.intelligent_responder.update_strategy_observation()
+        self._roster_synced = synced
+    
     async def __call__(self, msg: Optional[Msg] = None, **kwargs) -> Msg:
         """处理消息并生成响应（策略集成版）
         
@@ -211,8 +370,15 @@ class PlayerAgent(ReActAgent):
         start_time = time.time()
         MAX_TIME = 30
         MAX_CHARS = 2048
+        SAFETY_MARGIN = 2
+        
+        # 整个调用链共享的截止时间，预留收尾的安全边际
+        deadline = Deadline(MAX_TIME - SAFETY_MARGIN)
         
         try:
+            # 先等此前收到的消息分析完成，决策基于完整的状态
+            await self.wait_for_analysis()
+            
             # 提取参数
             structured_model = kwargs.get('structured_model')
             
@@ -229,21 +395,35 @@ class PlayerAgent(ReActAgent):
             if msg is None and structured_model:
                 msg = Msg(name="System", content="", role="user")
             
-            # 使用智能响应器生成响应（集成策略系统）
-            response = await self.intelligent_responder.generate_intelligent_response(
-                msg=msg,
-                structured_model=structured_model
-            )
-            
-            # 检查响应时间
-            elapsed = time.time() - start_time
-            if elapsed > MAX_TIME:
-                self.logger.warning(f"响应超时({elapsed:.2f}s)")
-                return Msg(
+            # 普通发言优先采用预先起草的发言，否则用智能响应器生成（集成策略系统）；
+            # 已过期的草稿仍可作为超时时的备用发言。智能响应器的截止时间提前1秒，
+            # 使其先于这里超时并返回它自己的备用答案
+            draft, fresh = self._take_speech_draft() if structured_model is None else (None, False)
+            if fresh and self._is_new_speech(msg):
+                # 草稿起草时还没有前一位玩家的发言，按它修订草稿
+                response = await self.intelligent_responder.revise_speech(
+                    msg,
+                    draft,
+                    deadline=deadline.shrink(1)
+                )
+            elif fresh:
+                response = draft
+            else:
+                fallback = draft or Msg(
                     name=self.name,
                     content="思考超时，暂时跳过。",
                     role="assistant"
                 )
+                response = await deadline.run(
+                    self.intelligent_responder.generate_intelligent_response(
+                        msg=msg,
+                        structured_model=structured_model,
+                        deadline=deadline.shrink(1)
+                    ),
+                    fallback
+                )
+                if deadline.timed_out:
+                    self.logger.warning(f"响应超时({time.time() - start_time:.2f}s)，使用备用答案")
             
             # 检查响应长度
             if response and response.content and len(response.content) > MAX_CHARS:
@@ -262,7 +442,73 @@ class PlayerAgent(ReActAgent):
                 content="遇到问题，需要重新评估。",
                 role="assistant"
             )
+        finally:
+            self._speech_draft = None
+            self.call_latencies.append(time.time() - start_time)
+    
+    async def draft_speech(self) -> None:
+        """在前一位玩家发言期间预先起草自己的发言
+        
+        白天讨论的流水线模式下由游戏调用，草稿基于当前已知的信息生成。
+        轮到自己发言时，如果决策依据的状态（策略、名册、阶段）没有变化，
+        草稿按前一位玩家的发言修订后作为发言；否则丢弃草稿，重新生成。
+        """
+        self._speech_draft = None
+        if not self.strategy_manager.has_strategy():
+            return
+        await self.wait_for_analysis()
+        basis = self._speech_basis()
+        draft = await self.intelligent_responder.generate_intelligent_response(msg=None)
+        self._speech_draft = (basis, draft)
     
+    def _speech_basis(self) -> tuple:
+        """发言所依据的状态：当前策略及其版本、存活名册的版本、阶段和轮次
+        
+        其他玩家的发言只写入对话历史，不改变这些状态，广播的发言不会使草稿失效。
+        """
+        strategy = self.strategy_manager.get_current_strategy()
+        game_state = self.message_handler.game_state
+        return (
+            id(strategy),
+            getattr(strategy, 'revision', None),
+            self.roster.revision,
+            game_state.get('phase'),
+            game_state.get('round'),
+        )
+    
+    def _is_new_speech(self, msg: Optional[Msg]) -> bool:
+        """msg是否是草稿起草时还没有的、其他玩家的发言"""
+        return (
+            isinstance(msg, Msg)
+            and msg.name != self.name
+            and isinstance(msg.content, str)
+            and bool(msg.content.strip())
+        )
+    
+    def _take_speech_draft(self) -> tuple:
+        """取出发言草稿
+        
+        Returns:
+            (草稿, 是否仍然有效)，没有草稿时为(None, False)
+        """
+        if self._speech_draft is None:
+            return None, False
+        basis, draft = self._speech_draft
+        self._speech_draft = None
+        if basis != self._speech_basis():
+            self.logger.debug("发言草稿已过期，重新生成")
+            return draft, False
+        return draft, True
+    
+    def set_rng(self, rng: random.Random) -> None:
+        """设置本局使用的随机数生成器
+        
+        由游戏在开局时按种子派生并注入，使规则策略的所有随机选择可复现。
+        
+        Args:
+            rng: 随机数生成器
+        """
+        self.strategy_manager.set_rng(rng)
 
     def state_dict(self) -> dict:
         """保存智能体状态（重构版 - 完整的跨局学习支持）
@@ -274,6 +520,7 @@ class PlayerAgent(ReActAgent):
         Returns:
             dict: 包含智能体完整状态的字典
         """
+        self.drain_analysis()
         state = {
             'name': self.name,
             'current_round': self.current_round,
@@ -312,6 +559,9 @@ class PlayerAgent(ReActAgent):
             return
         
         try:
+            # 排队的分析基于加载前的状态，先处理完，避免覆盖加载的状态
+            self.drain_analysis()
+            
             self.name = state.get('name', self.name)
             self.current_round = state.get('current_round', 0)
             self.reflection_log = state.get('reflection_log', [])
@@ -326,10 +576,14 @@ class PlayerAgent(ReActAgent):
                 self.memory_manager.import_memory(state['memory'])
                 self.logger.info("记忆管理器状态已恢复")
             
+            # 缓存的决策基于加载前的状态，不再有效
+            self.intelligent_responder.decision_cache.clear()
+            
             # 恢复游戏状态
             if 'game_state' in state and self.message_handler:
                 game_state = state['game_state']
-                self.message_handler.game_state.update(game_state)
+                self.message_handler.load_game_state(game_state)
+                self._sync_roster()
                 self.logger.info("游戏状态已恢复")
             
             games_played = state.get('games_played', 0)
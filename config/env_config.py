@@ -20,8 +20,3 @@ def load_env_config():
     # 设置模型参数
     os.environ.setdefault("MODEL_TEMPERATURE", "0.7")
     os.environ.setdefault("MODEL_MAX_TOKENS", "2048")
-
-
-# 自动加载
-load_env_config()
-
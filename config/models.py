@@ -8,26 +8,42 @@
 """
 
 import os
-import yaml
+import logging
 from pathlib import Path
-
-# 加载.env文件
-try:
-    from dotenv import load_dotenv
-    # 查找项目根目录的.env文件
-    env_path = Path(__file__).parent.parent / '.env'
-    if env_path.exists():
-        load_dotenv(env_path)
-        print(f"[INFO] 已从 {env_path} 加载环境变量")
-except ImportError:
-    print("[WARNING] python-dotenv未安装，无法加载.env文件")
-from typing import Dict, Any, Optional, Union
+from typing import Dict, Any, Optional, Union, TYPE_CHECKING
 from dataclasses import dataclass, field
 from agentscope.model import (
     DashScopeChatModel,
     ChatModelBase
 )
-from services.llm import LLMClient, LLMProvider
+
+if TYPE_CHECKING:
+    from services.llm import LLMClient
+
+logger = logging.getLogger(__name__)
+
+_dotenv_loaded = False
+
+
+def load_dotenv_file() -> None:
+    """加载项目根目录的.env文件（只加载一次）
+    
+    导入本模块时不再有任何副作用，.env在首次需要读取配置时才加载。
+    """
+    global _dotenv_loaded
+    if _dotenv_loaded:
+        return
+    _dotenv_loaded = True
+    try:
+        from dotenv import load_dotenv
+    except ImportError:
+        logger.warning("python-dotenv未安装，无法加载.env文件")
+        return
+    # 查找项目根目录的.env文件
+    env_path = Path(__file__).parent.parent / '.env'
+    if env_path.exists():
+        load_dotenv(env_path)
+        logger.info("已从 %s 加载环境变量", env_path)
 
 
 @dataclass
@@ -64,6 +80,7 @@ class EnhancedModelConfig:
         Returns:
             EnhancedModelConfig 实例
         """
+        load_dotenv_file()
         if provider == "dashscope":
             api_key = os.getenv("DASHSCOPE_API_KEY", "")
             if model_name is None:
@@ -107,12 +124,13 @@ class EnhancedModelConfig:
             generate_kwargs=generate_kwargs,
         )
     
-    def to_llm_client(self) -> LLMClient:
+    def to_llm_client(self) -> "LLMClient":
         """转换为LLM客户端
         
         Returns:
             配置好的LLMClient实例
         """
+        from services.llm import LLMClient
         return LLMClient(self)
 
 
@@ -126,6 +144,7 @@ class ModelConfig:
         Args:
             config_path: 配置文件路径
         """
+        load_dotenv_file()
         self.config_path = config_path
         self.config = self._load_config()
         self.current_model = None
@@ -134,6 +153,7 @@ class ModelConfig:
     def _load_config(self) -> Dict[str, Any]:
         """加载配置文件"""
         try:
+            import yaml
             with open(self.config_path, 'r', encoding='utf-8') as f:
                 config = yaml.safe_load(f)
             
@@ -289,6 +309,7 @@ class ModelConfig:
     def _save_config(self) -> None:
         """保存配置到文件"""
         try:
+            import yaml
             with open(self.config_path, 'w', encoding='utf-8') as f:
                 yaml.dump(self.config, f, default_flow_style=False, allow_unicode=True)
         except Exception as e:
@@ -315,8 +336,23 @@ class ModelConfig:
         self._save_config()
 
 
-# 全局模型配置实例
-model_config = ModelConfig()
+# 全局模型配置实例，首次访问model_config时才创建（读取YAML）
+_model_config: Optional[ModelConfig] = None
+
+
+def get_model_config() -> ModelConfig:
+    """获取全局模型配置实例"""
+    global _model_config
+    if _model_config is None:
+        _model_config = ModelConfig()
+    return _model_config
+
+
+def __getattr__(name: str) -> Any:
+    """兼容旧的模块属性model_config"""
+    if name == "model_config":
+        return get_model_config()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def get_model(model_name: Optional[str] = None) -> ChatModelBase:
@@ -329,17 +365,17 @@ def get_model(model_name: Optional[str] = None) -> ChatModelBase:
     Returns:
         模型实例
     """
-    return model_config.create_model(model_name)
+    return get_model_config().create_model(model_name)
 
 
 def get_current_model() -> Optional[ChatModelBase]:
     """获取当前模型实例的便捷函数"""
-    return model_config.get_current_model()
+    return get_model_config().get_current_model()
 
 
 def get_current_model_type() -> Optional[str]:
     """获取当前模型类型的便捷函数"""
-    return model_config.model_type
+    return get_model_config().model_type
 
 
 def set_default_model(model_name: str) -> None:
@@ -349,12 +385,12 @@ def set_default_model(model_name: str) -> None:
     Args:
         model_name: 模型名称
     """
-    model_config.set_default_model(model_name)
+    get_model_config().set_default_model(model_name)
 
 
 def list_available_models() -> list:
     """列出所有可用模型的便捷函数"""
-    return model_config.list_available_models()
+    return get_model_config().list_available_models()
 
 
 def update_model_config(model_name: str, config: Dict[str, Any]) -> None:
@@ -365,7 +401,7 @@ def update_model_config(model_name: str, config: Dict[str, Any]) -> None:
         model_name: 模型名称
         config: 新的配置
     """
-    model_config.update_model_config(model_name, config)
+    get_model_config().update_model_config(model_name, config)
 
 
 # ==================== 新的LLM客户端接口 ====================
@@ -374,7 +410,7 @@ def create_llm_client(
     provider: str = "dashscope",
     model_name: str = None,
     from_env: bool = True
-) -> LLMClient:
+) -> "LLMClient":
     """创建LLM客户端（推荐使用）
     
     Args:
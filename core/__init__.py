@@ -1,15 +1,47 @@
 # -*- coding: utf-8 -*-
-"""核心管理模块"""
+"""核心管理模块
 
-from .strategy_manager import StrategyManager
-from .message_handler import MessageHandler
-from .response_generator import ResponseGenerator
-from .intelligent_responder import IntelligentResponder
+子模块在首次访问时才导入，导入其中一个组件不会连带加载其余组件。
+"""
+
+import importlib
+
+_LAZY_ATTRS = {
+    'StrategyManager': '.strategy_manager',
+    'MessageHandler': '.message_handler',
+    'ResponseGenerator': '.response_generator',
+    'IntelligentResponder': '.intelligent_responder',
+    'ModelPool': '.model_pool',
+    'ModelHandle': '.model_pool',
+    'get_model_pool': '.model_pool',
+    'Deadline': '.deadline',
+    'EscalationPolicy': '.escalation',
+    'DecisionCandidates': '.decision_candidates',
+    'DecisionCache': '.decision_cache',
+    'ModeratorDecoder': '.moderator_decoder',
+    'ModeratorEvent': '.moderator_decoder',
+}
 
 __all__ = [
     'StrategyManager',
     'MessageHandler', 
     'ResponseGenerator',
-    'IntelligentResponder'
+    'IntelligentResponder',
+    'ModelPool',
+    'ModelHandle',
+    'get_model_pool',
+    'Deadline',
+    'EscalationPolicy',
+    'DecisionCandidates',
+    'DecisionCache',
+    'ModeratorDecoder',
+    'ModeratorEvent'
 ]
 
+
+def __getattr__(name: str):
+    """按需导入核心组件"""
+    if name in _LAZY_ATTRS:
+        module = importlib.import_module(_LAZY_ATTRS[name], __name__)
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
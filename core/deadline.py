@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""响应截止时间 - 在调用链中逐层传递的时间预算
+
+赛题要求每次__call__在30秒内返回。PlayerAgent在调用开始时创建一个
+Deadline，逐层传给IntelligentResponder和ResponseGenerator。每一层都先
+准备好一个当前最佳的备用答案，再在剩余时间内运行耗时的工作；
+超时后正在进行的工作（例如模型调用）被取消，直接返回备用答案，
+从而保证响应一定在预算内返回。
+"""
+
+import asyncio
+import inspect
+import time
+from typing import Awaitable, Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class Deadline:
+    """截止时间 - 记录一次响应剩余的时间预算"""
+
+    def __init__(
+        self,
+        budget: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """初始化截止时间
+
+        Args:
+            budget: 从现在起的时间预算（秒）
+            clock: 单调时钟，便于测试时替换
+        """
+        self.clock = clock
+        self.expires_at = clock() + budget
+        # 是否有工作因超时被取消（包括由它派生的截止时间下的工作）
+        self.timed_out = False
+        # 派生出本截止时间的上层截止时间，超时向上报告
+        self._parent: Optional["Deadline"] = None
+
+    def remaining(self) -> float:
+        """剩余时间（秒），不小于0"""
+        return max(0.0, self.expires_at - self.clock())
+
+    @property
+    def expired(self) -> bool:
+        """是否已经到期"""
+        return self.remaining() <= 0
+
+    def shrink(self, margin: float) -> "Deadline":
+        """派生一个提前margin秒到期的截止时间，为本层的收尾工作预留时间
+
+        派生的截止时间下的工作超时时，本截止时间也记为超时，上层据此
+        知道拿到的是备用答案。
+
+        Args:
+            margin: 提前的秒数
+
+        Returns:
+            新的截止时间
+        """
+        child = Deadline(0, self.clock)
+        child.expires_at = self.expires_at - margin
+        child._parent = self
+        return child
+
+    def _mark_timed_out(self) -> None:
+        """记为超时，并逐层报告给上层截止时间"""
+        deadline = self
+        while deadline is not None:
+            deadline.timed_out = True
+            deadline = deadline._parent
+
+    async def run(
+        self,
+        awaitable: Awaitable[T],
+        fallback: Optional[T] = None,
+    ) -> Optional[T]:
+        """在剩余时间内运行工作，超时则取消并返回备用答案
+
+        Args:
+            awaitable: 要运行的协程
+            fallback: 超时时返回的备用答案
+
+        Returns:
+            工作的结果，超时时为备用答案
+        """
+        remaining = self.remaining()
+        if remaining <= 0:
+            # 已经没有时间，协程不再运行
+            if inspect.iscoroutine(awaitable):
+                awaitable.close()
+            self._mark_timed_out()
+            return fallback
+
+        try:
+            return await asyncio.wait_for(awaitable, remaining)
+        except asyncio.TimeoutError:
+            self._mark_timed_out()
+            return fallback
+
+    def __repr__(self) -> str:
+        return f"Deadline(remaining={self.remaining():.3f}s)"
+
+
+def ensure_deadline(
+    deadline: Optional[Deadline],
+    budget: float,
+) -> Deadline:
+    """调用方未传入截止时间时，按默认预算新建一个"""
+    return deadline if deadline is not None else Deadline(budget)
+
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+"""决策缓存 - 按游戏状态指纹记忆结构化决策
+
+主持人的重复提问（重新提示、猎人的重复询问、狼人讨论中没有新信息的
+后续发言轮次）原本每次都重新计算完整决策，结果还可能前后不一致。
+DecisionCache为每个智能体维护一个游戏状态指纹（角色、轮次、存活玩家、
+已接收事件的哈希），并以指纹加结构化模型、提问内容为键，在一个小的
+LRU缓存中记住决策。没有新信息的重复提问直接返回同一个决策。
+"""
+
+from collections import OrderedDict
+from typing import Hashable, List, Optional, Sequence
+
+from agentscope.message import Msg
+
+
+class DecisionCache:
+    """决策缓存 - 以游戏状态指纹为键的LRU缓存"""
+
+    def __init__(self, maxsize: int = 32):
+        """初始化决策缓存
+
+        Args:
+            maxsize: 最多缓存的决策数
+        """
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Hashable, Msg]" = OrderedDict()
+        # 已接收事件的累积哈希，每条新消息都会改变它
+        self.events_digest = 0
+
+        # 统计
+        self.hits = 0
+        self.misses = 0
+
+    def record(self, msgs: Sequence[Msg]) -> None:
+        """把新接收的消息计入事件哈希
+
+        Args:
+            msgs: 新接收的消息
+        """
+        digest = self.events_digest
+        for msg in msgs:
+            digest = hash((digest, msg.name, str(msg.content)))
+        self.events_digest = digest
+
+    def key(
+        self,
+        role: Optional[str],
+        round_num: int,
+        alive_players: List[str],
+        structured_model: type,
+        msg: Optional[Msg],
+    ) -> Hashable:
+        """当前游戏状态下一次提问的缓存键
+
+        Args:
+            role: 当前角色
+            round_num: 当前轮次
+            alive_players: 存活玩家
+            structured_model: 结构化模型
+            msg: 提问消息
+
+        Returns:
+            缓存键
+        """
+        question = str(msg.content) if msg is not None else None
+        return (
+            role,
+            round_num,
+            frozenset(alive_players),
+            self.events_digest,
+            structured_model,
+            question,
+        )
+
+    def get(self, key: Hashable) -> Optional[Msg]:
+        """取出缓存的决策，返回一个新的消息副本
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            决策消息，未命中时为None
+        """
+        cached = self._entries.get(key)
+        if cached is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return self._copy(cached)
+
+    def put(self, key: Hashable, response: Msg) -> None:
+        """缓存一个决策
+
+        Args:
+            key: 缓存键
+            response: 决策消息
+        """
+        self._entries[key] = self._copy(response)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """清空缓存，例如加载了新的状态之后"""
+        self._entries.clear()
+
+    @staticmethod
+    def _copy(msg: Msg) -> Msg:
+        """复制决策消息，调用方修改返回的消息不会影响缓存"""
+        return Msg(
+            name=msg.name,
+            content=msg.content,
+            role=msg.role,
+            metadata=dict(msg.metadata) if msg.metadata is not None else None,
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
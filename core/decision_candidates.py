@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+"""决策候选 - 在observe中增量维护的各类行动候选排序
+
+投票、查验、毒人、开枪等决策所需的可疑度排序和思维链原本都在__call__中
+现算，而__call__是受30秒限制的关键路径。DecisionCandidates在每次observe
+之后（回合之间，不计入响应时间）刷新这些排序，__call__中的各个处理函数
+只需查表，并做最后一次校验：如果刷新之后策略或记忆又发生了变化，
+则当场重新计算，保证结果与现算一致。
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+from models.chain_of_thought import ChainOfThought, ChainOfThoughtBuilder
+from models.memory import MemoryManager
+from models.reasoning import GameObservation
+
+
+class DecisionCandidates:
+    """决策候选 - 当前局势下各类行动的候选排序"""
+
+    # 投票思维链中使用的最近事件数
+    RECENT_EVENTS = 5
+
+    def __init__(self, agent_name: str):
+        self.agent_name = agent_name
+        self._key: Optional[tuple] = None
+
+        # 存活玩家的可疑度和信任度（仅含有玩家信息的玩家）
+        self.suspicion: Dict[str, float] = {}
+        self.trust: Dict[str, float] = {}
+
+        # 最可疑的其他存活玩家及其可疑度（毒人、开枪的候选）
+        self.most_suspicious: Optional[str] = None
+        self.max_suspicion = 0.0
+
+        # 先知：已查验的玩家和优先查验目标
+        self.checked_players: List[str] = []
+        self.check_targets: List[str] = []
+
+        # 预先构建的思维链
+        self.vote_cot: Optional[ChainOfThought] = None
+        self.check_cot: Optional[ChainOfThought] = None
+
+        # 刷新次数，用于统计
+        self.n_refreshes = 0
+
+    def _make_key(
+        self,
+        role: str,
+        strategy,
+        observation: GameObservation,
+        memory_manager: MemoryManager,
+    ) -> Tuple:
+        """候选所依赖的状态的版本"""
+        return (
+            role,
+            id(strategy),
+            strategy.revision,
+            memory_manager.revision,
+            tuple(observation.alive_players),
+        )
+
+    def is_current(
+        self,
+        role: str,
+        strategy,
+        observation: GameObservation,
+        memory_manager: MemoryManager,
+    ) -> bool:
+        """候选是否仍与当前状态一致"""
+        return self._key == self._make_key(role, strategy, observation, memory_manager)
+
+    def ensure_current(
+        self,
+        role: str,
+        strategy,
+        observation: GameObservation,
+        memory_manager: MemoryManager,
+    ) -> "DecisionCandidates":
+        """返回与当前状态一致的候选，必要时当场刷新"""
+        if not self.is_current(role, strategy, observation, memory_manager):
+            self.refresh(role, strategy, observation, memory_manager)
+        return self
+
+    def refresh(
+        self,
+        role: str,
+        strategy,
+        observation: GameObservation,
+        memory_manager: MemoryManager,
+    ) -> None:
+        """按当前的策略和记忆重新计算全部候选
+
+        Args:
+            role: 当前角色
+            strategy: 当前角色的策略
+            observation: 当前游戏观察
+            memory_manager: 记忆管理器
+        """
+        alive_players = observation.alive_players
+
+        suspicion = {}
+        trust = {}
+        for player in alive_players:
+            player_info = strategy.get_player_info(player)
+            if player_info:
+                suspicion[player] = player_info.suspicion_level
+                trust[player] = player_info.trust_score
+        self.suspicion = suspicion
+        self.trust = trust
+
+        # 最可疑的其他玩家，同分时取先出现者
+        self.most_suspicious = None
+        self.max_suspicion = 0.0
+        for player, level in suspicion.items():
+            if player != self.agent_name and level > self.max_suspicion:
+                self.most_suspicious = player
+                self.max_suspicion = level
+
+        # 投票思维链
+        recent_conversations = memory_manager.get_recent_conversations(self.RECENT_EVENTS)
+        recent_events = [conv.get('content', '')[:30] for conv in recent_conversations]
+        self.vote_cot = ChainOfThoughtBuilder.build_voting_cot(
+            my_role=role,
+            alive_players=alive_players,
+            suspected_players=suspicion,
+            trusted_players=trust,
+            recent_events=recent_events
+        )
+
+        # 先知的查验候选：最可疑的未查验玩家
+        self.checked_players = list(strategy.strategy_state.get('checked_players', []))
+        self.check_targets = []
+        self.check_cot = None
+        if role == 'seer':
+            # 先知不查验自己
+            others = [p for p in alive_players if p != self.agent_name]
+            unchecked = [p for p in others if p not in self.checked_players]
+            self.check_targets = sorted(
+                unchecked,
+                key=lambda p: suspicion.get(p, 0.3),
+                reverse=True
+            )[:3]
+            self.check_cot = ChainOfThoughtBuilder.build_seer_check_cot(
+                checked_players=self.checked_players,
+                alive_players=others,
+                suspected_players=suspicion,
+                priority_targets=self.check_targets
+            )
+
+        self._key = self._make_key(role, strategy, observation, memory_manager)
+        self.n_refreshes += 1
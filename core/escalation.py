@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""升级策略 - 决定何时把规则策略的决策交给大模型
+
+规则策略的每个决策都带有置信度（ActionDecision.confidence）。置信度
+达到该行动类型的阈值时直接采用规则答案；低于阈值、且剩余时间足够一次
+模型调用时，才升级为大模型决策，规则答案作为模型超时或出错时的备用答案。
+这样模型的延迟和token只花在可能改变结果的决策上。
+"""
+
+import os
+from typing import Dict, Optional
+
+from core.deadline import Deadline
+from models.reasoning import ActionType
+
+# 各行动类型的默认阈值：置信度低于阈值时升级。
+# 发言没有置信度（按0计），阈值为0即默认不升级
+DEFAULT_THRESHOLDS: Dict[str, float] = {
+    ActionType.SPEAK.value: 0.0,
+    ActionType.VOTE.value: 0.5,
+    ActionType.KILL.value: 0.5,
+    ActionType.CHECK.value: 0.5,
+    ActionType.HEAL.value: 0.6,
+    ActionType.POISON.value: 0.7,
+    ActionType.SHOOT.value: 0.7,
+}
+
+# 升级所需的最少剩余时间（秒），不足时直接采用规则答案
+DEFAULT_MIN_BUDGET = 8.0
+
+
+def parse_thresholds(spec: str) -> Dict[str, float]:
+    """解析阈值配置，格式如 "vote=0.6,poison=0.8"
+
+    Args:
+        spec: 阈值配置字符串
+
+    Returns:
+        行动类型到阈值的字典
+    """
+    thresholds = {}
+    for item in spec.split(','):
+        if '=' not in item:
+            continue
+        action, value = item.split('=', 1)
+        action = action.strip()
+        if action not in DEFAULT_THRESHOLDS:
+            raise ValueError(f"未知的行动类型: {action}")
+        thresholds[action] = float(value)
+    return thresholds
+
+
+class EscalationPolicy:
+    """升级策略 - 按行动类型的置信度阈值决定是否调用大模型"""
+
+    def __init__(
+        self,
+        thresholds: Optional[Dict[str, float]] = None,
+        min_budget: Optional[float] = None,
+    ):
+        """初始化升级策略
+
+        Args:
+            thresholds: 各行动类型的阈值，覆盖默认值；未传入时读取
+                环境变量ESCALATION_THRESHOLDS（如 "vote=0.6,speak=1"）
+            min_budget: 升级所需的最少剩余时间（秒），未传入时读取
+                环境变量ESCALATION_MIN_BUDGET，默认8秒
+        """
+        if thresholds is None:
+            thresholds = parse_thresholds(
+                os.environ.get("ESCALATION_THRESHOLDS", "")
+            )
+        if min_budget is None:
+            min_budget = float(
+                os.environ.get("ESCALATION_MIN_BUDGET", DEFAULT_MIN_BUDGET)
+            )
+        self.thresholds = {**DEFAULT_THRESHOLDS, **thresholds}
+        self.min_budget = min_budget
+
+        # 统计：各行动类型的决策数和升级数
+        self.n_decisions: Dict[str, int] = {}
+        self.n_escalations: Dict[str, int] = {}
+
+    def should_escalate(
+        self,
+        action: str,
+        confidence: Optional[float],
+        deadline: Deadline,
+    ) -> bool:
+        """规则决策是否需要升级为大模型决策
+
+        Args:
+            action: 行动类型，ActionType的取值
+            confidence: 规则决策的置信度，没有时按0计
+            deadline: 本次响应的截止时间
+
+        Returns:
+            是否升级
+        """
+        self.n_decisions[action] = self.n_decisions.get(action, 0) + 1
+        if (confidence or 0.0) >= self.thresholds.get(action, 0.0):
+            return False
+        if deadline.remaining() < self.min_budget:
+            return False
+        self.n_escalations[action] = self.n_escalations.get(action, 0) + 1
+        return True
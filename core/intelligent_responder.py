@@ -6,24 +6,35 @@ from typing import Optional, Dict, Any, List
 from agentscope.message import Msg
 from agentscope.model import ChatModelBase
 
+from core.deadline import Deadline, ensure_deadline
+from core.decision_cache import DecisionCache
+from core.decision_candidates import DecisionCandidates
+from core.escalation import EscalationPolicy
+from core.response_generator import ResponseGenerator
 from core.strategy_manager import StrategyManager
 from core.message_handler import MessageHandler
+from core.moderator_decoder import EventType, get_moderator_decoder
 from models.memory import MemoryManager
-from models.reasoning import GameObservation, GamePhase
-from models.chain_of_thought import ChainOfThought, ChainOfThoughtBuilder
+from models.reasoning import ActionType, GameObservation, GamePhase
 from utils.logger import WerewolfLogger
 
 
 class IntelligentResponder:
     """智能响应器 - 结合策略系统生成高质量响应"""
     
+    # 未传入截止时间时的默认预算（秒）
+    DEFAULT_BUDGET = 28
+    
     def __init__(
         self,
         agent_name: str,
         model: ChatModelBase,
         strategy_manager: StrategyManager,
         message_handler: MessageHandler,
-        memory_manager: MemoryManager
+        memory_manager: MemoryManager,
+        escalation_policy: Optional[EscalationPolicy] = None,
+        decision_candidates: Optional[DecisionCandidates] = None,
+        decision_cache: Optional[DecisionCache] = None
     ):
         self.agent_name = agent_name
         self.model = model
@@ -31,21 +42,41 @@ class IntelligentResponder:
         self.message_handler = message_handler
         self.memory_manager = memory_manager
         self.logger = WerewolfLogger(agent_name)
+        
+        # 规则决策置信度不足时升级为大模型决策（无模型时从不升级）
+        self.escalation_policy = escalation_policy or EscalationPolicy()
+        self._response_generator: Optional[ResponseGenerator] = None
+        
+        # 在observe中增量维护的决策候选，处理函数只需查表
+        self.decision_candidates = decision_candidates or DecisionCandidates(agent_name)
+        
+        # 按游戏状态指纹记忆的结构化决策，没有新信息的重复提问直接返回
+        self.decision_cache = decision_cache or DecisionCache()
+    
+    @property
+    def response_generator(self) -> ResponseGenerator:
+        """响应生成器（大模型路径），首次使用时才创建"""
+        if self._response_generator is None:
+            self._response_generator = ResponseGenerator(self.agent_name, self.model)
+        return self._response_generator
     
     async def generate_intelligent_response(
         self,
         msg: Msg,
-        structured_model: Optional[type] = None
+        structured_model: Optional[type] = None,
+        deadline: Optional[Deadline] = None
     ) -> Msg:
         """生成智能响应（基于策略）
         
         Args:
             msg: 输入消息
             structured_model: 结构化模型（如果需要）
+            deadline: 响应截止时间，到期后取消决策并返回备用答案
             
         Returns:
             响应消息
         """
+        deadline = ensure_deadline(deadline, self.DEFAULT_BUDGET)
         try:
             # 获取当前策略
             if not self.strategy_manager.has_strategy():
@@ -57,26 +88,52 @@ class IntelligentResponder:
                 )
             
             strategy = self.strategy_manager.get_current_strategy()
-            current_role = self.strategy_manager.get_current_role()
             
             # 构建游戏观察
             observation = self._build_observation()
             
+            # 没有新信息的重复提问直接返回之前的决策
+            cache_key = None
+            if structured_model:
+                cache_key = self.decision_cache.key(
+                    self.strategy_manager.get_current_role(),
+                    observation.round,
+                    observation.alive_players,
+                    structured_model,
+                    msg
+                )
+                cached = self.decision_cache.get(cache_key)
+                if cached is not None:
+                    self.logger.debug("重复提问，返回缓存的决策")
+                    return cached
+            
             # 如果有结构化模型，说明是特定行动
             if structured_model:
-                return await self._generate_structured_action(
+                # 先准备好默认行动作为备用答案
+                fallback = await self._default_structured_response(structured_model)
+                work = self._decide_structured_action(
                     msg,
                     structured_model,
                     strategy,
-                    observation
+                    observation,
+                    deadline
                 )
             else:
                 # 普通发言
-                return await self._generate_normal_speech(
+                fallback = self._fallback_speech()
+                work = self._decide_speech(
                     msg,
                     strategy,
-                    observation
+                    observation,
+                    deadline
                 )
+            
+            response = await deadline.run(work, fallback)
+            if deadline.timed_out:
+                self.logger.warning("决策超时，使用备用答案")
+            elif cache_key is not None:
+                self.decision_cache.put(cache_key, response)
+            return response
                 
         except Exception as e:
             self.logger.error(f"智能响应生成失败: {e}")
@@ -88,6 +145,214 @@ class IntelligentResponder:
                 role="assistant"
             )
     
+    def _fallback_speech(self) -> Msg:
+        """超时时使用的备用发言"""
+        return Msg(
+            name=self.agent_name,
+            content="我暂时保留意见，继续听大家的发言。",
+            role="assistant"
+        )
+    
+    async def _decide_structured_action(
+        self,
+        msg: Msg,
+        structured_model: type,
+        strategy,
+        observation: GameObservation,
+        deadline: Deadline
+    ) -> Msg:
+        """先由规则策略决策，置信度不足时再升级为大模型决策"""
+        rule_response = await self._generate_structured_action(
+            msg,
+            structured_model,
+            strategy,
+            observation
+        )
+        model_name = getattr(structured_model, '__name__', 'Unknown')
+        return await self._escalate(
+            msg,
+            self._action_type(model_name),
+            rule_response,
+            observation,
+            deadline,
+            structured_model
+        )
+    
+    async def _decide_speech(
+        self,
+        msg: Msg,
+        strategy,
+        observation: GameObservation,
+        deadline: Deadline
+    ) -> Msg:
+        """先由规则策略生成发言，按发言的阈值决定是否升级为大模型发言"""
+        rule_response = await self._generate_normal_speech(msg, strategy, observation)
+        return await self._escalate(
+            msg,
+            ActionType.SPEAK.value,
+            rule_response,
+            observation,
+            deadline
+        )
+    
+    @staticmethod
+    def _action_type(model_name: str) -> str:
+        """结构化模型对应的行动类型，与_generate_structured_action的分派一致"""
+        if 'Discussion' in model_name:
+            return ActionType.SPEAK.value
+        if 'Vote' in model_name:
+            return ActionType.VOTE.value
+        if 'Seer' in model_name:
+            return ActionType.CHECK.value
+        if 'WitchResurrect' in model_name:
+            return ActionType.HEAL.value
+        if 'Poison' in model_name:
+            return ActionType.POISON.value
+        if 'Hunter' in model_name:
+            return ActionType.SHOOT.value
+        return ActionType.KILL.value
+    
+    async def _escalate(
+        self,
+        msg: Msg,
+        action: str,
+        rule_response: Msg,
+        observation: GameObservation,
+        deadline: Deadline,
+        structured_model: Optional[type] = None
+    ) -> Msg:
+        """置信度不足且时间充裕时，由大模型重新决策
+        
+        规则答案作为模型调用的备用答案，模型超时、出错或给出无效决策时返回。
+        """
+        confidence = (rule_response.metadata or {}).get('confidence')
+        if self.model is None or not self.escalation_policy.should_escalate(
+            action, confidence, deadline
+        ):
+            return rule_response
+        
+        self.logger.info(f"规则决策置信度不足({confidence})，升级为大模型决策: {action}")
+        prompt = self._build_escalation_prompt(msg, rule_response, observation, confidence)
+        model_response = await self.response_generator.generate_response(
+            prompt,
+            structured_model,
+            deadline=deadline,
+            fallback=rule_response
+        )
+        if model_response is rule_response or not self._is_valid_decision(
+            model_response, structured_model, observation
+        ):
+            return rule_response
+        
+        if not model_response.content:
+            model_response.content = rule_response.content
+        if structured_model:
+            model_response.metadata['escalated'] = True
+        return model_response
+    
+    def _build_escalation_prompt(
+        self,
+        msg: Msg,
+        rule_response: Msg,
+        observation: GameObservation,
+        confidence: Optional[float]
+    ) -> Msg:
+        """构建升级决策的提示词，附上规则策略的建议"""
+        role = self.strategy_manager.get_current_role()
+        alive = "、".join(observation.alive_players) or "未知"
+        content = msg.content if msg and isinstance(msg.content, str) else ""
+        prompt = (
+            f"你是狼人杀玩家{self.agent_name}，身份是{role}，当前第{observation.round}轮。\n"
+            f"存活玩家：{alive}\n\n"
+            f"{content}\n\n"
+            f"规则策略的建议：{rule_response.content}（置信度{confidence or 0.0:.2f}）。\n"
+            "请结合局势独立判断，给出你的最终决定。"
+        )
+        return Msg(name="System", content=prompt, role="user")
+    
+    @staticmethod
+    def _is_valid_decision(
+        response: Msg,
+        structured_model: Optional[type],
+        observation: GameObservation
+    ) -> bool:
+        """检查大模型的决策是否完整且目标合法"""
+        if structured_model is None:
+            return bool(response.content)
+        
+        metadata = response.metadata or {}
+        try:
+            structured_model.model_validate(metadata)
+        except Exception:
+            return False
+        
+        alive = set(observation.alive_players)
+        for key in ('vote', 'name'):
+            target = metadata.get(key)
+            if target and alive and target not in alive:
+                return False
+        return True
+    
+    async def revise_speech(
+        self,
+        msg: Msg,
+        draft: Msg,
+        deadline: Optional[Deadline] = None
+    ) -> Msg:
+        """按前一位玩家的发言修订预先起草的发言
+        
+        草稿起草时还没有这条发言。规则发言不读取消息内容，草稿本身仍然成立；
+        有模型时按升级策略把草稿作为建议，连同这条发言交给大模型修订。
+        
+        Args:
+            msg: 前一位玩家的发言
+            draft: 预先起草的发言
+            deadline: 响应截止时间，到期后返回草稿
+            
+        Returns:
+            修订后的发言
+        """
+        deadline = ensure_deadline(deadline, self.DEFAULT_BUDGET)
+        try:
+            return await deadline.run(
+                self._escalate(
+                    msg,
+                    ActionType.SPEAK.value,
+                    draft,
+                    self._build_observation(),
+                    deadline
+                ),
+                draft
+            )
+        except Exception as e:
+            self.logger.error(f"修订发言草稿失败: {e}")
+            return draft
+    
+    def refresh_candidates(self) -> None:
+        """刷新决策候选，由observe在每批消息之后调用（不在计时路径上）"""
+        if not self.strategy_manager.has_strategy():
+            return
+        self._current_candidates(
+            self.strategy_manager.get_current_strategy(),
+            self._build_observation()
+        )
+    
+    def update_strategy_observation(self) -> None:
+        """把当前游戏观察交给当前策略，由observe在名册或角色变化后调用"""
+        if self.strategy_manager.has_strategy():
+            self.strategy_manager.get_current_strategy().update_observation(
+                self._build_observation()
+            )
+    
+    def _current_candidates(self, strategy, observation: GameObservation) -> DecisionCandidates:
+        """与当前状态一致的决策候选，过期时当场刷新"""
+        return self.decision_candidates.ensure_current(
+            self.strategy_manager.get_current_role(),
+            strategy,
+            observation,
+            self.memory_manager
+        )
+    
     def _build_observation(self) -> GameObservation:
         """构建当前游戏观察"""
         game_state = self.message_handler.get_game_state()
@@ -181,8 +446,10 @@ class IntelligentResponder:
         # 使用策略生成夜晚行动
         night_action = strategy.generate_night_action(observation)
         
+        confidence = 0.0
         if night_action and night_action.target:
             target = night_action.target
+            confidence = night_action.confidence
         else:
             # 默认选择第一个非自己的玩家
             target = None
@@ -193,9 +460,8 @@ class IntelligentResponder:
             
             if not target and observation.alive_players:
                 # 随机选择一个不是自己的存活玩家
-                import random
                 candidates = [p for p in observation.alive_players if p != self.agent_name]
-                target = random.choice(candidates) if candidates else observation.alive_players[0]
+                target = strategy.rng.choice(candidates) if candidates else observation.alive_players[0]
         
         response = Msg(
             name=self.agent_name,
@@ -207,6 +473,7 @@ class IntelligentResponder:
         if response.metadata is None:
             response.metadata = {}
         response.metadata['name'] = target
+        response.metadata['confidence'] = confidence
         
         self.logger.info(f"狼人击杀决策: {target}")
         return response
@@ -232,6 +499,11 @@ class IntelligentResponder:
         # 决定是否达成一致（简化逻辑）
         reach_agreement = context.get('discussion_round', 1) >= 3
         
+        # 提议的击杀目标，主持人据此判断狼人是否已经意见一致
+        target = None
+        if hasattr(strategy, 'propose_night_target'):
+            target = strategy.propose_night_target(observation)
+        
         response = Msg(
             name=self.agent_name,
             content=discussion_content,
@@ -242,6 +514,7 @@ class IntelligentResponder:
         if response.metadata is None:
             response.metadata = {}
         response.metadata['reach_agreement'] = reach_agreement
+        response.metadata['target'] = target
         
         return response
     
@@ -253,37 +526,17 @@ class IntelligentResponder:
         observation: GameObservation
     ) -> Msg:
         """处理投票（带思维链）"""
-        # 构建思维链
-        current_role = self.strategy_manager.get_current_role()
-        
-        # 获取可疑和信任的玩家
-        suspected_players = {}
-        trusted_players = {}
-        for player in observation.alive_players:
-            player_info = strategy.get_player_info(player)
-            if player_info:
-                suspected_players[player] = player_info.suspicion_level
-                trusted_players[player] = player_info.trust_score
-        
-        # 获取最近事件
-        recent_conversations = self.memory_manager.get_recent_conversations(5)
-        recent_events = [conv.get('content', '')[:30] for conv in recent_conversations]
-        
-        # 构建思维链
-        cot = ChainOfThoughtBuilder.build_voting_cot(
-            my_role=current_role,
-            alive_players=observation.alive_players,
-            suspected_players=suspected_players,
-            trusted_players=trusted_players,
-            recent_events=recent_events
-        )
+        # 思维链已在observe中按可疑和信任的玩家、最近事件预先构建
+        cot = self._current_candidates(strategy, observation).vote_cot
         
         # 使用策略生成投票决策
         voting_decision = strategy.generate_voting_decision(observation, {})
         
         # 选择投票目标
+        confidence = 0.0
         if voting_decision.target:
             target = voting_decision.target
+            confidence = voting_decision.confidence
         elif observation.alive_players:
             # 选择第一个不是自己的玩家
             candidates = [p for p in observation.alive_players if p != self.agent_name]
@@ -314,6 +567,7 @@ class IntelligentResponder:
         if response.metadata is None:
             response.metadata = {}
         response.metadata['vote'] = target
+        response.metadata['confidence'] = confidence
         response.metadata['reasoning_chain'] = cot.to_dict()  # 保存完整推理链
         
         self.logger.info(f"投票决策（带思维链）: {target}")
@@ -328,39 +582,18 @@ class IntelligentResponder:
         observation: GameObservation
     ) -> Msg:
         """处理先知查验（带思维链）"""
-        # 获取已查验玩家列表
-        checked_players = []
-        if hasattr(strategy, 'strategy_state') and 'checked_players' in strategy.strategy_state:
-            checked_players = strategy.strategy_state['checked_players']
-        
-        # 获取可疑玩家
-        suspected_players = {}
-        for player in observation.alive_players:
-            player_info = strategy.get_player_info(player)
-            if player_info:
-                suspected_players[player] = player_info.suspicion_level
-        
-        # 优先目标（最可疑的未查验玩家）
-        unchecked = [p for p in observation.alive_players if p not in checked_players]
-        priority_targets = sorted(
-            unchecked,
-            key=lambda p: suspected_players.get(p, 0.3),
-            reverse=True
-        )[:3]
-        
-        # 构建思维链
-        cot = ChainOfThoughtBuilder.build_seer_check_cot(
-            checked_players=checked_players,
-            alive_players=observation.alive_players,
-            suspected_players=suspected_players,
-            priority_targets=priority_targets
-        )
+        # 优先目标（最可疑的未查验玩家）和思维链已在observe中预先计算
+        candidates = self._current_candidates(strategy, observation)
+        priority_targets = candidates.check_targets
+        cot = candidates.check_cot
         
         # 使用策略生成查验决策
         night_action = strategy.generate_night_action(observation)
         
+        confidence = 0.0
         if night_action and night_action.target:
             target = night_action.target
+            confidence = night_action.confidence
         elif priority_targets:
             target = priority_targets[0]
         else:
@@ -381,6 +614,7 @@ class IntelligentResponder:
         if response.metadata is None:
             response.metadata = {}
         response.metadata['name'] = target
+        response.metadata['confidence'] = confidence
         response.metadata['reasoning_chain'] = cot.to_dict()
         
         self.logger.info(f"先知查验（带思维链）: {target}")
@@ -395,18 +629,18 @@ class IntelligentResponder:
         observation: GameObservation
     ) -> Msg:
         """处理女巫救人（智能决策）"""
-        # 从消息中提取被杀的玩家
+        # 从消息中提取被杀的玩家。消息中女巫自己的名字在前，必须按模板解码
         killed_player = None
         if msg and msg.content:
-            import re
-            # 尝试匹配被杀玩家的名字
-            match = re.search(r'Player\d+', msg.content)
-            if match:
-                killed_player = match.group(0)
+            event = get_moderator_decoder().decode(msg.content)
+            if event is not None and event.type == EventType.WITCH_RESURRECT:
+                killed_player = event.target
         
         # 女巫用药决策逻辑
         resurrect = False
         reasoning = "不使用解药"
+        # 决策的置信度，没有选择余地时为1
+        confidence = 1.0
         
         # 检查女巫是否还有解药
         has_antidote = True
@@ -416,6 +650,7 @@ class IntelligentResponder:
         if has_antidote and killed_player:
             # 智能决策：是否救人
             should_save = False
+            confidence = 0.5
             
             # 1. 不救自己（标准规则）
             if killed_player == self.agent_name:
@@ -428,27 +663,33 @@ class IntelligentResponder:
                     # 信任度高的玩家更值得救
                     if player_info.trust_score > 0.7:
                         should_save = True
+                        confidence = player_info.trust_score
                         reasoning = f"救{killed_player}，该玩家可信度高"
                     # 可疑度很高的玩家不救
                     elif player_info.suspicion_level > 0.7:
+                        confidence = player_info.suspicion_level
                         reasoning = f"不救{killed_player}，该玩家可疑"
                     else:
                         # 3. 第一晚通常不救（标准策略）
                         if observation.round == 1:
+                            confidence = 0.6
                             reasoning = "第一晚不使用解药（保守策略）"
                         else:
                             # 后续轮次，视情况而定
                             if player_info.trust_score > 0.5:
                                 should_save = True
+                                confidence = player_info.trust_score
                                 reasoning = f"救{killed_player}"
                 else:
                     # 没有玩家信息，保守策略
+                    confidence = 0.3
                     reasoning = "信息不足，不使用解药"
             
             resurrect = should_save
         elif not has_antidote:
             reasoning = "解药已用，无法救人"
         else:
+            confidence = 0.0
             reasoning = "未获取被杀玩家信息"
         
         response = Msg(
@@ -461,6 +702,7 @@ class IntelligentResponder:
         if response.metadata is None:
             response.metadata = {}
         response.metadata['resurrect'] = resurrect
+        response.metadata['confidence'] = confidence
         
         self.logger.info(f"女巫救人决策: {resurrect} - {reasoning}")
         return response
@@ -481,28 +723,24 @@ class IntelligentResponder:
         poison = False
         target = None
         reasoning = "不使用毒药"
+        # 决策的置信度，没有选择余地时为1
+        confidence = 1.0
         
         if has_poison and observation.alive_players:
             # 智能决策：是否用毒
             
-            # 1. 找出最可疑的玩家
-            most_suspicious = None
-            max_suspicion = 0.0
-            
-            for player in observation.alive_players:
-                if player == self.agent_name:  # 不能毒自己
-                    continue
-                    
-                player_info = strategy.get_player_info(player)
-                if player_info and player_info.suspicion_level > max_suspicion:
-                    max_suspicion = player_info.suspicion_level
-                    most_suspicious = player
+            # 1. 最可疑的玩家（不含自己）已在observe中预先找出
+            candidates = self._current_candidates(strategy, observation)
+            most_suspicious = candidates.most_suspicious
+            max_suspicion = candidates.max_suspicion
             
-            # 2. 决定是否用毒
+            # 2. 决定是否用毒，用毒的置信度为目标的可疑度，不用毒则相反
+            confidence = 1.0 - max_suspicion
             if most_suspicious and max_suspicion > 0.8:
                 # 非常确定是狼人，使用毒药
                 poison = True
                 target = most_suspicious
+                confidence = max_suspicion
                 reasoning = f"毒{target}（高度可疑: {max_suspicion:.2f}）"
             elif most_suspicious and max_suspicion > 0.7 and observation.round >= 3:
                 # 较为可疑且游戏进入中后期，考虑使用
@@ -510,6 +748,7 @@ class IntelligentResponder:
                     # 玩家数量较少，关键时刻
                     poison = True
                     target = most_suspicious
+                    confidence = max_suspicion
                     reasoning = f"毒{target}（关键时刻，可疑度: {max_suspicion:.2f}）"
                 else:
                     reasoning = "暂不使用毒药，继续观察"
@@ -531,6 +770,7 @@ class IntelligentResponder:
             response.metadata = {}
         response.metadata['poison'] = poison
         response.metadata['name'] = target
+        response.metadata['confidence'] = confidence
         
         self.logger.info(f"女巫毒人决策: poison={poison}, target={target} - {reasoning}")
         return response
@@ -546,24 +786,18 @@ class IntelligentResponder:
         shoot = False
         target = None
         reasoning = "不开枪"
+        # 决策的置信度，没有选择余地时为1
+        confidence = 1.0
         
         # 猎人开枪决策逻辑
         if observation.alive_players:
             # 1. 评估局势
             alive_count = len(observation.alive_players)
             
-            # 2. 找出最可疑的玩家
-            most_suspicious = None
-            max_suspicion = 0.0
-            
-            for player in observation.alive_players:
-                if player == self.agent_name:  # 不能射自己
-                    continue
-                    
-                player_info = strategy.get_player_info(player)
-                if player_info and player_info.suspicion_level > max_suspicion:
-                    max_suspicion = player_info.suspicion_level
-                    most_suspicious = player
+            # 2. 最可疑的玩家（不含自己）已在observe中预先找出
+            candidates = self._current_candidates(strategy, observation)
+            most_suspicious = candidates.most_suspicious
+            max_suspicion = candidates.max_suspicion
             
             # 3. 决定是否开枪
             # 猎人开枪的考虑因素：
@@ -572,17 +806,21 @@ class IntelligentResponder:
             # - 自己已经被淘汰，需要利用技能
             
             should_shoot = False
+            # 开枪的置信度为目标的可疑度，不开枪则相反
+            confidence = 1.0 - max_suspicion
             
             if most_suspicious:
                 # 非常确定是狼人
                 if max_suspicion > 0.85:
                     should_shoot = True
                     target = most_suspicious
+                    confidence = max_suspicion
                     reasoning = f"带走{target}（高度可疑: {max_suspicion:.2f}）"
                 # 较为可疑且局势危急
                 elif max_suspicion > 0.7 and alive_count <= 4:
                     should_shoot = True
                     target = most_suspicious
+                    confidence = max_suspicion
                     reasoning = f"关键时刻带走{target}（可疑度: {max_suspicion:.2f}）"
                 else:
                     reasoning = "放弃开枪（目标不够确定）"
@@ -604,6 +842,7 @@ class IntelligentResponder:
             response.metadata = {}
         response.metadata['shoot'] = shoot
         response.metadata['name'] = target
+        response.metadata['confidence'] = confidence
         
         self.logger.info(f"猎人开枪决策: shoot={shoot}, target={target} - {reasoning}")
         return response
@@ -638,6 +877,7 @@ class IntelligentResponder:
         speaking_goal = speaking_goals.get(current_role, "理性分析局势")
         
         # 构建思维链
+        from models.chain_of_thought import ChainOfThoughtBuilder
         cot = ChainOfThoughtBuilder.build_speech_cot(
             my_role=current_role,
             game_phase=phase_str,
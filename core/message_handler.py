@@ -3,23 +3,124 @@
 
 import re
 import time
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Set
 from agentscope.message import Msg
 
+from core.moderator_decoder import (
+    MODERATOR_NAME,
+    EventType,
+    ModeratorEvent,
+    get_moderator_decoder,
+)
+from models.roster import Roster
+
+
+# 主持人事件引起的阶段变化
+_EVENT_PHASES = {
+    EventType.NIGHT: 'night',
+    EventType.WOLVES_DISCUSSION: 'discussion',
+    EventType.WOLVES_VOTE: 'voting',
+    EventType.WOLVES_REVOTE: 'voting',
+    EventType.DAY: 'day',
+    EventType.DISCUSS: 'discussion',
+    EventType.VOTE: 'voting',
+    EventType.REVOTE: 'voting',
+}
+
+# 带有当前全部存活玩家列表的主持人事件
+_ALIVE_LIST_EVENTS = (
+    EventType.WOLVES_DISCUSSION,
+    EventType.SEER,
+    EventType.DISCUSS,
+    EventType.VOTE,
+)
+
+# 不是由提示词模板生成的主持人消息退回到关键词规则。
+# 各解析规则的触发关键词：只有消息中出现了触发关键词的规则才运行各自的
+# 提取正则，多数消息不触发任何规则。关键词表按是否区分大小写
+# 分为两组，与各规则原本的匹配方式一致。对这些短消息，CPython中逐个的
+# 子串查找比一个多分支正则（实测慢2-8倍）更快
+_KEYWORDS = (
+    ('voted', 'voted for'),
+    ('voted', 'vote:'),
+    ('voted', '投给了'),
+    ('death', 'eliminated'),
+    ('death', 'died'),
+    ('death', '淘汰'),
+    ('death', '死亡'),
+    ('death_named', ' was eliminated'),
+    ('death_named', ' died'),
+    ('death_named', ' 被淘汰'),
+    ('death_named', ' 死亡'),
+    ('role_cn', '角色是'),
+    ('night', '天黑了'),
+    ('day', '天亮了'),
+    ('discussion', '讨论'),
+    ('voting', '投票'),
+    ('result', '结果'),
+)
+_KEYWORDS_CASELESS = (
+    ('role_en', 'your role is'),
+    ('night', 'night has fallen'),
+    ('day', 'the day is coming'),
+    ('discussion', 'discuss'),
+    ('voting', 'vote'),
+    ('result', 'result'),
+)
+
+# 不带玩家名的角色分配
+_ROLE_PATTERN_PLAIN = re.compile(r"your role is (\w+)", re.IGNORECASE)
+
+# 中文角色映射到英文
+_ROLE_MAP_CN = {
+    '狼人': 'werewolf',
+    '先知': 'seer',
+    '女巫': 'witch',
+    '猎人': 'hunter',
+    '村民': 'villager'
+}
+
+# 死亡信息: "Player1 was eliminated" or "Player1 died"，以及死亡关键词之后的玩家名。
+# 前一条规则只在带前导空格的关键词出现时才运行
+_DEATH_PATTERN_NAMED = re.compile(r"(\w+) (?:was eliminated|died|被淘汰|死亡)")
+_DEATH_PATTERN_AFTER = re.compile(r"(?:eliminated|died|淘汰|死亡).*?(\w+)")
+
+# 投票结果
+_VOTE_PATTERN = re.compile(r"(?:voted for|投给了|vote:)\s*(\w+)")
+
 
 class MessageHandler:
     """消息处理器 - 统一处理各种游戏消息"""
     
-    def __init__(self, agent_name: str):
+    def __init__(self, agent_name: str, roster: Optional[Roster] = None):
+        """初始化消息处理器
+        
+        Args:
+            agent_name: 智能体名称
+            roster: 存活名册，与策略、记忆共用；未传入时新建一个
+        """
         self.agent_name = agent_name
+        self.roster = roster if roster is not None else Roster()
         self.game_state = {
             'phase': 'unknown',  # night, day, discussion, voting
             'round': 0,
             'role': None,
-            'alive_players': [],
-            'dead_players': [],
+            'players': self.roster.players,
+            'alive_players': self.roster.alive_players,
+            'dead_players': self.roster.dead_players,
             'last_night_result': {}
         }
+        
+        # 含玩家名的角色分配规则，每个智能体只编译一次
+        name = re.escape(agent_name)
+        self._role_pattern_tagged = re.compile(
+            rf"\[{name} ONLY\].*your role is (\w+)",
+            re.IGNORECASE
+        )
+        self._role_pattern_cn = re.compile(rf"{name}.*?角色是(\S+)")
+        
+        # 由提示词模板编译的主持人消息解码器，全部智能体共享
+        self.decoder = get_moderator_decoder()
     
     def process_message(self, msg) -> Dict[str, Any]:
         """处理消息并更新游戏状态
@@ -37,7 +138,8 @@ class MessageHandler:
             'phase_change': None,
             'role_assigned': None,
             'player_died': [],
-            'voting_result': None
+            'voting_result': None,
+            'events': []
         }
         
         for single_msg in messages:
@@ -47,18 +149,27 @@ class MessageHandler:
             if not content:
                 continue
             
-            # 保存消息
+            # 只有主持人的消息会改变游戏状态，玩家发言中出现的
+            # "投票"、"淘汰"等字样不是事件
+            previous_phase_change = parsed_info['phase_change']
+            parsed_info['phase_change'] = None
+            if sender == MODERATOR_NAME and isinstance(content, str):
+                event = self.decoder.decode(content)
+                if event is not None:
+                    parsed_info['events'].append(event)
+                    self._apply_event(event, parsed_info)
+                else:
+                    self._parse_heuristics(content, parsed_info)
+            phase_change = parsed_info['phase_change']
+            parsed_info['phase_change'] = phase_change or previous_phase_change
+            
+            # 保存消息（批量到达时，记录每条消息各自引起的阶段变化）
             parsed_info['messages'].append({
                 'sender': sender,
                 'content': content,
-                'timestamp': time.time()
+                'timestamp': time.time(),
+                'phase_change': phase_change
             })
-            
-            # 解析特殊信息
-            self._parse_role_assignment(content, parsed_info)
-            self._parse_phase_change(content, parsed_info)
-            self._parse_death_info(content, parsed_info)
-            self._parse_voting_info(content, parsed_info)
         
         return parsed_info
     
@@ -96,89 +207,143 @@ class MessageHandler:
         else:
             return 'Unknown'
     
-    def _parse_role_assignment(self, content: str, parsed_info: Dict) -> None:
+    def _apply_event(self, event: ModeratorEvent, parsed_info: Dict) -> None:
+        """按解码出的主持人事件更新游戏状态"""
+        if event.type == EventType.ROLE:
+            if event.player == self.agent_name:
+                parsed_info['role_assigned'] = event.role
+                self.game_state['role'] = event.role
+            return
+        
+        phase = _EVENT_PHASES.get(event.type)
+        if phase:
+            parsed_info['phase_change'] = phase
+            self.game_state['phase'] = phase
+        
+        # 开局公告建立名册，带存活玩家列表的公告校正名册
+        if event.type == EventType.NEW_GAME:
+            self.roster.start(event.players)
+            self._sync_roster_state()
+        elif event.type in _ALIVE_LIST_EVENTS and event.players:
+            if self.roster.sync_alive(event.players):
+                self._sync_roster_state()
+        
+        # 狼人的选择和女巫得知的死讯都还可能被解药改变，只有公布的死讯、
+        # 放逐和猎人带走的玩家才确定死亡
+        if event.type == EventType.DAY:
+            self._mark_dead(event.victims, parsed_info)
+        elif event.type in (EventType.DEAD_PLAYER, EventType.HUNTER_SHOT):
+            self._mark_dead([event.target], parsed_info)
+        elif event.type == EventType.HUNTER:
+            self._mark_dead([event.player], parsed_info)
+        elif event.type == EventType.VOTE_RESULT:
+            if event.target:
+                self._mark_dead([event.target], parsed_info)
+                parsed_info['voting_result'] = event.target
+    
+    def _mark_dead(self, players: List[str], parsed_info: Dict) -> None:
+        """记录死亡的玩家"""
+        for player_name in players:
+            if player_name not in parsed_info['player_died']:
+                parsed_info['player_died'].append(player_name)
+            self.roster.mark_dead(player_name)
+        self._sync_roster_state()
+    
+    def _sync_roster_state(self) -> None:
+        """把名册中的全部、存活、死亡玩家同步到游戏状态"""
+        self.game_state['players'] = self.roster.players
+        self.game_state['alive_players'] = self.roster.alive_players
+        self.game_state['dead_players'] = self.roster.dead_players
+    
+    def _parse_heuristics(self, content: str, parsed_info: Dict) -> None:
+        """用关键词规则解析不是由模板生成的主持人消息"""
+        # 先找出全部触发关键词，只运行被触发的解析规则
+        keywords = self._scan_keywords(content)
+        self._parse_role_assignment(content, parsed_info, keywords)
+        self._parse_phase_change(content, parsed_info, keywords)
+        self._parse_death_info(content, parsed_info, keywords)
+        self._parse_voting_info(content, parsed_info, keywords)
+    
+    def _scan_keywords(self, content: str) -> Set[str]:
+        """找出消息中出现的全部触发关键词"""
+        content_lower = content.lower()
+        keywords = {name for name, word in _KEYWORDS if word in content}
+        keywords.update(
+            name for name, word in _KEYWORDS_CASELESS if word in content_lower
+        )
+        return keywords
+    
+    def _parse_role_assignment(self, content: str, parsed_info: Dict, keywords: Set[str]) -> None:
         """解析角色分配（支持多种格式）"""
         # 格式1: [Player1 ONLY] your role is werewolf
-        pattern1 = rf"\[{self.agent_name} ONLY\].*your role is (\w+)"
-        match = re.search(pattern1, content, re.IGNORECASE)
-        
-        if match:
-            role = match.group(1).lower()
-            parsed_info['role_assigned'] = role
-            self.game_state['role'] = role
-            return
+        if 'role_en' in keywords:
+            match = self._role_pattern_tagged.search(content)
+            if match:
+                role = match.group(1).lower()
+                parsed_info['role_assigned'] = role
+                self.game_state['role'] = role
+                return
         
         # 格式2: Player1，你的角色是狼人
-        pattern2 = rf"{self.agent_name}.*?角色是(\S+)"
-        match = re.search(pattern2, content)
-        
-        if match:
-            role_cn = match.group(1).strip('。')
-            # 中文角色映射到英文
-            role_map = {
-                '狼人': 'werewolf',
-                '先知': 'seer',
-                '女巫': 'witch',
-                '猎人': 'hunter',
-                '村民': 'villager'
-            }
-            role = role_map.get(role_cn, role_cn)
-            parsed_info['role_assigned'] = role
-            self.game_state['role'] = role
-            return
+        if 'role_cn' in keywords:
+            match = self._role_pattern_cn.search(content)
+            if match:
+                role_cn = match.group(1).strip('。')
+                # 中文角色映射到英文
+                role = _ROLE_MAP_CN.get(role_cn, role_cn)
+                parsed_info['role_assigned'] = role
+                self.game_state['role'] = role
+                return
         
         # 格式3: your role is werewolf (不带玩家名)
-        pattern3 = r"your role is (\w+)"
-        match = re.search(pattern3, content, re.IGNORECASE)
-        
-        if match:
-            role = match.group(1).lower()
-            parsed_info['role_assigned'] = role
-            self.game_state['role'] = role
+        if 'role_en' in keywords:
+            match = _ROLE_PATTERN_PLAIN.search(content)
+            if match:
+                role = match.group(1).lower()
+                parsed_info['role_assigned'] = role
+                self.game_state['role'] = role
     
-    def _parse_phase_change(self, content: str, parsed_info: Dict) -> None:
+    def _parse_phase_change(self, content: str, parsed_info: Dict, keywords: Set[str]) -> None:
         """解析阶段变化"""
-        content_lower = content.lower()
-        
-        if "night has fallen" in content_lower or "天黑了" in content:
+        if 'night' in keywords:
             parsed_info['phase_change'] = 'night'
             self.game_state['phase'] = 'night'
-        elif "the day is coming" in content_lower or "天亮了" in content:
+        elif 'day' in keywords:
             parsed_info['phase_change'] = 'day'
             self.game_state['phase'] = 'day'
-        elif "discuss" in content_lower or "讨论" in content:
+        elif 'discussion' in keywords:
             parsed_info['phase_change'] = 'discussion'
             self.game_state['phase'] = 'discussion'
-        elif "vote" in content_lower or "投票" in content:
-            if "result" not in content_lower and "结果" not in content:
-                parsed_info['phase_change'] = 'voting'
-                self.game_state['phase'] = 'voting'
+        elif 'voting' in keywords and 'result' not in keywords:
+            parsed_info['phase_change'] = 'voting'
+            self.game_state['phase'] = 'voting'
     
-    def _parse_death_info(self, content: str, parsed_info: Dict) -> None:
+    def _parse_death_info(self, content: str, parsed_info: Dict, keywords: Set[str]) -> None:
         """解析死亡信息"""
-        # 匹配: "Player1 was eliminated" or "Player1 died"
-        death_patterns = [
-            r"(\w+) (?:was eliminated|died|被淘汰|死亡)",
-            r"(?:eliminated|died|淘汰|死亡).*?(\w+)"
-        ]
+        if 'death' not in keywords:
+            return
         
-        for pattern in death_patterns:
-            matches = re.finditer(pattern, content)
+        # 匹配: "Player1 was eliminated" or "Player1 died"
+        patterns = [_DEATH_PATTERN_AFTER]
+        if 'death_named' in keywords:
+            patterns.insert(0, _DEATH_PATTERN_NAMED)
+        for pattern in patterns:
+            matches = pattern.finditer(content)
             for match in matches:
                 player_name = match.group(1)
+                # 名册建立之后，关键词规则只认名册中的玩家
+                if self.roster.players and not self.roster.knows(player_name):
+                    continue
                 if player_name and player_name not in parsed_info['player_died']:
-                    parsed_info['player_died'].append(player_name)
-                    if player_name not in self.game_state['dead_players']:
-                        self.game_state['dead_players'].append(player_name)
-                    if player_name in self.game_state['alive_players']:
-                        self.game_state['alive_players'].remove(player_name)
+                    self._mark_dead([player_name], parsed_info)
     
-    def _parse_voting_info(self, content: str, parsed_info: Dict) -> None:
+    def _parse_voting_info(self, content: str, parsed_info: Dict, keywords: Set[str]) -> None:
         """解析投票信息"""
-        # 匹配投票结果
-        vote_pattern = r"(?:voted for|投给了|vote:)\s*(\w+)"
-        match = re.search(vote_pattern, content)
+        if 'voted' not in keywords:
+            return
         
+        # 匹配投票结果
+        match = _VOTE_PATTERN.search(content)
         if match:
             target = match.group(1)
             parsed_info['voting_result'] = target
@@ -188,8 +353,19 @@ class MessageHandler:
         return self.game_state.copy()
     
     def update_alive_players(self, players: List[str]) -> None:
-        """更新存活玩家列表"""
-        self.game_state['alive_players'] = [p for p in players if p != self.agent_name]
+        """按当前全部存活玩家（包括自己）校正名册"""
+        if self.roster.sync_alive(players):
+            self._sync_roster_state()
+    
+    def load_game_state(self, game_state: Dict[str, Any]) -> None:
+        """恢复保存的游戏状态，并据此重建名册"""
+        self.game_state.update(game_state)
+        self.roster.restore(
+            self.game_state.get('alive_players', []),
+            self.game_state.get('dead_players', []),
+            self.game_state.get('players', [])
+        )
+        self._sync_roster_state()
     
     def get_current_role(self) -> Optional[str]:
         """获取当前角色"""
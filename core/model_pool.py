@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+"""共享模型池 - 进程内所有智能体共用模型客户端
+
+每个PlayerAgent原本各自创建一个DashScopeChatModel，9个智能体 × N局并发
+就是9N个客户端。模型池按（模型名, API密钥）在进程内只创建一个模型实例，
+智能体只持有轻量的ModelHandle；所有句柄的调用共享一个全局并发上限，
+避免并发对局同时发出过多请求。底层HTTP连接由DashScope SDK按事件循环
+共享的会话复用。
+"""
+
+import asyncio
+import os
+import threading
+import weakref
+from collections.abc import AsyncGenerator
+from typing import Any, Dict, Optional, Tuple
+
+from agentscope.model import ChatModelBase, DashScopeChatModel
+
+# 默认的全局并发请求上限，可通过环境变量MODEL_MAX_CONCURRENCY调整
+DEFAULT_MAX_CONCURRENCY = 16
+
+
+class ModelPool:
+    """模型池 - 共享模型实例并限制全局并发"""
+
+    def __init__(self, max_concurrency: Optional[int] = None):
+        """初始化模型池
+
+        Args:
+            max_concurrency: 全局并发请求上限，默认读取环境变量
+                MODEL_MAX_CONCURRENCY，未设置时为16
+        """
+        if max_concurrency is None:
+            max_concurrency = int(
+                os.environ.get("MODEL_MAX_CONCURRENCY", DEFAULT_MAX_CONCURRENCY)
+            )
+        self.max_concurrency = max_concurrency
+        self._models: Dict[Tuple[str, Optional[str]], ChatModelBase] = {}
+        # asyncio.Semaphore绑定事件循环，每个事件循环各用一个
+        self._limits: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+        # 调用统计
+        self.n_calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def get_model(
+        self,
+        model_name: str,
+        api_key: Optional[str] = None,
+    ) -> "ModelHandle":
+        """获取模型句柄，同一配置的句柄共享同一个模型实例
+
+        Args:
+            model_name: 模型名称，例如qwen-max
+            api_key: DashScope API密钥
+
+        Returns:
+            模型句柄
+        """
+        key = (model_name, api_key)
+        with self._lock:
+            if key not in self._models:
+                self._models[key] = DashScopeChatModel(
+                    api_key=api_key,
+                    model_name=model_name,
+                )
+            model = self._models[key]
+        return ModelHandle(self, model)
+
+    def limit(self) -> asyncio.Semaphore:
+        """当前事件循环的并发信号量"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            semaphore = self._limits.get(loop)
+            if semaphore is None:
+                semaphore = asyncio.Semaphore(self.max_concurrency)
+                self._limits[loop] = semaphore
+        return semaphore
+
+    def __len__(self) -> int:
+        """已创建的模型实例数"""
+        return len(self._models)
+
+
+class ModelHandle(ChatModelBase):
+    """模型句柄 - 智能体持有的轻量模型引用
+
+    调用时先获取模型池的并发许可，再转发给共享的模型实例。
+    流式输出时，许可一直保持到输出结束。
+    """
+
+    def __init__(self, pool: ModelPool, model: ChatModelBase):
+        super().__init__(model.model_name, model.stream)
+        self.pool = pool
+        self.model = model
+
+    async def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        """在全局并发上限内调用共享模型"""
+        semaphore = self.pool.limit()
+        await semaphore.acquire()
+        self._enter()
+        try:
+            response = await self.model(*args, **kwargs)
+        except BaseException:
+            self._exit(semaphore)
+            raise
+
+        if isinstance(response, AsyncGenerator):
+            return self._stream(response, semaphore)
+
+        self._exit(semaphore)
+        return response
+
+    async def _stream(
+        self,
+        response: AsyncGenerator,
+        semaphore: asyncio.Semaphore,
+    ) -> AsyncGenerator:
+        """转发流式输出，结束后释放并发许可"""
+        try:
+            async for chunk in response:
+                yield chunk
+        finally:
+            self._exit(semaphore)
+
+    def _enter(self) -> None:
+        """记录一次调用开始"""
+        pool = self.pool
+        pool.n_calls += 1
+        pool.in_flight += 1
+        pool.max_in_flight = max(pool.max_in_flight, pool.in_flight)
+
+    def _exit(self, semaphore: asyncio.Semaphore) -> None:
+        """记录一次调用结束并释放许可"""
+        self.pool.in_flight -= 1
+        semaphore.release()
+
+    def __getattr__(self, name: str) -> Any:
+        """其余属性（如generate_kwargs）转发给共享模型"""
+        model = self.__dict__.get("model")
+        if model is None:
+            raise AttributeError(name)
+        return getattr(model, name)
+
+
+_default_pool: Optional[ModelPool] = None
+_default_pool_lock = threading.Lock()
+
+
+def get_model_pool() -> ModelPool:
+    """获取进程内共享的默认模型池（首次调用时创建）"""
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = ModelPool()
+    return _default_pool
@@ -0,0 +1,300 @@
+# -*- coding: utf-8 -*-
+"""主持人消息解码器 - 由主持人的提示词模板编译而成
+
+主持人的每条消息都由werewolves/prompt.py中EnglishPrompts/ChinesePrompts的
+格式串生成。ModeratorDecoder把两种语言的全部模板编译成锚定的多分支正则
+（按模板首字符分桶）：模板中的文字原样转义，每个占位符变成一个命名分组，
+同一模板中重复出现的占位符用反向引用约束为相同的值。解码一条消息只需一次
+fullmatch，命中的分支即是模板，分组即是参数，再按模板转换成带类型的事件
+（入夜、昨晚死亡、投票统计、查验结果、游戏结束等）。不是由模板生成的文字
+（例如玩家发言中提到的"投票"、"淘汰"）不会被误认为事件。
+"""
+
+import re
+from dataclasses import dataclass, field
+from enum import Enum
+from string import Formatter
+from typing import Callable, Dict, List, Optional, Tuple
+
+from werewolves.prompt import ChinesePrompts, EnglishPrompts
+
+# 主持人的名字，见werewolves.utils.EchoAgent
+MODERATOR_NAME = "Moderator"
+
+
+class EventType(Enum):
+    """主持人事件类型"""
+    NEW_GAME = "new_game"
+    ROLE = "role"
+    NIGHT = "night"
+    WOLVES_DISCUSSION = "wolves_discussion"
+    WOLVES_VOTE = "wolves_vote"
+    WOLVES_RESULT = "wolves_result"
+    WOLVES_REVOTE = "wolves_revote"
+    WITCH_TURN = "witch_turn"
+    WITCH_RESURRECT = "witch_resurrect"
+    WITCH_RESURRECT_RESULT = "witch_resurrect_result"
+    WITCH_POISON = "witch_poison"
+    SEER_TURN = "seer_turn"
+    SEER = "seer"
+    SEER_RESULT = "seer_result"
+    HUNTER = "hunter"
+    HUNTER_SHOT = "hunter_shot"
+    DAY = "day"
+    DEAD_PLAYER = "dead_player"
+    DISCUSS = "discuss"
+    VOTE = "vote"
+    VOTE_RESULT = "vote_result"
+    REVOTE = "revote"
+    GAME_END = "game_end"
+    CONTINUE = "continue"
+    REFLECT = "reflect"
+
+
+@dataclass
+class ModeratorEvent:
+    """主持人事件 - 一条主持人消息解码后的结果"""
+    type: EventType
+    template: str  # 模板名，即Prompts中的属性名
+    language: str  # en, zh
+    player: Optional[str] = None  # 消息的接收者，如女巫、先知、猎人
+    target: Optional[str] = None  # 被淘汰、被查验、被带走的玩家
+    role: Optional[str] = None  # 分配的角色或查验结果
+    players: List[str] = field(default_factory=list)  # 存活玩家或全部玩家
+    victims: List[str] = field(default_factory=list)  # 昨晚死亡的玩家
+    werewolves: List[str] = field(default_factory=list)  # 狼人讨论中的狼人
+    tally: Dict[str, int] = field(default_factory=dict)  # 各玩家的得票数
+    tied: List[str] = field(default_factory=list)  # 平票的玩家
+    winner: Optional[str] = None  # werewolves, villagers
+    true_roles: Dict[str, str] = field(default_factory=dict)  # 玩家到真实角色
+    n_alive: Optional[int] = None
+    n_werewolves: Optional[int] = None
+
+
+def split_names(text: str) -> List[str]:
+    """拆分werewolves.utils.names_to_str生成的玩家列表，如 "A, B, and C" """
+    if not text:
+        return []
+    names = text.split(", ")
+    if len(names) > 1 and names[-1].startswith("and "):
+        names[-1] = names[-1][len("and "):]
+    return names
+
+
+def parse_tally(text: str) -> Dict[str, int]:
+    """解析VoteResult.conditions()生成的得票统计，如 "Player1: 2, Player3: 1" """
+    tally = {}
+    if not text:
+        return tally
+    for item in text.split(", "):
+        name, sep, count = item.rpartition(": ")
+        if not sep:
+            raise ValueError(f"无效的得票统计: {item}")
+        tally[name] = int(count)
+    return tally
+
+
+# 真实身份说明中的一段，如 "A, and B are werewolves, "，见Players.check_winning
+_TRUE_ROLE_PATTERN = re.compile(
+    r"(?:and )?(.*?) (?:are|is the) (werewolves|villagers|seer|hunter|witch)[,.]\s*"
+)
+_TRUE_ROLE_NAMES = {'werewolves': 'werewolf', 'villagers': 'villager'}
+
+
+def parse_true_roles(text: str) -> Dict[str, str]:
+    """解析游戏结束时公布的全部玩家真实身份"""
+    true_roles = {}
+    for match in _TRUE_ROLE_PATTERN.finditer(text):
+        role = _TRUE_ROLE_NAMES.get(match.group(2), match.group(2))
+        for name in split_names(match.group(1)):
+            true_roles[name] = role
+    return true_roles
+
+
+# 各占位符转换到事件的哪个字段
+_CONVERTERS: Dict[str, Callable[[str], object]] = {
+    'players': split_names,
+    'victims': split_names,
+    'werewolves': split_names,
+    'tied': split_names,
+    'tally': parse_tally,
+    'true_roles': parse_true_roles,
+    'n_alive': int,
+    'n_werewolves': int,
+}
+
+# 模板名 -> (事件类型, 各占位符对应的字段)。位置占位符按出现顺序对应，
+# 命名占位符按名字对应
+_TEMPLATE_SPECS: Dict[str, Tuple[EventType, Dict[str, str]]] = {
+    'to_all_new_game': (EventType.NEW_GAME, {'0': 'players'}),
+    'to_player_role': (EventType.ROLE, {'name': 'player', 'role': 'role'}),
+    'to_all_night': (EventType.NIGHT, {}),
+    'to_wolves_discussion': (
+        EventType.WOLVES_DISCUSSION, {'0': 'werewolves', '1': 'players'}
+    ),
+    'to_wolves_vote': (EventType.WOLVES_VOTE, {}),
+    'to_wolves_res': (EventType.WOLVES_RESULT, {'0': 'tally', '1': 'target'}),
+    'to_wolves_res_tie': (EventType.WOLVES_RESULT, {'0': 'tally'}),
+    'to_wolves_revote': (EventType.WOLVES_REVOTE, {'0': 'tally', '1': 'tied'}),
+    'to_all_witch_turn': (EventType.WITCH_TURN, {}),
+    'to_witch_resurrect': (
+        EventType.WITCH_RESURRECT, {'witch_name': 'player', 'dead_name': 'target'}
+    ),
+    'to_witch_resurrect_no': (EventType.WITCH_RESURRECT_RESULT, {}),
+    'to_witch_resurrect_yes': (EventType.WITCH_RESURRECT_RESULT, {}),
+    'to_witch_poison': (EventType.WITCH_POISON, {'witch_name': 'player'}),
+    'to_all_seer_turn': (EventType.SEER_TURN, {}),
+    'to_seer': (EventType.SEER, {'0': 'player', '1': 'players'}),
+    'to_seer_result': (EventType.SEER_RESULT, {'agent_name': 'target', 'role': 'role'}),
+    'to_hunter': (EventType.HUNTER, {'name': 'player'}),
+    'to_all_hunter_shoot': (EventType.HUNTER_SHOT, {'0': 'target'}),
+    'to_all_day': (EventType.DAY, {'0': 'victims'}),
+    'to_all_peace': (EventType.DAY, {}),
+    'to_dead_player': (EventType.DEAD_PLAYER, {'0': 'target'}),
+    'to_all_discuss': (EventType.DISCUSS, {'names': 'players'}),
+    'to_all_vote': (EventType.VOTE, {'0': 'players'}),
+    'to_all_res': (EventType.VOTE_RESULT, {'0': 'tally', '1': 'target'}),
+    'to_all_res_tie': (EventType.VOTE_RESULT, {'0': 'tally'}),
+    'to_all_revote': (EventType.REVOTE, {'0': 'tally', '1': 'tied'}),
+    'to_all_wolf_win': (
+        EventType.GAME_END,
+        {'n_alive': 'n_alive', 'n_werewolves': 'n_werewolves', 'true_roles': 'true_roles'},
+    ),
+    'to_all_village_win': (EventType.GAME_END, {'true_roles': 'true_roles'}),
+    'to_all_continue': (EventType.CONTINUE, {}),
+    'to_all_reflect': (EventType.REFLECT, {}),
+}
+
+# 游戏结束模板对应的获胜方
+_WINNERS = {
+    'to_all_wolf_win': 'werewolves',
+    'to_all_village_win': 'villagers',
+}
+
+# 不在Prompts中、由werewolves/game.py直接拼出的消息
+_EXTRA_TEMPLATES = {
+    'to_player_role': "[{name} ONLY] {name}, your role is {role}.",
+}
+
+
+class ModeratorDecoder:
+    """主持人消息解码器 - 一次锚定匹配把主持人消息解码为事件"""
+
+    def __init__(self, prompt_classes: Optional[Dict[str, type]] = None):
+        """编译解码器
+
+        Args:
+            prompt_classes: 语言到提示词类的映射，默认英文和中文两种
+        """
+        if prompt_classes is None:
+            prompt_classes = {'en': EnglishPrompts, 'zh': ChinesePrompts}
+
+        templates = [('en', name, template) for name, template in _EXTRA_TEMPLATES.items()]
+        for language, prompts in prompt_classes.items():
+            for name in _TEMPLATE_SPECS:
+                template = getattr(prompts, name, None)
+                if template is not None:
+                    templates.append((language, name, template))
+
+        # 文字多的模板先尝试：例如 "投票结果为 {}，出现平票，无人被淘汰。"
+        # 也能被 "投票结果为 {}，{} 被淘汰。" 匹配，必须先匹配前者
+        templates.sort(key=lambda item: -self._literal_length(item[2]))
+
+        # 每个分支的分组名 -> (事件类型, 模板名, 语言, 获胜方,
+        # 各参数的(分组名, 字段, 转换函数))
+        self._branches: Dict[str, tuple] = {}
+        # 按模板的首字符分桶，每个桶编译成一个多分支正则，一条消息只需
+        # 尝试首字符相同的模板。以占位符开头的模板放进每个桶
+        by_first_char: Dict[str, List[str]] = {}
+        leading_placeholder: List[str] = []
+        for idx, (language, name, template) in enumerate(templates):
+            branch = f"t{idx}"
+            pattern, groups = self._compile_template(branch, template)
+            alternative = f"(?P<{branch}>{pattern})"
+            event_type, fields = _TEMPLATE_SPECS[name]
+            self._branches[branch] = (
+                event_type,
+                name,
+                language,
+                _WINNERS.get(name),
+                tuple(
+                    (group, fields[field_name], _CONVERTERS.get(fields[field_name]))
+                    for field_name, group in groups.items()
+                ),
+            )
+            if template.startswith('{'):
+                leading_placeholder.append(alternative)
+                for alternatives in by_first_char.values():
+                    alternatives.append(alternative)
+            else:
+                by_first_char.setdefault(template[0], list(leading_placeholder)).append(alternative)
+        self._buckets = {
+            char: re.compile("|".join(alternatives), re.DOTALL)
+            for char, alternatives in by_first_char.items()
+        }
+        self._default = re.compile("|".join(leading_placeholder) or r"(?!)", re.DOTALL)
+
+    @staticmethod
+    def _literal_length(template: str) -> int:
+        """模板中文字部分的长度"""
+        return sum(len(literal) for literal, _, _, _ in Formatter().parse(template))
+
+    @staticmethod
+    def _compile_template(branch: str, template: str) -> Tuple[str, Dict[str, str]]:
+        """把一个格式串编译为正则
+
+        Returns:
+            正则字符串和占位符到分组名的映射
+        """
+        parts = []
+        groups: Dict[str, str] = {}
+        n_positional = 0
+        for literal, field_name, _, _ in Formatter().parse(template):
+            parts.append(re.escape(literal))
+            if field_name is None:
+                continue
+            if field_name == '':
+                field_name = str(n_positional)
+                n_positional += 1
+            if field_name in groups:
+                # 同一模板中重复的占位符取相同的值
+                parts.append(f"(?P={groups[field_name]})")
+            else:
+                groups[field_name] = f"{branch}_{len(groups)}"
+                parts.append(f"(?P<{groups[field_name]}>.+?)")
+        return "".join(parts), groups
+
+    def decode(self, content: str) -> Optional[ModeratorEvent]:
+        """解码一条主持人消息
+
+        Args:
+            content: 消息内容
+
+        Returns:
+            事件，不是由模板生成的消息返回None
+        """
+        pattern = self._buckets.get(content[:1], self._default)
+        match = pattern.fullmatch(content)
+        if match is None:
+            return None
+
+        event_type, name, language, winner, args = self._branches[match.lastgroup]
+        event = ModeratorEvent(event_type, name, language, winner=winner)
+        try:
+            for group, attr, converter in args:
+                value = match.group(group)
+                setattr(event, attr, converter(value) if converter else value)
+        except ValueError:
+            return None
+        return event
+
+
+_decoder: Optional[ModeratorDecoder] = None
+
+
+def get_moderator_decoder() -> ModeratorDecoder:
+    """全部智能体共享的解码器，第一次使用时编译"""
+    global _decoder
+    if _decoder is None:
+        _decoder = ModeratorDecoder()
+    return _decoder
@@ -2,9 +2,11 @@
 """响应生成器 - 负责生成符合规范的响应"""
 
 import time
+from collections.abc import AsyncGenerator
 from typing import Optional, Any, Dict
 from agentscope.message import Msg
 from agentscope.model import ChatModelBase
+from core.deadline import Deadline, ensure_deadline
 from utils.logger import WerewolfLogger
 
 
@@ -25,187 +27,139 @@ class ResponseGenerator:
         self,
         prompt_msg: Msg,
         structured_model: Optional[type] = None,
-        timeout: Optional[float] = None
+        timeout: Optional[float] = None,
+        deadline: Optional[Deadline] = None,
+        fallback: Optional[Msg] = None
     ) -> Msg:
         """生成响应（带时间和字符限制）
         
         Args:
             prompt_msg: 输入消息
             structured_model: 结构化输出模型类
-            timeout: 超时时间（秒），默认使用MAX_TIME
+            timeout: 超时时间（秒），未传入deadline时使用，默认使用MAX_TIME
+            deadline: 调用方传入的截止时间
+            fallback: 调用方已有的当前最佳答案，超时或失败时返回，
+                默认使用默认响应
             
         Returns:
-            响应消息
+            响应消息，超时时为备用的默认响应
         """
-        start_time = time.time()
-        timeout = timeout or self.MAX_TIME
+        deadline = ensure_deadline(deadline, timeout or self.MAX_TIME)
         
-        try:
-            # 检查初始时间
-            if time.time() - start_time > self.SAFETY_MARGIN_TIME:
-                return self._create_timeout_response()
-            
-            # 如果有结构化模型，使用结构化输出
+        # 预先准备备用答案，超时后直接返回
+        has_fallback = fallback is not None
+        if not has_fallback:
             if structured_model:
-                response = await self._generate_structured_response(
-                    prompt_msg,
-                    structured_model,
-                    start_time,
-                    timeout
-                )
+                fallback = self._create_default_structured_response(structured_model)
             else:
-                response = await self._generate_normal_response(
-                    prompt_msg,
-                    start_time,
-                    timeout
-                )
-            
-            # 检查响应长度
-            if response.content and len(response.content) > self.MAX_CHARS:
-                self.logger.warning(f"响应超长({len(response.content)}字符)，截断")
-                response.content = response.content[:self.MAX_CHARS - 3] + "..."
-            
-            # 最终时间检查
-            elapsed = time.time() - start_time
-            if elapsed > timeout:
-                self.logger.warning(f"响应超时({elapsed:.2f}秒)")
-                return self._create_timeout_response()
-            
-            return response
-            
-        except Exception as e:
-            self.logger.error(f"响应生成失败: {e}")
-            return self._create_error_response(str(e))
-    
-    async def _generate_structured_response(
-        self,
-        prompt_msg: Msg,
-        structured_model: type,
-        start_time: float,
-        timeout: float
-    ) -> Msg:
-        """生成结构化响应
+                fallback = self._create_timeout_response()
         
-        使用AgentScope的结构化输出机制，让框架自动处理
-        """
         try:
-            # 计算剩余时间
-            remaining_time = timeout - (time.time() - start_time) - self.SAFETY_MARGIN_TIME
-            
-            if remaining_time <= 0:
-                return self._create_timeout_response()
-            
-            # 调用模型生成结构化响应
-            # AgentScope会自动处理structured_model
+            # 为截断等收尾工作预留安全边际
             response = await self._call_model_with_timeout(
                 prompt_msg,
                 structured_model,
-                remaining_time
+                deadline.shrink(self.SAFETY_MARGIN_TIME),
+                fallback
             )
             
-            return response
-            
-        except Exception as e:
-            self.logger.error(f"结构化响应生成失败: {e}")
-            # 返回默认结构化响应
-            return self._create_default_structured_response(structured_model)
-    
-    async def _generate_normal_response(
-        self,
-        prompt_msg: Msg,
-        start_time: float,
-        timeout: float
-    ) -> Msg:
-        """生成普通响应"""
-        try:
-            # 计算剩余时间
-            remaining_time = timeout - (time.time() - start_time) - self.SAFETY_MARGIN_TIME
-            
-            if remaining_time <= 0:
-                return self._create_timeout_response()
-            
-            # 调用模型
-            response = await self._call_model_with_timeout(
-                prompt_msg,
-                None,
-                remaining_time
-            )
+            # 检查响应长度
+            if response.content and len(response.content) > self.MAX_CHARS:
+                self.logger.warning(f"响应超长({len(response.content)}字符)，截断")
+                response.content = self.truncate_content(response.content)
             
             return response
             
         except Exception as e:
-            self.logger.error(f"普通响应生成失败: {e}")
+            self.logger.error(f"响应生成失败: {e}")
+            if structured_model or has_fallback:
+                return fallback
             return self._create_error_response(str(e))
     
     async def _call_model_with_timeout(
         self,
         prompt_msg: Msg,
         structured_model: Optional[type],
-        timeout: float
+        deadline: Deadline,
+        fallback: Msg
     ) -> Msg:
         """调用模型（带超时）
         
+        模型调用在截止时间到达时被取消，返回备用答案。
         注意：AgentScope的DashScopeChatModel支持结构化输出
         当传入structured_model时，模型会返回符合该结构的数据
         """
-        try:
-            # 准备消息内容
-            if isinstance(prompt_msg, Msg):
-                content = prompt_msg.content
-            else:
-                content = str(prompt_msg)
-            
-            # 构造消息列表
-            messages = [{"role": "user", "content": content}]
-            
-            # 调用模型
-            # AgentScope的模型API会自动处理structured_model参数
-            if structured_model:
-                # 带结构化输出
-                # DashScopeChatModel支持structured_output参数
-                try:
-                    # 使用模型的generate方法
-                    model_response = await self.model(
-                        messages=messages,
-                        parse_func=structured_model,
-                        max_retries=1
-                    )
-                except Exception as model_error:
-                    self.logger.warning(f"结构化模型调用失败: {model_error}，使用默认值")
-                    # 返回默认值
-                    return self._create_default_structured_response(structured_model)
-            else:
-                # 普通输出
-                model_response = await self.model(messages=messages)
-            
-            # 构造响应消息
-            response = Msg(
-                name=self.agent_name,
-                content=str(model_response.get('content', '')) if isinstance(model_response, dict) else str(model_response),
-                role="assistant"
+        # 准备消息内容
+        if isinstance(prompt_msg, Msg):
+            content = prompt_msg.content
+        else:
+            content = str(prompt_msg)
+        
+        # 构造消息列表
+        messages = [{"role": "user", "content": content}]
+        
+        # 调用模型
+        # AgentScope的模型API会自动处理structured_model参数
+        if structured_model:
+            # 带结构化输出
+            try:
+                model_response = await deadline.run(
+                    self._invoke_model(messages, structured_model=structured_model)
+                )
+            except Exception as model_error:
+                self.logger.warning(f"结构化模型调用失败: {model_error}，使用默认值")
+                return fallback
+        else:
+            # 普通输出
+            model_response = await deadline.run(self._invoke_model(messages))
+        
+        if deadline.timed_out:
+            self.logger.warning("模型调用超时，已取消并使用备用答案")
+            return fallback
+        
+        # 构造响应消息：文本取自内容块，结构化数据在响应的metadata中
+        text, structured = self._parse_model_response(model_response)
+        response = Msg(
+            name=self.agent_name,
+            content=text,
+            role="assistant"
+        )
+        if structured_model:
+            response.metadata = structured
+        
+        return response
+    
+    def _parse_model_response(self, model_response: Any) -> tuple:
+        """从模型响应中取出文本和结构化数据
+        
+        Returns:
+            (文本, 结构化数据字典)
+        """
+        if not isinstance(model_response, dict):
+            if hasattr(model_response, 'model_dump'):
+                # Pydantic模型
+                return "", model_response.model_dump()
+            return str(model_response), {}
+        
+        # AgentScope的ChatResponse：内容是块列表，结构化输出存在metadata中
+        content = model_response.get('content', '')
+        if isinstance(content, list):
+            content = "".join(
+                block.get('text', '') for block in content
+                if isinstance(block, dict) and block.get('type') == 'text'
             )
-            
-            # 如果有结构化数据，存入metadata
-            if structured_model:
-                if response.metadata is None:
-                    response.metadata = {}
-                
-                # 从模型响应中提取结构化数据
-                if isinstance(model_response, dict):
-                    # 如果响应是字典，直接更新metadata
-                    response.metadata.update(model_response)
-                elif hasattr(model_response, 'dict'):
-                    # 如果响应是Pydantic模型
-                    response.metadata.update(model_response.dict())
-                elif hasattr(model_response, 'model_dump'):
-                    # Pydantic v2
-                    response.metadata.update(model_response.model_dump())
-            
-            return response
-            
-        except Exception as e:
-            self.logger.error(f"模型调用失败: {e}")
-            raise
+        structured = model_response.get('metadata') or {}
+        return str(content), dict(structured)
+    
+    async def _invoke_model(self, messages: list, **kwargs: Any) -> Any:
+        """调用模型并取得完整响应，流式输出时取最后一个（完整的）分块"""
+        model_response = await self.model(messages=messages, **kwargs)
+        if isinstance(model_response, AsyncGenerator):
+            last_chunk = None
+            async for chunk in model_response:
+                last_chunk = chunk
+            model_response = last_chunk
+        return model_response
     
     def _create_timeout_response(self) -> Msg:
         """创建超时响应"""
@@ -1,27 +1,44 @@
 # -*- coding: utf-8 -*-
 """策略管理器 - 负责根据角色选择和切换策略"""
 
-from typing import Dict, Optional, Any
-from strategies.base_strategy import BaseStrategy
-from strategies.werewolf_strategy import WerewolfStrategy
-from strategies.seer_strategy import SeerStrategy
-from strategies.witch_strategy import WitchStrategy
-from strategies.hunter_strategy import HunterStrategy
-from strategies.villager_strategy import VillagerStrategy
+import importlib
+import random
+from typing import Dict, Optional, Any, TYPE_CHECKING
+from models.roster import Roster
 from utils.logger import WerewolfLogger
 
+if TYPE_CHECKING:
+    from strategies.base_strategy import BaseStrategy
+
+# 角色 -> (策略模块, 策略类)，策略模块在首次用到时才导入
+STRATEGY_CLASSES = {
+    'werewolf': ('strategies.werewolf_strategy', 'WerewolfStrategy'),
+    'seer': ('strategies.seer_strategy', 'SeerStrategy'),
+    'witch': ('strategies.witch_strategy', 'WitchStrategy'),
+    'hunter': ('strategies.hunter_strategy', 'HunterStrategy'),
+    'villager': ('strategies.villager_strategy', 'VillagerStrategy')
+}
+
 
 class StrategyManager:
     """策略管理器 - 根据角色动态选择策略"""
     
-    def __init__(self, agent_name: str):
+    def __init__(
+        self,
+        agent_name: str,
+        rng: Optional[random.Random] = None,
+        roster: Optional[Roster] = None,
+    ):
         self.agent_name = agent_name
         self.logger = WerewolfLogger(agent_name)
+        self.rng = rng if rng is not None else random.Random()
+        # 存活名册，与消息处理器共用，交给每个策略
+        self.roster = roster
         self.current_role: Optional[str] = None
-        self.current_strategy: Optional[BaseStrategy] = None
+        self.current_strategy: Optional['BaseStrategy'] = None
         
         # 策略缓存（避免重复创建）
-        self._strategy_cache: Dict[str, BaseStrategy] = {}
+        self._strategy_cache: Dict[str, 'BaseStrategy'] = {}
     
     def set_role(self, role: str) -> None:
         """设置角色并切换策略
@@ -36,7 +53,7 @@ class StrategyManager:
         self.current_role = role
         self.current_strategy = self._get_strategy(role)
     
-    def _get_strategy(self, role: str) -> BaseStrategy:
+    def _get_strategy(self, role: str) -> 'BaseStrategy':
         """获取角色对应的策略
         
         Args:
@@ -49,24 +66,28 @@ class StrategyManager:
         if role in self._strategy_cache:
             return self._strategy_cache[role]
         
-        # 创建新策略实例
-        strategy_map = {
-            'werewolf': WerewolfStrategy,
-            'seer': SeerStrategy,
-            'witch': WitchStrategy,
-            'hunter': HunterStrategy,
-            'villager': VillagerStrategy
-        }
-        
-        strategy_class = strategy_map.get(role, VillagerStrategy)
-        strategy = strategy_class(self.agent_name, self.logger)
+        # 创建新策略实例（未知角色按村民处理）
+        module_name, class_name = STRATEGY_CLASSES.get(role, STRATEGY_CLASSES['villager'])
+        strategy_class = getattr(importlib.import_module(module_name), class_name)
+        strategy = strategy_class(self.agent_name, self.logger, self.rng)
+        strategy.roster = self.roster
         
         # 缓存策略
         self._strategy_cache[role] = strategy
         
         return strategy
     
-    def get_current_strategy(self) -> Optional[BaseStrategy]:
+    def set_rng(self, rng: random.Random) -> None:
+        """设置随机数生成器，并同步到已缓存的策略
+        
+        Args:
+            rng: 随机数生成器
+        """
+        self.rng = rng
+        for strategy in self._strategy_cache.values():
+            strategy.rng = rng
+    
+    def get_current_strategy(self) -> Optional['BaseStrategy']:
         """获取当前策略"""
         return self.current_strategy
     
@@ -88,6 +109,7 @@ class StrategyManager:
         """导出策略状态（用于持久化）"""
         state = {
             'current_role': self.current_role,
+            'rng_state': list(self.rng.getstate()),
             'strategies': {}
         }
         
@@ -115,11 +137,17 @@ class StrategyManager:
         
         self.current_role = state.get('current_role')
         
+        # 恢复随机数生成器，使中途恢复的对局与未中断时一致
+        if state.get('rng_state'):
+            version, internal_state, gauss_next = state['rng_state']
+            self.rng.setstate((version, tuple(internal_state), gauss_next))
+        
         # 加载每个策略的状态
         strategies_state = state.get('strategies', {})
         for role, strategy_state in strategies_state.items():
             # 先获取或创建策略实例
             strategy = self._get_strategy(role)
+            strategy.revision += 1
             
             # 恢复策略状态
             if 'strategy_state' in strategy_state:
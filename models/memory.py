@@ -164,6 +164,17 @@ class OpponentProfiler:
         # 根据行为类型更新画像
         self._analyze_action_impact(profile, action)
     
+    def record_actions(self, player_name: str, actions: List[PlayerAction]) -> None:
+        """批量记录同一玩家的多条行为，只查找和更新一次画像"""
+        profile = self.get_or_create_profile(player_name)
+        profile.actions.extend(actions)
+        profile.last_seen = actions[-1].timestamp
+        if len(profile.actions) > 50:
+            profile.actions = profile.actions[-50:]
+        
+        for action in actions:
+            self._analyze_action_impact(profile, action)
+    
     def update_role_history(self, player_name: str, role: str) -> None:
         """更新角色历史"""
         profile = self.get_or_create_profile(player_name)
@@ -263,6 +274,8 @@ class MemoryManager:
         self.profiler = OpponentProfiler()
         self.game_state = {}
         self.conversation_history = deque(maxlen=100)  # 最近100条对话
+        # 游戏状态或对话历史每次变化时递增，供依赖它们的缓存判断是否过期
+        self.revision = 0
         self.strategic_memory = {}  # 策略记忆
         self.emotional_state = {
             "confidence": 0.5,
@@ -272,6 +285,7 @@ class MemoryManager:
     
     def update_game_state(self, env_info: Dict[str, Any]) -> None:
         """更新游戏状态"""
+        self.revision += 1
         self.game_state.update(env_info)
         
         # 记录重要事件
@@ -291,6 +305,7 @@ class MemoryManager:
     
     def add_conversation(self, speaker: str, content: str, round_num: int = 0) -> None:
         """添加对话记录"""
+        self.revision += 1
         self.conversation_history.append({
             "timestamp": time.time(),
             "type": "conversation",
@@ -308,6 +323,56 @@ class MemoryManager:
         )
         self.profiler.record_action(speaker, action)
     
+    def add_conversations(self, conversations: List[Dict[str, Any]], round_num: int = 0) -> None:
+        """批量添加对话记录（一个阶段的全部消息）
+        
+        Args:
+            conversations: 对话列表，每条包含speaker和content
+            round_num: 当前轮次
+        """
+        self.update_profiles(self.record_conversations(conversations, round_num))
+    
+    def record_conversations(
+        self,
+        conversations: List[Dict[str, Any]],
+        round_num: int = 0
+    ) -> Dict[str, List[PlayerAction]]:
+        """把一个阶段的全部消息写入对话历史，不更新画像
+        
+        Args:
+            conversations: 对话列表，每条包含speaker和content
+            round_num: 当前轮次
+            
+        Returns:
+            按发言者分组的发言行动，交给update_profiles更新画像
+        """
+        self.revision += 1
+        timestamp = time.time()
+        actions_by_speaker: Dict[str, List[PlayerAction]] = defaultdict(list)
+        for conv in conversations:
+            self.conversation_history.append({
+                "timestamp": timestamp,
+                "type": "conversation",
+                "speaker": conv['speaker'],
+                "content": conv['content'],
+                "round": round_num
+            })
+            actions_by_speaker[conv['speaker']].append(PlayerAction(
+                timestamp=timestamp,
+                action_type="speak",
+                content=conv['content'],
+                round=round_num
+            ))
+        return actions_by_speaker
+    
+    def update_profiles(self, actions_by_speaker: Dict[str, List[PlayerAction]]) -> None:
+        """按发言行动更新画像，每个发言者的画像只更新一次"""
+        if not actions_by_speaker:
+            return
+        self.revision += 1
+        for speaker, actions in actions_by_speaker.items():
+            self.profiler.record_actions(speaker, actions)
+    
     def get_recent_conversations(self, count: int = 10) -> List[Dict[str, Any]]:
         """获取最近的对话"""
         return list(self.conversation_history)[-count:] if self.conversation_history else []
@@ -343,6 +408,7 @@ class MemoryManager:
     
     def import_memory(self, data: Dict[str, Any]) -> None:
         """导入记忆数据"""
+        self.revision += 1
         if "profiler" in data:
             self.profiler.import_profiles(data["profiler"])
         
@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 """推理模型模块 - 完整实现"""
 
+import random
 from dataclasses import dataclass, field
 from typing import Dict, List, Any, Optional
 from enum import Enum
@@ -371,6 +372,8 @@ class HunterReasoning(RoleSpecificReasoning):
     shot_strategy: str = "strategic"  # strategic, revenge, random
     shot_targets: List[str] = field(default_factory=list)
     death_trigger: str = "unknown"  # vote, kill, poison
+    # 随机开枪时使用的随机数生成器，由策略注入，便于按种子复现对局
+    rng: random.Random = field(default_factory=random.Random, repr=False, compare=False)
     
     def __post_init__(self):
         """初始化后处理"""
@@ -404,10 +407,9 @@ class HunterReasoning(RoleSpecificReasoning):
             if self.enemies:
                 return self.enemies[0]
         else:  # random
-            import random
             all_players = self.allies + self.enemies + self.neutral_players
             if all_players:
-                return random.choice(all_players)
+                return self.rng.choice(all_players)
         
         return None
     
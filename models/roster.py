@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+"""存活名册 - 智能体对全部玩家存活状态的权威记录
+
+名册由主持人的开局公告（全部玩家）建立，之后按死讯、放逐、猎人带走等公告
+以及主持人给出的存活玩家列表更新。每个玩家按座位（开局公告中的顺序）编号，
+存活判断是O(1)的字典查找；存活玩家列表按座位顺序排列，只在变化之后第一次
+读取时重建。消息处理器、策略、记忆和思维链构建共用同一个名册。
+"""
+
+from typing import Dict, Iterable, Iterator, List, Optional
+
+
+class Roster:
+    """存活名册 - 按座位索引的玩家存活状态"""
+
+    def __init__(self):
+        # 座位顺序的全部玩家，玩家名 -> 座位
+        self._players: List[str] = []
+        self._seats: Dict[str, int] = {}
+        # 存活玩家（只作集合用），死亡玩家按死亡顺序。列表在变化时整体替换，
+        # 已经交给调用方的列表不会被修改
+        self._alive: Dict[str, None] = {}
+        self._dead: List[str] = []
+
+        # 按座位排列的存活玩家，以及排除某个玩家后的存活玩家，变化后重建
+        self._alive_list: Optional[List[str]] = None
+        self._others: Dict[str, List[str]] = {}
+
+        # 名册每次变化时递增，供依赖它的缓存判断是否过期
+        self.revision = 0
+
+    def start(self, players: Iterable[str]) -> None:
+        """新的一局开始，全部玩家存活
+
+        Args:
+            players: 开局公告中的全部玩家
+        """
+        self._players = []
+        self._seats = {}
+        self._alive = {}
+        self._dead = []
+        for player in players:
+            self._add(player)
+        self._changed()
+
+    def _add(self, player: str) -> None:
+        """为新玩家分配座位，新玩家存活"""
+        self._seats[player] = len(self._players)
+        self._players = [*self._players, player]
+        self._alive[player] = None
+
+    def _changed(self) -> None:
+        """名册变化，清空按存活状态缓存的列表"""
+        self._alive_list = None
+        self._others = {}
+        self.revision += 1
+
+    def mark_dead(self, player: str) -> bool:
+        """记录一名玩家死亡
+
+        Args:
+            player: 死亡的玩家
+
+        Returns:
+            名册是否因此变化
+        """
+        if player not in self._seats:
+            self._add(player)
+        elif player not in self._alive:
+            return False
+        del self._alive[player]
+        self._dead = [*self._dead, player]
+        self._changed()
+        return True
+
+    def sync_alive(self, players: Iterable[str]) -> bool:
+        """按主持人给出的存活玩家列表校正名册
+
+        Args:
+            players: 当前全部存活玩家
+
+        Returns:
+            名册是否因此变化
+        """
+        alive = dict.fromkeys(players)
+        changed = False
+        for player in alive:
+            if player not in self._seats:
+                self._add(player)
+                changed = True
+            elif player not in self._alive:
+                # 主持人的列表是权威的，例如加载了过期的状态
+                self._alive[player] = None
+                self._dead = [p for p in self._dead if p != player]
+                changed = True
+        for player in list(self._alive):
+            if player not in alive:
+                del self._alive[player]
+                self._dead = [*self._dead, player]
+                changed = True
+        if changed:
+            self._changed()
+        return changed
+
+    def restore(
+        self,
+        alive_players: Iterable[str],
+        dead_players: Iterable[str],
+        players: Iterable[str] = (),
+    ) -> None:
+        """从保存的玩家列表恢复名册
+
+        Args:
+            alive_players: 存活玩家
+            dead_players: 死亡顺序的死亡玩家
+            players: 座位顺序的全部玩家，没有时按存活、死亡玩家的顺序排座位
+        """
+        self._players = []
+        self._seats = {}
+        self._alive = {}
+        self._dead = []
+        for player in [*players, *alive_players, *dead_players]:
+            if player not in self._seats:
+                self._add(player)
+        for player in dead_players:
+            if player in self._alive:
+                del self._alive[player]
+                self._dead.append(player)
+        self._changed()
+
+    def knows(self, player: str) -> bool:
+        """玩家是否在名册中"""
+        return player in self._seats
+
+    def is_alive(self, player: str) -> bool:
+        """玩家是否存活"""
+        return player in self._alive
+
+    def __contains__(self, player: object) -> bool:
+        return player in self._alive
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.alive_players)
+
+    def __len__(self) -> int:
+        return len(self._alive)
+
+    @property
+    def players(self) -> List[str]:
+        """座位顺序的全部玩家"""
+        return self._players
+
+    @property
+    def alive_players(self) -> List[str]:
+        """座位顺序的存活玩家"""
+        if self._alive_list is None:
+            self._alive_list = sorted(self._alive, key=self._seats.__getitem__)
+        return self._alive_list
+
+    @property
+    def dead_players(self) -> List[str]:
+        """死亡顺序的死亡玩家"""
+        return self._dead
+
+    def others(self, player: str) -> List[str]:
+        """除某个玩家（通常是自己）之外的存活玩家"""
+        others = self._others.get(player)
+        if others is None:
+            others = [p for p in self.alive_players if p != player]
+            self._others[player] = others
+        return others
@@ -3,10 +3,15 @@
 基于比赛要求实现BaseModel，确保与AgentScope完全兼容
 """
 
-from typing import Literal, Optional, List, Dict, Any
+import copy
+from functools import lru_cache
+from typing import Literal, Optional, List, Dict, Any, Tuple
 from pydantic import BaseModel, Field
 from abc import ABC, abstractmethod
 
+# 动态模型的缓存数量（按存活玩家名称元组缓存，每局玩家顺序不同，需限制大小）
+MODEL_CACHE_SIZE = 256
+
 
 class BaseStructuredModel(BaseModel, ABC):
     """基础结构化模型类
@@ -45,6 +50,19 @@ class BaseStructuredModel(BaseModel, ABC):
         except AttributeError:
             # 兼容旧版本pydantic
             return self.dict(**kwargs)
+    
+    @classmethod
+    def model_json_schema(cls, *args, **kwargs) -> Dict[str, Any]:
+        """生成JSON Schema（默认参数时只生成一次，返回副本以免调用方修改缓存）"""
+        if args or kwargs:
+            return super().model_json_schema(*args, **kwargs)
+        return copy.deepcopy(_default_json_schema(cls))
+
+
+@lru_cache(maxsize=4 * MODEL_CACHE_SIZE)
+def _default_json_schema(model: type) -> Dict[str, Any]:
+    """按默认参数生成模型的JSON Schema"""
+    return super(BaseStructuredModel, model).model_json_schema()
 
 
 class DiscussionModel(BaseStructuredModel):
@@ -293,6 +311,180 @@ class DaySpeechModel(BaseStructuredModel):
         )
 
 
+@lru_cache(maxsize=MODEL_CACHE_SIZE)
+def _create_vote_model(valid_players: Tuple[str, ...]) -> type[BaseModel]:
+    """创建投票模型"""
+    class DynamicVoteModel(BaseStructuredModel):
+        vote: Literal[tuple(valid_players)] = Field(  # type: ignore
+            description="投票的目标玩家名称",
+            default=valid_players[0] if valid_players else ""
+        )
+
+        reason: str = Field(
+            description="投票理由",
+            default=""
+        )
+
+        def to_dict(self) -> Dict[str, Any]:
+            """转换为字典"""
+            return {
+                "vote": self.vote,
+                "reason": self.reason
+            }
+
+        @classmethod
+        def from_dict(cls, data: Dict[str, Any]) -> "DynamicVoteModel":
+            """从字典创建实例"""
+            return cls(
+                vote=data.get("vote", valid_players[0] if valid_players else ""),
+                reason=data.get("reason", "")
+            )
+
+    return DynamicVoteModel
+
+
+@lru_cache(maxsize=MODEL_CACHE_SIZE)
+def _create_witch_poison_model(valid_players: Tuple[str, ...]) -> type[BaseModel]:
+    """创建女巫毒药模型"""
+    class DynamicWitchPoisonModel(BaseStructuredModel):
+        poison: bool = Field(
+            description="是否使用毒药",
+            default=False
+        )
+
+        target: Optional[Literal[tuple(valid_players)]] = Field(  # type: ignore
+            description="毒药的目标玩家名称，如果不使用毒药则为None",
+            default=None
+        )
+
+        reason: str = Field(
+            description="使用/不使用毒药的决定理由",
+            default=""
+        )
+
+        def to_dict(self) -> Dict[str, Any]:
+            """转换为字典"""
+            return {
+                "poison": self.poison,
+                "target": self.target,
+                "reason": self.reason
+            }
+
+        @classmethod
+        def from_dict(cls, data: Dict[str, Any]) -> "DynamicWitchPoisonModel":
+            """从字典创建实例"""
+            return cls(
+                poison=data.get("poison", False),
+                target=data.get("target"),
+                reason=data.get("reason", "")
+            )
+
+    return DynamicWitchPoisonModel
+
+
+@lru_cache(maxsize=MODEL_CACHE_SIZE)
+def _create_seer_model(valid_players: Tuple[str, ...]) -> type[BaseModel]:
+    """创建预言家模型"""
+    class DynamicSeerModel(BaseStructuredModel):
+        check: Literal[tuple(valid_players)] = Field(  # type: ignore
+            description="查验的目标玩家名称",
+            default=valid_players[0] if valid_players else ""
+        )
+
+        reason: str = Field(
+            description="选择该玩家的理由",
+            default=""
+        )
+
+        def to_dict(self) -> Dict[str, Any]:
+            """转换为字典"""
+            return {
+                "check": self.check,
+                "reason": self.reason
+            }
+
+        @classmethod
+        def from_dict(cls, data: Dict[str, Any]) -> "DynamicSeerModel":
+            """从字典创建实例"""
+            return cls(
+                check=data.get("check", valid_players[0] if valid_players else ""),
+                reason=data.get("reason", "")
+            )
+
+    return DynamicSeerModel
+
+
+@lru_cache(maxsize=MODEL_CACHE_SIZE)
+def _create_hunter_model(valid_players: Tuple[str, ...]) -> type[BaseModel]:
+    """创建猎人模型"""
+    class DynamicHunterModel(BaseStructuredModel):
+        shoot: bool = Field(
+            description="是否开枪",
+            default=False
+        )
+
+        target: Optional[Literal[tuple(valid_players)]] = Field(  # type: ignore
+            description="开枪的目标玩家名称，如果不开枪则为None",
+            default=None
+        )
+
+        reason: str = Field(
+            description="开枪/不开枪的决定理由",
+            default=""
+        )
+
+        def to_dict(self) -> Dict[str, Any]:
+            """转换为字典"""
+            return {
+                "shoot": self.shoot,
+                "target": self.target,
+                "reason": self.reason
+            }
+
+        @classmethod
+        def from_dict(cls, data: Dict[str, Any]) -> "DynamicHunterModel":
+            """从字典创建实例"""
+            return cls(
+                shoot=data.get("shoot", False),
+                target=data.get("target"),
+                reason=data.get("reason", "")
+            )
+
+    return DynamicHunterModel
+
+
+@lru_cache(maxsize=MODEL_CACHE_SIZE)
+def _create_werewolf_kill_model(valid_players: Tuple[str, ...]) -> type[BaseModel]:
+    """创建狼人击杀模型"""
+    class DynamicWerewolfKillModel(BaseStructuredModel):
+        target: Literal[tuple(valid_players)] = Field(  # type: ignore
+            description="击杀的目标玩家名称",
+            default=valid_players[0] if valid_players else ""
+        )
+
+        reason: str = Field(
+            description="选择该玩家的理由",
+            default=""
+        )
+
+        def to_dict(self) -> Dict[str, Any]:
+            """转换为字典"""
+            return {
+                "target": self.target,
+                "reason": self.reason
+            }
+
+        @classmethod
+        def from_dict(cls, data: Dict[str, Any]) -> "DynamicWerewolfKillModel":
+            """从字典创建实例"""
+            return cls(
+                target=data.get("target", valid_players[0] if valid_players else ""),
+                reason=data.get("reason", "")
+            )
+
+    return DynamicWerewolfKillModel
+
+
 class StructuredModelFactory:
     """结构化模型工厂类"""
     
@@ -303,35 +495,9 @@ class StructuredModelFactory:
     
     @staticmethod
     def create_vote_model(valid_players: List[str]) -> type[BaseModel]:
-        """创建投票模型"""
-        class DynamicVoteModel(BaseStructuredModel):
-            vote: Literal[tuple(valid_players)] = Field(  # type: ignore
-                description="投票的目标玩家名称",
-                default=valid_players[0] if valid_players else ""
-            )
-            
-            reason: str = Field(
-                description="投票理由",
-                default=""
-            )
-            
-            def to_dict(self) -> Dict[str, Any]:
-                """转换为字典"""
-                return {
-                    "vote": self.vote,
-                    "reason": self.reason
-                }
-            
-            @classmethod
-            def from_dict(cls, data: Dict[str, Any]) -> "DynamicVoteModel":
-                """从字典创建实例"""
-                return cls(
-                    vote=data.get("vote", valid_players[0] if valid_players else ""),
-                    reason=data.get("reason", "")
-                )
-        
-        return DynamicVoteModel
-    
+        """创建投票模型（按玩家名称缓存）"""
+        return _create_vote_model(tuple(valid_players))
+
     @staticmethod
     def create_witch_resurrect_model() -> type[BaseModel]:
         """创建女巫复活模型"""
@@ -339,142 +505,24 @@ class StructuredModelFactory:
     
     @staticmethod
     def create_witch_poison_model(valid_players: List[str]) -> type[BaseModel]:
-        """创建女巫毒药模型"""
-        class DynamicWitchPoisonModel(BaseStructuredModel):
-            poison: bool = Field(
-                description="是否使用毒药",
-                default=False
-            )
-            
-            target: Optional[Literal[tuple(valid_players)]] = Field(  # type: ignore
-                description="毒药的目标玩家名称，如果不使用毒药则为None",
-                default=None
-            )
-            
-            reason: str = Field(
-                description="使用/不使用毒药的决定理由",
-                default=""
-            )
-            
-            def to_dict(self) -> Dict[str, Any]:
-                """转换为字典"""
-                return {
-                    "poison": self.poison,
-                    "target": self.target,
-                    "reason": self.reason
-                }
-            
-            @classmethod
-            def from_dict(cls, data: Dict[str, Any]) -> "DynamicWitchPoisonModel":
-                """从字典创建实例"""
-                return cls(
-                    poison=data.get("poison", False),
-                    target=data.get("target"),
-                    reason=data.get("reason", "")
-                )
-        
-        return DynamicWitchPoisonModel
-    
+        """创建女巫毒药模型（按玩家名称缓存）"""
+        return _create_witch_poison_model(tuple(valid_players))
+
     @staticmethod
     def create_seer_model(valid_players: List[str]) -> type[BaseModel]:
-        """创建预言家模型"""
-        class DynamicSeerModel(BaseStructuredModel):
-            check: Literal[tuple(valid_players)] = Field(  # type: ignore
-                description="查验的目标玩家名称",
-                default=valid_players[0] if valid_players else ""
-            )
-            
-            reason: str = Field(
-                description="选择该玩家的理由",
-                default=""
-            )
-            
-            def to_dict(self) -> Dict[str, Any]:
-                """转换为字典"""
-                return {
-                    "check": self.check,
-                    "reason": self.reason
-                }
-            
-            @classmethod
-            def from_dict(cls, data: Dict[str, Any]) -> "DynamicSeerModel":
-                """从字典创建实例"""
-                return cls(
-                    check=data.get("check", valid_players[0] if valid_players else ""),
-                    reason=data.get("reason", "")
-                )
-        
-        return DynamicSeerModel
-    
+        """创建预言家模型（按玩家名称缓存）"""
+        return _create_seer_model(tuple(valid_players))
+
     @staticmethod
     def create_hunter_model(valid_players: List[str]) -> type[BaseModel]:
-        """创建猎人模型"""
-        class DynamicHunterModel(BaseStructuredModel):
-            shoot: bool = Field(
-                description="是否开枪",
-                default=False
-            )
-            
-            target: Optional[Literal[tuple(valid_players)]] = Field(  # type: ignore
-                description="开枪的目标玩家名称，如果不开枪则为None",
-                default=None
-            )
-            
-            reason: str = Field(
-                description="开枪/不开枪的决定理由",
-                default=""
-            )
-            
-            def to_dict(self) -> Dict[str, Any]:
-                """转换为字典"""
-                return {
-                    "shoot": self.shoot,
-                    "target": self.target,
-                    "reason": self.reason
-                }
-            
-            @classmethod
-            def from_dict(cls, data: Dict[str, Any]) -> "DynamicHunterModel":
-                """从字典创建实例"""
-                return cls(
-                    shoot=data.get("shoot", False),
-                    target=data.get("target"),
-                    reason=data.get("reason", "")
-                )
-        
-        return DynamicHunterModel
-    
+        """创建猎人模型（按玩家名称缓存）"""
+        return _create_hunter_model(tuple(valid_players))
+
     @staticmethod
     def create_werewolf_kill_model(valid_players: List[str]) -> type[BaseModel]:
-        """创建狼人击杀模型"""
-        class DynamicWerewolfKillModel(BaseStructuredModel):
-            target: Literal[tuple(valid_players)] = Field(  # type: ignore
-                description="击杀的目标玩家名称",
-                default=valid_players[0] if valid_players else ""
-            )
-            
-            reason: str = Field(
-                description="选择该玩家的理由",
-                default=""
-            )
-            
-            def to_dict(self) -> Dict[str, Any]:
-                """转换为字典"""
-                return {
-                    "target": self.target,
-                    "reason": self.reason
-                }
-            
-            @classmethod
-            def from_dict(cls, data: Dict[str, Any]) -> "DynamicWerewolfKillModel":
-                """从字典创建实例"""
-                return cls(
-                    target=data.get("target", valid_players[0] if valid_players else ""),
-                    reason=data.get("reason", "")
-                )
-        
-        return DynamicWerewolfKillModel
-    
+        """创建狼人击杀模型（按玩家名称缓存）"""
+        return _create_werewolf_kill_model(tuple(valid_players))
+
     @staticmethod
     def create_day_speech_model() -> type[BaseModel]:
         """创建白天发言模型"""
@@ -1,12 +1,19 @@
 # -*- coding: utf-8 -*-
-"""策略模块"""
+"""策略模块
 
-from .base_strategy import BaseStrategy
-from .werewolf_strategy import WerewolfStrategy
-from .seer_strategy import SeerStrategy
-from .witch_strategy import WitchStrategy
-from .hunter_strategy import HunterStrategy
-from .villager_strategy import VillagerStrategy
+各角色的策略模块在首次访问时才导入，智能体只加载自己角色用到的策略。
+"""
+
+import importlib
+
+_LAZY_ATTRS = {
+    'BaseStrategy': '.base_strategy',
+    'WerewolfStrategy': '.werewolf_strategy',
+    'SeerStrategy': '.seer_strategy',
+    'WitchStrategy': '.witch_strategy',
+    'HunterStrategy': '.hunter_strategy',
+    'VillagerStrategy': '.villager_strategy',
+}
 
 __all__ = [
     'BaseStrategy',
@@ -15,4 +22,12 @@ __all__ = [
     'WitchStrategy',
     'HunterStrategy',
     'VillagerStrategy'
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name: str):
+    """按需导入策略类"""
+    if name in _LAZY_ATTRS:
+        module = importlib.import_module(_LAZY_ATTRS[name], __name__)
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 """策略基类模块"""
 
+import random
 from abc import ABC, abstractmethod
 from typing import Dict, List, Any, Optional
 from agentscope.message import Msg
@@ -11,24 +12,39 @@ from models.reasoning import (
     StrategicPlan,
     RoleSpecificReasoning
 )
+from models.roster import Roster
 from utils.logger import WerewolfLogger
 
 
 class BaseStrategy(ABC):
     """策略基类"""
     
-    def __init__(self, agent_name: str, logger: WerewolfLogger):
+    # 策略中的人数阈值（存活人数、残局判断等）按这个人数的对局设定
+    BASE_PLAYER_COUNT = 9
+    
+    def __init__(
+        self,
+        agent_name: str,
+        logger: WerewolfLogger,
+        rng: Optional[random.Random] = None,
+    ):
         """初始化策略
         
         Args:
             agent_name: 智能体名称
             logger: 日志器
+            rng: 随机数生成器，所有随机选择都由它产生，便于按种子复现对局
         """
         self.agent_name = agent_name
         self.logger = logger
+        self.rng = rng if rng is not None else random.Random()
         self.current_observation: Optional[GameObservation] = None
+        # 存活名册，由策略管理器设置；名册建立之后存活判断以它为准
+        self.roster: Optional[Roster] = None
         self.player_info: Dict[str, PlayerInfo] = {}
         self.strategy_state: Dict[str, Any] = {}
+        # 玩家信息或策略状态每次变化时递增，供依赖它们的缓存判断是否过期
+        self.revision = 0
         
     @abstractmethod
     def get_role_name(self) -> str:
@@ -67,6 +83,7 @@ class BaseStrategy(ABC):
     
     def _update_player_info(self, observation: GameObservation) -> None:
         """更新玩家信息"""
+        self.revision += 1
         # 更新存活玩家信息
         for player_name in observation.alive_players:
             if player_name not in self.player_info:
@@ -87,18 +104,76 @@ class BaseStrategy(ABC):
             if player_name in self.player_info:
                 self.player_info[player_name].status = "dead"
     
+    def record_votes(
+        self,
+        voters: List[str],
+        targets: List[str],
+        matrix: List[List[int]]
+    ) -> None:
+        """记录一次投票结果
+        
+        Args:
+            voters: 投票人列表（矩阵的行）
+            targets: 被投票人列表（矩阵的列）
+            matrix: 投票矩阵，matrix[i][j]为1表示voters[i]投给了targets[j]
+        """
+        self.revision += 1
+        for voter, row in zip(voters, matrix):
+            if voter not in self.player_info:
+                self.player_info[voter] = PlayerInfo(name=voter, status="alive")
+            for target, count in zip(targets, row):
+                if count:
+                    self.player_info[voter].add_vote(target)
+    
+    def _has_roster(self) -> bool:
+        """名册是否已经建立"""
+        return self.roster is not None and bool(self.roster.players)
+    
     def get_alive_players(self) -> List[str]:
-        """获取存活玩家列表"""
+        """获取存活玩家列表（不含自己）"""
+        if self._has_roster():
+            return self.roster.others(self.agent_name)
         if not self.current_observation:
             return []
         return [p for p in self.current_observation.alive_players if p != self.agent_name]
     
     def get_dead_players(self) -> List[str]:
         """获取死亡玩家列表"""
+        if self._has_roster():
+            return self.roster.dead_players
         if not self.current_observation:
             return []
         return self.current_observation.dead_players
     
+    def is_alive(self, player_name: str) -> bool:
+        """其他玩家是否存活（自己不算）"""
+        if self._has_roster():
+            return player_name != self.agent_name and self.roster.is_alive(player_name)
+        return player_name in self.get_alive_players()
+    
+    def get_total_players(self) -> int:
+        """本局的总人数（含死亡玩家），尚未知道时按基准人数计"""
+        if self._has_roster():
+            return len(self.roster.players)
+        if self.current_observation:
+            total = len(self.current_observation.alive_players) + len(self.current_observation.dead_players)
+            if total:
+                return total
+        return self.BASE_PLAYER_COUNT
+    
+    def scale_threshold(self, threshold: int) -> int:
+        """把按基准人数设定的人数阈值按本局总人数等比放大
+        
+        人数少于基准时不缩小阈值，小局本来就接近残局。
+        
+        Args:
+            threshold: 基准人数对局中的阈值
+            
+        Returns:
+            本局使用的阈值
+        """
+        return max(threshold, self.get_total_players() * threshold // self.BASE_PLAYER_COUNT)
+    
     def get_player_info(self, player_name: str) -> Optional[PlayerInfo]:
         """获取玩家信息"""
         return self.player_info.get(player_name)
@@ -109,6 +184,7 @@ class BaseStrategy(ABC):
             old_score = self.player_info[player_name].trust_score
             new_score = max(0.0, min(1.0, old_score + score_change))
             self.player_info[player_name].trust_score = new_score
+            self.revision += 1
             
             self.logger.debug(f"更新信任分数: {player_name} {old_score:.2f}->{new_score:.2f}")
     
@@ -118,16 +194,16 @@ class BaseStrategy(ABC):
             old_level = self.player_info[player_name].suspicion_level
             new_level = max(0.0, min(1.0, old_level + level_change))
             self.player_info[player_name].suspicion_level = new_level
+            self.revision += 1
             
             self.logger.debug(f"更新可疑程度: {player_name} {old_level:.2f}->{new_level:.2f}")
     
     def get_most_suspicious_players(self, count: int = 3) -> List[str]:
         """获取最可疑的玩家"""
-        alive_players = self.get_alive_players()
         suspicious_players = [
             (name, info.suspicion_level) 
             for name, info in self.player_info.items() 
-            if name in alive_players
+            if self.is_alive(name)
         ]
         
         # 按可疑程度排序
@@ -136,11 +212,10 @@ class BaseStrategy(ABC):
     
     def get_most_trusted_players(self, count: int = 3) -> List[str]:
         """获取最可信的玩家"""
-        alive_players = self.get_alive_players()
         trusted_players = [
             (name, info.trust_score) 
             for name, info in self.player_info.items() 
-            if name in alive_players
+            if self.is_alive(name)
         ]
         
         # 按信任分数排序
@@ -180,7 +255,7 @@ class BaseStrategy(ABC):
         
         # 根据玩家数量调整
         alive_count = len(self.get_alive_players())
-        if alive_count <= 4:
+        if alive_count <= self.scale_threshold(4):
             risk += 0.2  # 玩家少时风险更高
         
         return max(0.0, min(1.0, risk))
@@ -226,7 +301,7 @@ class BaseStrategy(ABC):
         alive_count = len(observation.alive_players)
         
         # 如果存活玩家很少，采取紧急策略
-        if alive_count <= 4:
+        if alive_count <= self.scale_threshold(4):
             return self._emergency_strategy(observation)
         
         return None
@@ -247,8 +322,7 @@ class BaseStrategy(ABC):
         # 如果没有可疑玩家，随机选择
         alive_players = self.get_alive_players()
         if alive_players:
-            import random
-            target = random.choice(alive_players)
+            target = self.rng.choice(alive_players)
             return self.create_action_decision(
                 action_type="vote",
                 target=target,
@@ -16,8 +16,13 @@ from utils.logger import WerewolfLogger
 class HunterStrategy(BaseStrategy):
     """猎人策略实现"""
     
-    def __init__(self, agent_name: str, logger: WerewolfLogger):
-        super().__init__(agent_name, logger)
+    def __init__(
+        self,
+        agent_name: str,
+        logger: WerewolfLogger,
+        rng: Optional[random.Random] = None,
+    ):
+        super().__init__(agent_name, logger, rng)
         
         # 猎人特有状态
         self.strategy_state.update({
@@ -84,7 +89,7 @@ class HunterStrategy(BaseStrategy):
         # 默认投票
         alive_players = self.get_alive_players()
         if alive_players:
-            target = random.choice(alive_players)
+            target = self.rng.choice(alive_players)
             return self.create_action_decision(
                 action_type="vote",
                 target=target,
@@ -129,7 +134,8 @@ class HunterStrategy(BaseStrategy):
             shot_target=self._select_shot_target(),
             death_timing=death_timing,
             threat_elimination=threat_elimination,
-            legacy_planning=legacy_planning
+            legacy_planning=legacy_planning,
+            rng=self.rng
         )
     
     def _select_shot_target(self) -> Optional[str]:
@@ -199,7 +205,7 @@ class HunterStrategy(BaseStrategy):
         alive_count = len(self.get_alive_players())
         
         # 如果存活玩家很少，立即死亡
-        if alive_count <= 4:
+        if alive_count <= self.scale_threshold(4):
             return "immediate"
         # 如果有明确威胁，策略性死亡
         elif self.strategy_state['threat_elimination_priority']:
@@ -229,7 +235,7 @@ class HunterStrategy(BaseStrategy):
     
     def _assess_overall_situation(self, alive_players: List[str], dead_players: List[str]) -> str:
         """评估整体局势"""
-        if len(alive_players) <= 4:
+        if len(alive_players) <= self.scale_threshold(4):
             return "critical_phase"
         elif len(self.strategy_state['threat_elimination_priority']) >= 2:
             return "high_threat_situation"
@@ -277,7 +283,7 @@ class HunterStrategy(BaseStrategy):
             "我会在关键时刻采取行动。",
             "请大家仔细分析投票模式。"
         ]
-        return random.choice(speeches)
+        return self.rng.choice(speeches)
     
     def _strategic_timing_speech(self, reasoning: HunterReasoning) -> str:
         """策略时机发言"""
@@ -287,7 +293,7 @@ class HunterStrategy(BaseStrategy):
             "某些玩家的行为模式值得注意。",
             "我会根据局势发展做出决定。"
         ]
-        return random.choice(speeches)
+        return self.rng.choice(speeches)
     
     def _conservative_speech(self, reasoning: HunterReasoning) -> str:
         """保守发言"""
@@ -297,7 +303,7 @@ class HunterStrategy(BaseStrategy):
             "建议大家理性分析，避免盲目投票。",
             "我会基于证据做出判断。"
         ]
-        return random.choice(speeches)
+        return self.rng.choice(speeches)
     
     def trigger_death(self) -> Optional[ActionDecision]:
         """触发死亡并开枪"""
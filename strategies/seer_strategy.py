@@ -16,8 +16,13 @@ from utils.logger import WerewolfLogger
 class SeerStrategy(BaseStrategy):
     """先知策略实现"""
     
-    def __init__(self, agent_name: str, logger: WerewolfLogger):
-        super().__init__(agent_name, logger)
+    def __init__(
+        self,
+        agent_name: str,
+        logger: WerewolfLogger,
+        rng: Optional[random.Random] = None,
+    ):
+        super().__init__(agent_name, logger, rng)
         
         # 先知特有状态
         self.strategy_state.update({
@@ -99,7 +104,7 @@ class SeerStrategy(BaseStrategy):
         # 默认投票
         alive_players = self.get_alive_players()
         if alive_players:
-            target = random.choice(alive_players)
+            target = self.rng.choice(alive_players)
             return self.create_action_decision(
                 action_type="vote",
                 target=target,
@@ -176,7 +181,7 @@ class SeerStrategy(BaseStrategy):
             score += (1.0 - player_info.trust_score) * 0.3
             
             # 随机因素
-            score += random.random() * 0.1
+            score += self.rng.random() * 0.1
             
             target_scores[player] = score
         
@@ -184,7 +189,7 @@ class SeerStrategy(BaseStrategy):
             best_target = max(target_scores, key=target_scores.get)
             return best_target
         
-        return random.choice(unchecked_players) if unchecked_players else None
+        return self.rng.choice(unchecked_players) if unchecked_players else None
     
     def _should_reveal_identity(self, reasoning: SeerReasoning) -> bool:
         """判断是否应该暴露身份"""
@@ -194,7 +199,7 @@ class SeerStrategy(BaseStrategy):
         
         # 如果存活玩家很少，应该暴露身份
         alive_count = len(self.get_alive_players())
-        if alive_count <= 5:
+        if alive_count <= self.scale_threshold(5):
             return True
         
         # 如果可信度很低，不应该暴露身份
@@ -235,7 +240,7 @@ class SeerStrategy(BaseStrategy):
             "建议大家仔细观察投票模式。",
             "我会基于证据做出判断，而不是盲目跟风。"
         ]
-        return random.choice(speeches)
+        return self.rng.choice(speeches)
     
     def _select_werewolf_target(self) -> Optional[str]:
         """选择狼人投票目标"""
@@ -301,7 +306,7 @@ class SeerStrategy(BaseStrategy):
             return "critical_werewolf_threat"
         elif good_count >= 3:
             return "strong_good_position"
-        elif len(alive_players) <= 5:
+        elif len(alive_players) <= self.scale_threshold(5):
             return "late_game_critical"
         else:
             return "information_gathering_phase"
@@ -332,6 +337,7 @@ class SeerStrategy(BaseStrategy):
     
     def record_check_result(self, target: str, result: str) -> None:
         """记录查验结果"""
+        self.revision += 1
         if target not in self.strategy_state['checked_players']:
             self.strategy_state['checked_players'].append(target)
         
@@ -16,8 +16,13 @@ from utils.logger import WerewolfLogger
 class VillagerStrategy(BaseStrategy):
     """村民策略实现"""
     
-    def __init__(self, agent_name: str, logger: WerewolfLogger):
-        super().__init__(agent_name, logger)
+    def __init__(
+        self,
+        agent_name: str,
+        logger: WerewolfLogger,
+        rng: Optional[random.Random] = None,
+    ):
+        super().__init__(agent_name, logger, rng)
         
         # 村民特有状态
         self.strategy_state.update({
@@ -107,7 +112,7 @@ class VillagerStrategy(BaseStrategy):
         # 根据游戏阶段调整分析重点
         alive_count = len(self.get_alive_players())
         
-        if alive_count <= 5:
+        if alive_count <= self.scale_threshold(5):
             return "voting"  # 关键时刻重点关注投票
         elif len(self.strategy_state['suspected_werewolves']) >= 2:
             return "logical"  # 有多个可疑目标时重点逻辑分析
@@ -127,7 +132,7 @@ class VillagerStrategy(BaseStrategy):
         """规划信息收集策略"""
         if len(self.strategy_state['trusted_players']) >= 2:
             return "focused_information"
-        elif len(self.get_alive_players()) <= 6:
+        elif len(self.get_alive_players()) <= self.scale_threshold(6):
             return "intensive_gathering"
         else:
             return "passive_observation"
@@ -143,7 +148,7 @@ class VillagerStrategy(BaseStrategy):
     
     def _assess_overall_situation(self, alive_players: List[str], dead_players: List[str]) -> str:
         """评估整体局势"""
-        if len(alive_players) <= 4:
+        if len(alive_players) <= self.scale_threshold(4):
             return "critical_phase"
         elif len(self.strategy_state['suspected_werewolves']) >= 3:
             return "high_suspicion_phase"
@@ -194,7 +199,7 @@ class VillagerStrategy(BaseStrategy):
             "我注意到投票模式中的一些异常，需要大家注意。",
             "让我们用逻辑推理来找出狼人，而不是凭感觉。"
         ]
-        return random.choice(speeches)
+        return self.rng.choice(speeches)
     
     def _behavioral_analysis_speech(self, reasoning: VillagerReasoning) -> str:
         """行为分析发言"""
@@ -204,7 +209,7 @@ class VillagerStrategy(BaseStrategy):
             "我注意到某些玩家在关键时刻的异常反应。",
             "行为分析往往能揭示隐藏的信息。"
         ]
-        return random.choice(speeches)
+        return self.rng.choice(speeches)
     
     def _voting_analysis_speech(self, reasoning: VillagerReasoning) -> str:
         """投票分析发言"""
@@ -214,7 +219,7 @@ class VillagerStrategy(BaseStrategy):
             "投票倾向分析可以帮助我们识别狼人。",
             "让我们回顾一下之前的投票结果。"
         ]
-        return random.choice(speeches)
+        return self.rng.choice(speeches)
     
     def _general_analysis_speech(self, reasoning: VillagerReasoning) -> str:
         """一般分析发言"""
@@ -224,7 +229,7 @@ class VillagerStrategy(BaseStrategy):
             "建议大家理性分析，避免被误导。",
             "我会基于证据做出判断。"
         ]
-        return random.choice(speeches)
+        return self.rng.choice(speeches)
     
     def _evidence_based_voting(self, reasoning: VillagerReasoning) -> ActionDecision:
         """基于证据的投票"""
@@ -270,7 +275,7 @@ class VillagerStrategy(BaseStrategy):
                 player_info = self.get_player_info(trusted_player)
                 if player_info and hasattr(player_info, 'voting_target'):
                     target = player_info.voting_target
-                    if target and target in self.get_alive_players():
+                    if target and self.is_alive(target):
                         return self.create_action_decision(
                             action_type="vote",
                             target=target,
@@ -290,7 +295,7 @@ class VillagerStrategy(BaseStrategy):
             
             if player_info and hasattr(player_info, 'voting_target'):
                 target = player_info.voting_target
-                if target and target in self.get_alive_players():
+                if target and self.is_alive(target):
                     return self.create_action_decision(
                         action_type="vote",
                         target=target,
@@ -305,7 +310,7 @@ class VillagerStrategy(BaseStrategy):
         """默认投票"""
         alive_players = self.get_alive_players()
         if alive_players:
-            target = random.choice(alive_players)
+            target = self.rng.choice(alive_players)
             return self.create_action_decision(
                 action_type="vote",
                 target=target,
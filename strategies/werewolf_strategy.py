@@ -16,8 +16,13 @@ from utils.logger import WerewolfLogger
 class WerewolfStrategy(BaseStrategy):
     """狼人策略实现"""
     
-    def __init__(self, agent_name: str, logger: WerewolfLogger):
-        super().__init__(agent_name, logger)
+    def __init__(
+        self,
+        agent_name: str,
+        logger: WerewolfLogger,
+        rng: Optional[random.Random] = None,
+    ):
+        super().__init__(agent_name, logger, rng)
         
         # 狼人特有状态
         self.strategy_state.update({
@@ -108,7 +113,7 @@ class WerewolfStrategy(BaseStrategy):
         # 随机投票
         alive_players = self.get_alive_players()
         if alive_players:
-            target = random.choice(alive_players)
+            target = self.rng.choice(alive_players)
             return self.create_action_decision(
                 action_type="vote",
                 target=target,
@@ -156,12 +161,19 @@ class WerewolfStrategy(BaseStrategy):
             exposure_risk=exposure_risk
         )
     
-    def _select_night_target(self, alive_players: List[str], reasoning: Optional[WerewolfReasoning]) -> Optional[str]:
-        """选择夜晚击杀目标"""
-        if not alive_players:
+    def propose_night_target(self, observation: GameObservation) -> Optional[str]:
+        """夜间讨论时提议的击杀目标
+        
+        只按威胁评估打分，不加随机因素、也不记录到策略状态，
+        因此掌握相同信息的狼人会给出相同的提议，便于尽早达成一致。
+        """
+        scores = self._night_target_scores(self.get_alive_players())
+        if not scores:
             return None
-        
-        # 优先级排序
+        return max(scores, key=scores.get)
+    
+    def _night_target_scores(self, alive_players: List[str]) -> Dict[str, float]:
+        """按威胁评估给夜晚击杀候选打分（不含随机因素）"""
         target_scores = {}
         
         for player in alive_players:
@@ -186,17 +198,26 @@ class WerewolfStrategy(BaseStrategy):
             if player == self.strategy_state.get('last_night_kill'):
                 score -= 0.2
             
-            # 随机因素
-            score += random.random() * 0.1
-            
             target_scores[player] = score
         
+        return target_scores
+    
+    def _select_night_target(self, alive_players: List[str], reasoning: Optional[WerewolfReasoning]) -> Optional[str]:
+        """选择夜晚击杀目标"""
+        if not alive_players:
+            return None
+        
+        # 优先级排序，加上随机因素
+        target_scores = self._night_target_scores(alive_players)
+        for player in target_scores:
+            target_scores[player] += self.rng.random() * 0.1
+        
         if target_scores:
             # 选择得分最高的目标
             best_target = max(target_scores, key=target_scores.get)
             return best_target
         
-        return random.choice(alive_players) if alive_players else None
+        return self.rng.choice(alive_players) if alive_players else None
     
     def _select_voting_target(self, reasoning: WerewolfReasoning) -> Optional[str]:
         """选择投票目标"""
@@ -206,7 +227,7 @@ class WerewolfStrategy(BaseStrategy):
         if self.strategy_state['fake_seer_mode']:
             threats = [p for p in alive_players if self.get_player_info(p).role in ['seer', 'witch', 'hunter']]
             if threats:
-                return random.choice(threats)
+                return self.rng.choice(threats)
         
         # 投票给最可疑的好人
         suspicious_good = self._get_most_suspicious_good_player()
@@ -220,7 +241,7 @@ class WerewolfStrategy(BaseStrategy):
             most_suspicious = self.get_most_suspicious_players(1)
             if most_suspicious and most_suspicious[0] in non_teammates:
                 return most_suspicious[0]
-            return random.choice(non_teammates)
+            return self.rng.choice(non_teammates)
         
         return None
     
@@ -306,7 +327,7 @@ class WerewolfStrategy(BaseStrategy):
         total_players = len(alive_players) + len(dead_players)
         werewolf_count = len(self.strategy_state['teammates']) + 1  # +1 for self
         
-        if len(alive_players) <= 4:
+        if len(alive_players) <= self.scale_threshold(4):
             return "critical"  # 关键时刻
         elif werewolf_count >= len(alive_players) // 2:
             return "advantage"  # 优势
@@ -361,14 +382,14 @@ class WerewolfStrategy(BaseStrategy):
             "大家冷静分析，避免被误导。",
             "我注意到有些玩家的发言有矛盾，需要进一步观察。"
         ]
-        return random.choice(speeches)
+        return self.rng.choice(speeches)
     
     def _fake_seer_speech(self, reasoning: WerewolfReasoning) -> str:
         """悍跳先知发言"""
         # 选择一个"查验"目标
         alive_players = self.get_alive_players()
         if alive_players:
-            target = random.choice(alive_players)
+            target = self.rng.choice(alive_players)
             return f"作为先知，我昨晚查验了{target}，他是狼人！"
         return "我是先知，会为大家提供准确信息。"
     
@@ -380,7 +401,7 @@ class WerewolfStrategy(BaseStrategy):
             "我会仔细观察每个人的投票模式。",
             "作为村民，我的目标是找出所有狼人。"
         ]
-        return random.choice(speeches)
+        return self.rng.choice(speeches)
     
     def add_teammate(self, teammate_name: str) -> None:
         """添加队友"""
@@ -412,7 +433,7 @@ class WerewolfStrategy(BaseStrategy):
         
         # 如果女巫还有解药且局势不利
         # 这里简化逻辑，实际应该更复杂
-        return random.random() < 0.1  # 10%概率
+        return self.rng.random() < 0.1  # 10%概率
     
     def execute_self_harm_strategy(self) -> Optional[ActionDecision]:
         """执行自刀策略"""
@@ -16,8 +16,13 @@ from utils.logger import WerewolfLogger
 class WitchStrategy(BaseStrategy):
     """女巫策略实现"""
     
-    def __init__(self, agent_name: str, logger: WerewolfLogger):
-        super().__init__(agent_name, logger)
+    def __init__(
+        self,
+        agent_name: str,
+        logger: WerewolfLogger,
+        rng: Optional[random.Random] = None,
+    ):
+        super().__init__(agent_name, logger, rng)
         
         # 女巫特有状态
         self.strategy_state.update({
@@ -98,7 +103,7 @@ class WitchStrategy(BaseStrategy):
         # 默认投票
         alive_players = self.get_alive_players()
         if alive_players:
-            target = random.choice(alive_players)
+            target = self.rng.choice(alive_players)
             return self.create_action_decision(
                 action_type="vote",
                 target=target,
@@ -213,11 +218,11 @@ class WitchStrategy(BaseStrategy):
         
         # 如果受害者是保护过的玩家，考虑不救
         if victim in self.strategy_state['protected_players']:
-            return random.random() < 0.3  # 30%概率再救
+            return self.rng.random() < 0.3  # 30%概率再救
         
         # 根据局势评估
         alive_count = len(self.get_alive_players())
-        if alive_count <= 5:
+        if alive_count <= self.scale_threshold(5):
             return True  # 关键时刻救人
         
         # 根据可信度评估
@@ -226,7 +231,7 @@ class WitchStrategy(BaseStrategy):
             return True
         
         # 默认有50%概率救人
-        return random.random() < 0.5
+        return self.rng.random() < 0.5
     
     def _should_use_poison(self, reasoning: WitchReasoning) -> tuple[bool, Optional[str]]:
         """判断是否应该使用毒药"""
@@ -251,18 +256,18 @@ class WitchStrategy(BaseStrategy):
                 if confidence > 0.7:
                     use_probability += 0.3
                 
-                if random.random() < use_probability:
+                if self.rng.random() < use_probability:
                     return True, target
         
         # 根据玩家数量决定
         alive_count = len(self.get_alive_players())
-        if alive_count <= 4:
+        if alive_count <= self.scale_threshold(4):
             # 关键时刻更可能使用毒药
             use_probability = 0.7 if heal_used else 0.5
         else:
             use_probability = 0.3 if heal_used else 0.2
         
-        if random.random() < use_probability:
+        if self.rng.random() < use_probability:
             # 选择最可疑的玩家
             most_suspicious = self.get_most_suspicious_players(1)
             if most_suspicious:
@@ -304,7 +309,7 @@ class WitchStrategy(BaseStrategy):
             return "no_heal_available"
         elif len(self.strategy_state['heal_history']) == 0:
             return "first_night_heal"
-        elif len(self.get_alive_players()) <= 5:
+        elif len(self.get_alive_players()) <= self.scale_threshold(5):
             return "critical_situation_heal"
         else:
             return "selective_heal"
@@ -354,7 +359,7 @@ class WitchStrategy(BaseStrategy):
             not self.strategy_state['poison_potion_used']
         )
         
-        if len(alive_players) <= 4:
+        if len(alive_players) <= self.scale_threshold(4):
             return "critical"
         elif not potions_available:
             return "no_potions"
@@ -414,7 +419,7 @@ class WitchStrategy(BaseStrategy):
             "建议大家仔细观察投票模式。",
             "我会基于证据做出判断。"
         ]
-        return random.choice(speeches)
+        return self.rng.choice(speeches)
     
     def _semi_revealed_speech(self, reasoning: WitchReasoning) -> str:
         """半暴露身份的发言"""
@@ -424,7 +429,7 @@ class WitchStrategy(BaseStrategy):
             "基于我的观察，某些玩家很可疑。",
             "我会在关键时刻提供重要信息。"
         ]
-        return random.choice(speeches)
+        return self.rng.choice(speeches)
     
     def _revealed_speech(self, reasoning: WitchReasoning) -> str:
         """暴露身份的发言"""
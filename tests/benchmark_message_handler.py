@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""消息解析基准测试
+
+收集若干无头对局中智能体收到的全部消息，再加上中文主持人模板生成的消息，
+先校验其中每条主持人消息都能被模板解码器解码为事件，再比较逐条规则解析的
+旧实现（对所有消息，每条重建正则、多次转小写、多次搜索）和模板解码的
+新实现每条消息的平均解析耗时，并统计两者解析结果不同的消息数
+（旧实现会把玩家发言中的"投票"、"淘汰"等字样误认为事件）。
+
+用法:
+    python tests/benchmark_message_handler.py [--games N] [--repeat N]
+"""
+
+import argparse
+import asyncio
+import functools
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from agentscope.message import Msg
+
+from agents.player_agent import PlayerAgent
+from core.message_handler import MessageHandler
+from core.moderator_decoder import MODERATOR_NAME, get_moderator_decoder
+from werewolves.game import werewolves_game
+from werewolves.prompt import ChinesePrompts
+from werewolves.simulation import create_players
+
+
+class LegacyMessageHandler(MessageHandler):
+    """旧的逐条规则解析实现，仅用于对比"""
+
+    def process_message(self, msg) -> Dict:
+        messages = self._normalize_message(msg)
+        parsed_info = {
+            'messages': [],
+            'phase_change': None,
+            'role_assigned': None,
+            'player_died': [],
+            'voting_result': None
+        }
+        for single_msg in messages:
+            content = self._extract_content(single_msg)
+            sender = self._extract_sender(single_msg)
+            if not content:
+                continue
+            self._legacy_role(content, parsed_info)
+            previous_phase_change = parsed_info['phase_change']
+            parsed_info['phase_change'] = None
+            self._legacy_phase(content, parsed_info)
+            phase_change = parsed_info['phase_change']
+            parsed_info['phase_change'] = phase_change or previous_phase_change
+            self._legacy_death(content, parsed_info)
+            self._legacy_vote(content, parsed_info)
+            parsed_info['messages'].append({
+                'sender': sender,
+                'content': content,
+                'timestamp': time.time(),
+                'phase_change': phase_change
+            })
+        return parsed_info
+
+    def _legacy_role(self, content: str, parsed_info: Dict) -> None:
+        match = re.search(rf"\[{self.agent_name} ONLY\].*your role is (\w+)", content, re.IGNORECASE)
+        if match:
+            parsed_info['role_assigned'] = self.game_state['role'] = match.group(1).lower()
+            return
+        match = re.search(rf"{self.agent_name}.*?角色是(\S+)", content)
+        if match:
+            role_cn = match.group(1).strip('。')
+            role_map = {'狼人': 'werewolf', '先知': 'seer', '女巫': 'witch', '猎人': 'hunter', '村民': 'villager'}
+            parsed_info['role_assigned'] = self.game_state['role'] = role_map.get(role_cn, role_cn)
+            return
+        match = re.search(r"your role is (\w+)", content, re.IGNORECASE)
+        if match:
+            parsed_info['role_assigned'] = self.game_state['role'] = match.group(1).lower()
+
+    def _legacy_phase(self, content: str, parsed_info: Dict) -> None:
+        content_lower = content.lower()
+        phase = None
+        if "night has fallen" in content_lower or "天黑了" in content:
+            phase = 'night'
+        elif "the day is coming" in content_lower or "天亮了" in content:
+            phase = 'day'
+        elif "discuss" in content_lower or "讨论" in content:
+            phase = 'discussion'
+        elif "vote" in content_lower or "投票" in content:
+            if "result" not in content_lower and "结果" not in content:
+                phase = 'voting'
+        if phase:
+            parsed_info['phase_change'] = self.game_state['phase'] = phase
+
+    def _legacy_death(self, content: str, parsed_info: Dict) -> None:
+        for pattern in [r"(\w+) (?:was eliminated|died|被淘汰|死亡)", r"(?:eliminated|died|淘汰|死亡).*?(\w+)"]:
+            for match in re.finditer(pattern, content):
+                player_name = match.group(1)
+                if player_name and player_name not in parsed_info['player_died']:
+                    parsed_info['player_died'].append(player_name)
+                    if player_name not in self.game_state['dead_players']:
+                        self.game_state['dead_players'].append(player_name)
+                    if player_name in self.game_state['alive_players']:
+                        self.game_state['alive_players'].remove(player_name)
+
+    def _legacy_vote(self, content: str, parsed_info: Dict) -> None:
+        match = re.search(r"(?:voted for|投给了|vote:)\s*(\w+)", content)
+        if match:
+            parsed_info['voting_result'] = match.group(1)
+
+
+async def collect_messages(n_games: int) -> Dict[str, List[Msg]]:
+    """收集无头对局中每个智能体收到的消息"""
+    received: Dict[str, List[Msg]] = {}
+    original_observe = PlayerAgent.observe
+
+    async def observe(self, msg) -> None:
+        received.setdefault(self.name, []).extend(msg if isinstance(msg, list) else [msg])
+        await original_observe(self, msg)
+
+    PlayerAgent.observe = observe
+    try:
+        for seed in range(n_games):
+            players = create_players(functools.partial(PlayerAgent, headless=True))
+            await werewolves_game(players, headless=True, seed=seed)
+    finally:
+        PlayerAgent.observe = original_observe
+    return received
+
+
+def chinese_messages(names: List[str]) -> List[Msg]:
+    """用中文主持人模板生成消息"""
+    names_str = ", ".join([*names[:-1], "and " + names[-1]])
+    contents = [
+        ChinesePrompts.to_all_new_game.format(names_str),
+        ChinesePrompts.to_all_night,
+        ChinesePrompts.to_wolves_discussion.format(names[0], names_str),
+        ChinesePrompts.to_wolves_vote,
+        ChinesePrompts.to_wolves_res.format(f"{names[1]}: 2", names[1]),
+        ChinesePrompts.to_all_day.format(names[1]),
+        ChinesePrompts.to_dead_player.format(names[1]),
+        ChinesePrompts.to_all_discuss.format(names=names_str),
+        ChinesePrompts.to_all_vote.format(names_str),
+        ChinesePrompts.to_all_res.format(f"{names[3]}: 1", names[3]),
+    ]
+    return [Msg(MODERATOR_NAME, content, "assistant") for content in contents]
+
+
+def parse_all(handler_cls, agent_name: str, msgs: List[Msg]) -> tuple:
+    """逐条解析消息，返回去掉时间戳的解析结果和最终游戏状态"""
+    handler = handler_cls(agent_name)
+    handler.game_state['alive_players'] = [f"Player{i}" for i in range(1, 10)]
+    results = []
+    for msg in msgs:
+        parsed = handler.process_message(msg)
+        for item in parsed['messages']:
+            item.pop('timestamp')
+        results.append(parsed)
+    return results, handler.game_state
+
+
+def undecoded(corpus: Dict[str, List[Msg]]) -> List[str]:
+    """不能被模板解码器解码的主持人消息"""
+    decoder = get_moderator_decoder()
+    return [
+        msg.content
+        for msgs in corpus.values()
+        for msg in msgs
+        if msg.name == MODERATOR_NAME and decoder.decode(msg.content) is None
+    ]
+
+
+def time_parse(handler_cls, corpus: Dict[str, List[Msg]], repeat: int) -> float:
+    """每条消息的平均解析耗时（微秒）"""
+    handlers = {name: handler_cls(name) for name in corpus}
+    n_messages = sum(len(msgs) for msgs in corpus.values())
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for name, msgs in corpus.items():
+            handler = handlers[name]
+            for msg in msgs:
+                handler.process_message(msg)
+    return (time.perf_counter() - start) / (n_messages * repeat) * 1e6
+
+
+def main(n_games: int, repeat: int) -> bool:
+    """运行基准测试
+
+    Returns:
+        bool: 全部主持人消息是否都能被解码
+    """
+    corpus = asyncio.run(collect_messages(n_games))
+    for name in corpus:
+        corpus[name] = corpus[name] + chinese_messages(sorted(corpus))
+
+    missed = undecoded(corpus)
+    if missed:
+        print(f"{len(missed)}条主持人消息不能解码，例如: {missed[0]}")
+        return False
+
+    n_differ = 0
+    for name, msgs in corpus.items():
+        legacy_results, _ = parse_all(LegacyMessageHandler, name, msgs)
+        decoder_results, _ = parse_all(MessageHandler, name, msgs)
+        for legacy, decoded in zip(legacy_results, decoder_results):
+            decoded = {k: v for k, v in decoded.items() if k != 'events'}
+            n_differ += legacy != decoded
+
+    n_messages = sum(len(msgs) for msgs in corpus.values())
+    legacy_us = time_parse(LegacyMessageHandler, corpus, repeat)
+    decoder_us = time_parse(MessageHandler, corpus, repeat)
+    print(f"消息数 {n_messages}，主持人消息全部解码，解析结果不同的消息 {n_differ} 条")
+    print(f"逐条规则解析 {legacy_us:>8.2f} us/条")
+    print(f"模板解码     {decoder_us:>8.2f} us/条")
+    print(f"加速比       {legacy_us / decoder_us:>8.2f}x")
+    return True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="消息解析基准测试")
+    parser.add_argument("--games", type=int, default=4, help="收集消息的对局数")
+    parser.add_argument("--repeat", type=int, default=20, help="每条消息的解析次数")
+    args = parser.parse_args()
+
+    sys.exit(0 if main(args.games, args.repeat) else 1)
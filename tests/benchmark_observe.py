@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""observe延迟基准测试
+
+收集若干无头对局中每个智能体依次收到的消息，再对每个智能体按原顺序重放：
+一次在observe中同步完成全部分析（旧实现），一次只在observe中做必要的部分、
+分析交给后台任务（新实现）。比较每次observe的平均耗时，即广播需要等待的
+时间，并校验两种方式最终的记忆和游戏状态一致。
+
+用法:
+    python tests/benchmark_observe.py [--games N]
+"""
+
+import argparse
+import asyncio
+import functools
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from agents.player_agent import PlayerAgent
+from werewolves.game import werewolves_game
+from werewolves.simulation import create_players
+
+
+async def collect_observations(n_games: int) -> List[Dict[str, list]]:
+    """收集每局中每个智能体每次observe收到的消息"""
+    games = []
+    original_observe = PlayerAgent.observe
+
+    async def observe(self, msg) -> None:
+        games[-1].setdefault(self.name, []).append(msg)
+        await original_observe(self, msg)
+
+    PlayerAgent.observe = observe
+    try:
+        for seed in range(n_games):
+            games.append({})
+            players = create_players(functools.partial(PlayerAgent, headless=True))
+            await werewolves_game(players, headless=True, seed=seed)
+    finally:
+        PlayerAgent.observe = original_observe
+    return games
+
+
+def snapshot(agent: PlayerAgent) -> tuple:
+    """重放结束后的记忆和游戏状态"""
+    conversations = [
+        (item.get('speaker'), item.get('content'))
+        for item in agent.memory_manager.conversation_history
+    ]
+    return (
+        agent.current_round,
+        conversations,
+        agent.memory_manager.game_state,
+        agent.message_handler.get_game_state(),
+    )
+
+
+async def replay(observations: List[Dict[str, list]], inline: bool) -> tuple:
+    """重放收到的消息
+
+    Returns:
+        (每次observe的平均耗时（微秒）, 每个智能体最终状态的列表)
+    """
+    elapsed = 0.0
+    n_observes = 0
+    snapshots = []
+    for game in observations:
+        for name, msgs in game.items():
+            agent = PlayerAgent(name, headless=True)
+            for msg in msgs:
+                start = time.perf_counter()
+                await agent.observe(msg)
+                if inline:
+                    agent.drain_analysis()
+                elapsed += time.perf_counter() - start
+                n_observes += 1
+            await agent.wait_for_analysis()
+            snapshots.append(snapshot(agent))
+    return elapsed / n_observes * 1e6, snapshots
+
+
+async def main(n_games: int) -> bool:
+    """运行基准测试
+
+    Returns:
+        bool: 两种方式的最终状态是否一致
+    """
+    observations = await collect_observations(n_games)
+    n_observes = sum(len(msgs) for game in observations for msgs in game.values())
+
+    inline_us, inline_states = await replay(observations, inline=True)
+    queued_us, queued_states = await replay(observations, inline=False)
+    if inline_states != queued_states:
+        print("后台分析后的状态与同步分析不一致")
+        return False
+
+    print(f"observe次数 {n_observes}，两种方式的最终状态一致")
+    print(f"同步分析     {inline_us:>8.2f} us/次")
+    print(f"后台分析     {queued_us:>8.2f} us/次")
+    print(f"加速比       {inline_us / queued_us:>8.2f}x")
+    return True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="observe延迟基准测试")
+    parser.add_argument("--games", type=int, default=4, help="收集消息的对局数")
+    args = parser.parse_args()
+
+    sys.exit(0 if asyncio.run(main(args.games)) else 1)
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""玩家人数扩展基准测试
+
+对每种支持的人数（6/9/12/15/18人局）运行若干无头对局，统计每局耗时、每轮延迟、
+峰值内存以及每个智能体保存的对话条数，用于发现随人数超线性增长的热点
+（列表扫描、每个智能体各自复制的对话记录等）。
+
+用法:
+    python tests/benchmark_scaling.py [--games N] [--profile]
+"""
+
+import argparse
+import asyncio
+import cProfile
+import functools
+import io
+import pstats
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import agentscope
+
+from agents.player_agent import PlayerAgent
+from werewolves.game import werewolves_game
+from werewolves.simulation import create_players
+from werewolves.utils import ROLE_TABLES
+
+
+AGENT_FACTORY = functools.partial(PlayerAgent, headless=True)
+
+
+async def measure_size(n_players: int, n_games: int) -> dict:
+    """测量某个人数下的对局性能
+
+    Args:
+        n_players: 玩家人数
+        n_games: 对局数
+
+    Returns:
+        dict: 每局耗时、每轮延迟、峰值内存和每个智能体的对话条数
+    """
+    durations, round_latencies = [], []
+    for seed in range(n_games):
+        players = create_players(AGENT_FACTORY, n_players)
+        start_time = time.perf_counter()
+        result = await werewolves_game(players, headless=True, seed=seed)
+        duration = time.perf_counter() - start_time
+        durations.append(duration)
+        round_latencies.append(duration / max(result.rounds, 1))
+
+    # 单独测一局的峰值内存，避免tracemalloc影响计时
+    players = create_players(AGENT_FACTORY, n_players)
+    tracemalloc.start()
+    await werewolves_game(players, headless=True, seed=0)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "players": n_players,
+        "game_ms": statistics.fmean(durations) * 1000,
+        "round_ms": statistics.fmean(round_latencies) * 1000,
+        "peak_kb": peak / 1024,
+        "conversations": statistics.fmean(
+            len(_.memory_manager.conversation_history) for _ in players
+        ),
+    }
+
+
+def profile_game(n_players: int, top: int = 15) -> str:
+    """对一局游戏做cProfile，返回按累计耗时排序的热点"""
+    players = create_players(AGENT_FACTORY, n_players)
+    profiler = cProfile.Profile()
+    profiler.enable()
+    asyncio.run(werewolves_game(players, headless=True, seed=0))
+    profiler.disable()
+
+    stream = io.StringIO()
+    pstats.Stats(profiler, stream=stream).sort_stats("cumulative").print_stats(top)
+    return stream.getvalue()
+
+
+async def main(n_games: int) -> list:
+    """运行所有人数的基准测试并打印结果"""
+    print(f"{'人数':>4} {'每局(ms)':>10} {'每轮(ms)':>10} {'峰值内存(KB)':>14} {'对话条数':>8}")
+    rows = []
+    base = None
+    for n_players in ROLE_TABLES:
+        row = await measure_size(n_players, n_games)
+        rows.append(row)
+        base = base or row
+        print(
+            f"{row['players']:>4} {row['game_ms']:>10.1f} {row['round_ms']:>10.1f} "
+            f"{row['peak_kb']:>14.0f} {row['conversations']:>8.1f}"
+            f"   (每轮延迟为{base['players']}人局的"
+            f"{row['round_ms'] / base['round_ms']:.1f}倍，人数为"
+            f"{row['players'] / base['players']:.1f}倍)"
+        )
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="玩家人数扩展基准测试")
+    parser.add_argument("--games", type=int, default=10, help="每种人数的对局数")
+    parser.add_argument("--profile", action="store_true", help="对最大人数的一局做cProfile")
+    args = parser.parse_args()
+
+    agentscope.setup_logger(level="WARNING")
+    asyncio.run(main(args.games))
+    if args.profile:
+        print(profile_game(max(ROLE_TABLES)))
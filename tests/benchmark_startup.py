@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""启动耗时基准测试
+
+在全新的子进程中测量冷启动导入耗时（区分AgentScope本身和项目模块），
+以及构造一局9个PlayerAgent的耗时，目标是9个智能体的构造耗时低于100ms。
+
+用法:
+    python tests/benchmark_startup.py [--repeat N] [--budget-ms MS]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+# 项目根目录
+project_root = Path(__file__).parent.parent
+
+# 在子进程中执行，保证每次都是冷启动
+CHILD_SCRIPT = """
+import json, os, sys, time
+sys.path.insert(0, {root!r})
+os.environ.setdefault("DASHSCOPE_API_KEY", "benchmark")
+
+start = time.perf_counter()
+import agentscope.agent
+framework_done = time.perf_counter()
+from agents.player_agent import PlayerAgent
+import_done = time.perf_counter()
+
+agents = [PlayerAgent(f"Player{{i}}", headless=True) for i in range(1, 10)]
+headless_done = time.perf_counter()
+agents = [PlayerAgent(f"LLMPlayer{{i}}") for i in range(1, 10)]
+llm_done = time.perf_counter()
+
+print(json.dumps({{
+    "framework_import_ms": (framework_done - start) * 1000,
+    "project_import_ms": (import_done - framework_done) * 1000,
+    "headless_9_agents_ms": (headless_done - import_done) * 1000,
+    "llm_9_agents_ms": (llm_done - headless_done) * 1000,
+}}))
+"""
+
+
+def measure_once() -> dict:
+    """在全新的Python进程中测量一次"""
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD_SCRIPT.format(root=str(project_root))],
+        capture_output=True,
+        text=True,
+        check=True,
+        env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"},
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main(repeat: int, budget_ms: float) -> bool:
+    """运行基准测试并打印各项耗时的中位数
+
+    Returns:
+        bool: 9个智能体的构造耗时是否在预算内
+    """
+    runs = [measure_once() for _ in range(repeat)]
+    medians = {key: statistics.median(_[key] for _ in runs) for key in runs[0]}
+
+    labels = {
+        "framework_import_ms": "导入AgentScope",
+        "project_import_ms": "导入项目模块",
+        "headless_9_agents_ms": "构造9个无头智能体",
+        "llm_9_agents_ms": "构造9个大模型智能体",
+    }
+    for key, label in labels.items():
+        print(f"{label:<16} {medians[key]:>10.1f} ms")
+
+    construction_ms = max(medians["headless_9_agents_ms"], medians["llm_9_agents_ms"])
+    passed = construction_ms < budget_ms
+    print(f"9个智能体构造耗时 {construction_ms:.1f} ms，预算 {budget_ms:.0f} ms："
+          f"{'通过' if passed else '超出预算'}")
+    return passed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="启动耗时基准测试")
+    parser.add_argument("--repeat", type=int, default=5, help="冷启动测量次数")
+    parser.add_argument("--budget-ms", type=float, default=100.0, help="9个智能体的构造耗时预算（毫秒）")
+    args = parser.parse_args()
+
+    sys.exit(0 if main(args.repeat, args.budget_ms) else 1)
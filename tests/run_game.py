@@ -6,6 +6,7 @@
 """
 
 import asyncio
+import functools
 import os
 import sys
 import time
@@ -39,6 +40,8 @@ from agent import PlayerAgent
 
 # 导入官方游戏模块
 from werewolves.game import werewolves_game
+from werewolves.simulation import simulate_games
+from werewolves.tournament import run_tournament
 from werewolves.utils import Players
 from agentscope.session import JSONSession
 
@@ -167,6 +170,55 @@ async def run_multiple_games(num_games: int = 1) -> None:
     print(f"\n🏁 所有{num_games}场比赛完成!")
 
 
+async def run_headless_games(num_games: int = 100) -> None:
+    """运行无头模拟对局（仅规则策略，不调用大模型、无控制台输出）
+    
+    Args:
+        num_games: 比赛场次
+    """
+    print(f"🤖 开始运行{num_games}场无头模拟对局...")
+    
+    durations = await simulate_games(
+        lambda name: PlayerAgent(name=name, headless=True),
+        num_games,
+    )
+    
+    total = sum(durations)
+    print(f"🏁 {num_games}场对局完成，总耗时: {total:.2f}秒，"
+          f"平均每场: {total / max(1, num_games) * 1000:.1f}毫秒")
+
+
+async def run_headless_tournament(num_games: int = 100, num_workers: int = None) -> None:
+    """运行无头锦标赛（仅规则策略，多进程并行）
+    
+    对局分配到进程池中并行进行，每个工作进程使用独立的检查点目录，
+    在其负责的对局之间保存和加载智能体状态，最后合并为一份报告。
+    
+    Args:
+        num_games: 比赛场次
+        num_workers: 工作进程数，默认为CPU核数
+    """
+    print(f"🏆 开始运行{num_games}场无头锦标赛...")
+    
+    report = await asyncio.to_thread(
+        run_tournament,
+        num_games,
+        functools.partial(PlayerAgent, headless=True),
+        num_workers,
+        checkpoint_dir="./checkpoints/tournament",
+    )
+    
+    print(f"\n🏁 所有{report['games']}场比赛完成! "
+          f"总耗时: {report['wall_time']:.2f}秒，"
+          f"吞吐: {report['games_per_second']:.1f}局/秒")
+    print(f"📊 胜负统计: {report['wins']}，平均轮次: {report['avg_rounds']:.2f}")
+    for name, latency in report['agent_latency'].items():
+        print(f"  {name}: 调用{latency['calls']}次，"
+              f"平均{latency['mean'] * 1000:.2f}ms，"
+              f"P95 {latency['p95'] * 1000:.2f}ms，"
+              f"最大{latency['max'] * 1000:.2f}ms")
+
+
 def check_environment() -> bool:
     """检查环境配置
     
@@ -230,9 +282,11 @@ async def main():
     print("1. 运行单场比赛")
     print("2. 运行多场比赛 (连续5局，模拟真实比赛)")
     print("3. 运行完整轮次 (10轮 x 5局 = 50局)")
+    print("4. 运行无头模拟 (仅规则策略，100局)")
+    print("5. 运行无头锦标赛 (仅规则策略，多进程并行，100局)")
     
     try:
-        choice = input("\n请输入选择 (1-3): ").strip()
+        choice = input("\n请输入选择 (1-5): ").strip()
         
         if choice == "1":
             await run_single_game()
@@ -240,6 +294,10 @@ async def main():
             await run_multiple_games(5)
         elif choice == "3":
             await run_multiple_games(50)
+        elif choice == "4":
+            await run_headless_games(100)
+        elif choice == "5":
+            await run_headless_tournament(100)
         else:
             print("❌ 无效选择，运行单场比赛")
             await run_single_game()
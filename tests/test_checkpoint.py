@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""对局检查点测试
+
+检查点保存后能原样加载；对局中途崩溃后从检查点恢复，应与同一种子
+不中断的对局得到相同的结果。
+"""
+
+import asyncio
+import functools
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from agents.player_agent import PlayerAgent
+from werewolves.checkpoint import load_checkpoint, save_checkpoint
+from werewolves.game import resume_game, werewolves_game
+from werewolves.simulation import create_players
+
+AGENT_FACTORY = functools.partial(PlayerAgent, headless=True)
+SEED = 5
+
+
+class GameCrash(Exception):
+    """模拟对局进程中途崩溃"""
+
+
+class CrashingPlayerAgent(PlayerAgent):
+    """第crash_at次被调用时崩溃的智能体"""
+
+    n_calls = 0
+    crash_at = 40
+
+    async def __call__(self, msg=None, **kwargs):
+        CrashingPlayerAgent.n_calls += 1
+        if CrashingPlayerAgent.n_calls == CrashingPlayerAgent.crash_at:
+            raise GameCrash(f"第{CrashingPlayerAgent.n_calls}次调用时崩溃")
+        return await super().__call__(msg, **kwargs)
+
+
+async def crash_game(checkpoint_path: str) -> None:
+    """进行一局中途崩溃的对局，留下检查点"""
+    CrashingPlayerAgent.n_calls = 0
+    try:
+        await werewolves_game(
+            create_players(functools.partial(CrashingPlayerAgent, headless=True)),
+            headless=True,
+            seed=SEED,
+            checkpoint_path=checkpoint_path,
+        )
+    except GameCrash:
+        return
+    raise AssertionError("对局没有崩溃")
+
+
+async def test_save_and_load():
+    """测试检查点保存后原样加载"""
+    print("=" * 60)
+    print("测试: 检查点保存与加载")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        checkpoint_path = os.path.join(tmp_dir, "checkpoint.json")
+        await crash_game(checkpoint_path)
+        checkpoint = load_checkpoint(checkpoint_path)
+        assert checkpoint is not None, "没有留下检查点"
+
+        copy_path = os.path.join(tmp_dir, "copy.json")
+        save_checkpoint(copy_path, checkpoint)
+        assert load_checkpoint(copy_path) == checkpoint
+        assert not os.path.exists(f"{copy_path}.tmp")
+
+    assert checkpoint.seed == SEED
+    assert set(checkpoint.agent_states) == set(checkpoint.seats)
+    print(f"[OK] 第{checkpoint.round_idx + 1}轮{checkpoint.phase}前的检查点加载后不变")
+    return True
+
+
+async def test_resume_matches_uninterrupted_game():
+    """测试从检查点恢复的对局与不中断的对局结果相同"""
+    print("=" * 60)
+    print("测试: 恢复的对局与不中断的对局结果相同")
+    print("=" * 60)
+
+    expected = await werewolves_game(
+        create_players(AGENT_FACTORY),
+        headless=True,
+        seed=SEED,
+    )
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        checkpoint_path = os.path.join(tmp_dir, "checkpoint.json")
+        await crash_game(checkpoint_path)
+        resumed = await resume_game(
+            create_players(AGENT_FACTORY),
+            checkpoint_path,
+            headless=True,
+        )
+        assert not os.path.exists(checkpoint_path), "对局结束后检查点没有删除"
+
+    assert resumed == expected, f"恢复后 {resumed}，不中断 {expected}"
+    print(f"[OK] 两局结果相同: {resumed}")
+    return True
+
+
+async def main():
+    """运行所有测试"""
+    results = []
+    for name, test in [
+        ("检查点保存与加载", test_save_and_load),
+        ("恢复的对局与不中断的对局结果相同", test_resume_matches_uninterrupted_game),
+    ]:
+        try:
+            results.append((name, await test()))
+        except Exception as e:
+            print(f"[FAIL] {name}: {e}")
+            results.append((name, False))
+
+    print("\n" + "=" * 60)
+    print("测试结果汇总")
+    print("=" * 60)
+    for name, result in results:
+        print(f"{'[PASS]' if result else '[FAIL]'}: {name}")
+
+    passed = sum(1 for _, result in results if result)
+    print(f"\n总计: {passed}/{len(results)} 测试通过")
+    return passed == len(results)
+
+
+if __name__ == "__main__":
+    success = asyncio.run(main())
+    sys.exit(0 if success else 1)
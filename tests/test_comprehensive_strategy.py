@@ -106,6 +106,49 @@ async def test_seer_check():
     return has_target
 
 
+async def test_seer_not_checking_self():
+    """测试先知的查验候选不包含自己"""
+    print_test_header("先知不查验自己")
+    
+    from werewolves.prompt import ChinesePrompts
+    
+    agent = PlayerAgent(name=TEST_AGENT_NAME, headless=True)
+    all_players = [TEST_AGENT_NAME, *OTHER_PLAYERS]
+    names = ", ".join(all_players[:-1]) + ", and " + all_players[-1]
+    
+    # 开局公告建立名册，名册中的存活玩家包含自己
+    for content in [
+        ChinesePrompts.to_all_new_game.format(names),
+        f"[{TEST_AGENT_NAME} ONLY] {TEST_AGENT_NAME}, your role is seer.",
+    ]:
+        await agent.observe(Msg(name="Moderator", content=content, role="assistant"))
+    
+    night_msg = Msg(
+        name="Moderator",
+        content=ChinesePrompts.to_seer.format(TEST_AGENT_NAME),
+        role="assistant"
+    )
+    await agent.observe(night_msg)
+    
+    from models.structured_models import SeerModel
+    response = await agent(night_msg, structured_model=SeerModel)
+    
+    check_targets = agent.intelligent_responder.decision_candidates.check_targets
+    target = (response.metadata or {}).get('name')
+    passed = (
+        bool(check_targets)
+        and TEST_AGENT_NAME not in check_targets
+        and target in OTHER_PLAYERS
+    )
+    print_test_result(
+        "先知不查验自己",
+        passed,
+        f"查验候选: {check_targets}, 目标: {target}"
+    )
+    
+    return passed
+
+
 async def test_witch_actions():
     """测试女巫用药"""
     print_test_header("女巫用药决策")
@@ -350,6 +393,7 @@ async def main():
     tests = [
         ("狼人夜晚行动", test_werewolf_night_action),
         ("先知查验", test_seer_check),
+        ("先知不查验自己", test_seer_not_checking_self),
         ("女巫用药", test_witch_actions),
         ("猎人开枪", test_hunter_shoot),
         ("投票决策（思维链）", test_voting_with_cot),
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""响应截止时间测试
+
+截止时间到期后正在进行的工作被取消并返回备用答案，已经到期时工作
+不再运行；派生的截止时间提前到期，其下的超时逐层报告给上层。
+PlayerAgent.__call__在模型迟迟不返回时，应在预算内返回备用答案。
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from agentscope.message import Msg
+
+import agents.player_agent as player_agent
+from agents.player_agent import PlayerAgent
+from core.deadline import Deadline
+from core.escalation import EscalationPolicy
+from models.structured_models import VoteModel
+from werewolves.prompt import ChinesePrompts
+
+TEST_AGENT_NAME = "Player1"
+ALL_PLAYERS = [f"Player{i}" for i in range(1, 7)]
+# __call__的截止时间缩短为4秒：智能响应器3秒，模型调用1秒
+CALL_BUDGET = 4
+# 截止时间之后还预留了2秒收尾的安全边际，响应必须在此之前返回
+CALL_LIMIT = CALL_BUDGET + 2
+
+
+class FakeClock:
+    """手动拨动的时钟"""
+
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class ShortDeadline(Deadline):
+    """把__call__的截止时间缩短为CALL_BUDGET秒，测试不必等满30秒"""
+
+    def __init__(self, budget: float, clock=time.monotonic):
+        super().__init__(CALL_BUDGET, clock)
+
+
+class Sleeper:
+    """一直不返回的工作，记录被调用和被取消的次数"""
+
+    def __init__(self):
+        self.n_calls = 0
+        self.n_cancelled = 0
+
+    async def __call__(self, *args, **kwargs):
+        self.n_calls += 1
+        try:
+            await asyncio.sleep(60)
+        except asyncio.CancelledError:
+            self.n_cancelled += 1
+            raise
+
+
+async def make_villager() -> PlayerAgent:
+    """开局并分配村民角色的无头智能体"""
+    agent = PlayerAgent(name=TEST_AGENT_NAME, headless=True)
+    names = ", ".join(ALL_PLAYERS[:-1]) + ", and " + ALL_PLAYERS[-1]
+    for content in [
+        ChinesePrompts.to_all_new_game.format(names),
+        f"[{TEST_AGENT_NAME} ONLY] {TEST_AGENT_NAME}, your role is villager.",
+    ]:
+        await agent.observe(Msg(name="Moderator", content=content, role="assistant"))
+    return agent
+
+
+async def timed_call(agent: PlayerAgent, msg: Msg, **kwargs) -> tuple:
+    """以缩短的截止时间调用智能体
+
+    Returns:
+        (响应, 耗时（秒）)
+    """
+    original = player_agent.Deadline
+    player_agent.Deadline = ShortDeadline
+    try:
+        start = time.monotonic()
+        response = await agent(msg, **kwargs)
+        return response, time.monotonic() - start
+    finally:
+        player_agent.Deadline = original
+
+
+async def test_shrink():
+    """测试派生的截止时间提前到期"""
+    print("=" * 60)
+    print("测试: 派生截止时间")
+    print("=" * 60)
+
+    clock = FakeClock()
+    deadline = Deadline(10, clock)
+    child = deadline.shrink(2)
+    assert deadline.remaining() == 10 and child.remaining() == 8
+
+    clock.now += 9
+    assert child.expired and child.remaining() == 0
+    assert not deadline.expired and deadline.remaining() == 1
+    print("[OK] 派生的截止时间提前2秒到期，剩余时间不小于0")
+    return True
+
+
+async def test_expired_run_closes_coroutine():
+    """测试已经到期时工作不再运行"""
+    print("=" * 60)
+    print("测试: 到期后不再运行工作")
+    print("=" * 60)
+
+    clock = FakeClock()
+    deadline = Deadline(5, clock)
+    child = deadline.shrink(1).shrink(1)
+    started = []
+
+    async def work():
+        started.append(True)
+        return "结果"
+
+    clock.now += 4
+    coroutine = work()
+    assert await child.run(coroutine, "备用") == "备用"
+    assert started == [], "到期后工作仍然运行"
+    assert coroutine.cr_frame is None, "协程没有关闭"
+    # 超时逐层报告给上层截止时间
+    assert child.timed_out and deadline.timed_out
+    print("[OK] 返回备用答案，协程已关闭，超时报告给上层")
+    return True
+
+
+async def test_run_cancels_in_flight_work():
+    """测试超时取消正在进行的工作"""
+    print("=" * 60)
+    print("测试: 超时取消工作")
+    print("=" * 60)
+
+    deadline = Deadline(1)
+    assert await deadline.shrink(0.5).run(asyncio.sleep(0, "结果"), "备用") == "结果"
+    assert not deadline.timed_out
+
+    sleeper = Sleeper()
+    assert await deadline.shrink(0.5).run(sleeper(), "备用") == "备用"
+    assert sleeper.n_calls == 1 and sleeper.n_cancelled == 1
+    assert deadline.timed_out and not deadline.expired
+    print("[OK] 及时完成时返回结果，超时时取消工作并返回备用答案")
+    return True
+
+
+async def test_call_returns_fallback_within_budget():
+    """测试模型超时时__call__在预算内返回规则策略的备用答案"""
+    print("=" * 60)
+    print("测试: 模型超时时在预算内返回")
+    print("=" * 60)
+
+    agent = await make_villager()
+    model = Sleeper()
+    responder = agent.intelligent_responder
+    responder.model = model
+    responder.escalation_policy = EscalationPolicy(thresholds={'vote': 1.1}, min_budget=0)
+
+    vote_msg = Msg(
+        name="Moderator",
+        content=ChinesePrompts.to_all_vote.format(", ".join(ALL_PLAYERS)),
+        role="assistant"
+    )
+    response, elapsed = await timed_call(agent, vote_msg, structured_model=VoteModel)
+
+    assert elapsed < CALL_LIMIT, f"耗时{elapsed:.2f}s超出预算"
+    assert model.n_calls == 1 and model.n_cancelled == 1, "模型调用没有被取消"
+    assert response.metadata.get('vote') in ALL_PLAYERS, "没有返回规则策略的备用答案"
+    print(f"[OK] {elapsed:.2f}s内返回，投票给{response.metadata['vote']}")
+    return True
+
+
+async def test_call_falls_back_to_stale_draft():
+    """测试智能响应器超时时__call__返回已过期的发言草稿"""
+    print("=" * 60)
+    print("测试: 响应器超时时返回过期草稿")
+    print("=" * 60)
+
+    agent = await make_villager()
+    sleeper = Sleeper()
+    agent.intelligent_responder.generate_intelligent_response = sleeper
+    draft = Msg(name=TEST_AGENT_NAME, content="我是好人，先听听大家的发言。", role="assistant")
+    # 草稿的依据与当前状态不同，已经过期
+    agent._speech_draft = (None, draft)
+
+    speak_msg = Msg(name="Moderator", content="请发言。", role="assistant")
+    response, elapsed = await timed_call(agent, speak_msg)
+
+    assert elapsed < CALL_LIMIT, f"耗时{elapsed:.2f}s超出预算"
+    assert sleeper.n_calls == 1 and sleeper.n_cancelled == 1, "响应器调用没有被取消"
+    assert response is draft, "没有返回预先起草的发言"
+    assert agent._speech_draft is None
+    print(f"[OK] {elapsed:.2f}s内返回预先起草的发言")
+    return True
+
+
+async def main():
+    """运行所有测试"""
+    results = []
+    for name, test in [
+        ("派生截止时间", test_shrink),
+        ("到期后不再运行工作", test_expired_run_closes_coroutine),
+        ("超时取消工作", test_run_cancels_in_flight_work),
+        ("模型超时时在预算内返回", test_call_returns_fallback_within_budget),
+        ("响应器超时时返回过期草稿", test_call_falls_back_to_stale_draft),
+    ]:
+        try:
+            results.append((name, await test()))
+        except Exception as e:
+            print(f"[FAIL] {name}: {e}")
+            results.append((name, False))
+
+    print("\n" + "=" * 60)
+    print("测试结果汇总")
+    print("=" * 60)
+    for name, result in results:
+        print(f"{'[PASS]' if result else '[FAIL]'}: {name}")
+
+    passed = sum(1 for _, result in results if result)
+    print(f"\n总计: {passed}/{len(results)} 测试通过")
+    return passed == len(results)
+
+
+if __name__ == "__main__":
+    success = asyncio.run(main())
+    sys.exit(0 if success else 1)
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""决策缓存测试
+
+没有新信息的重复提问应返回缓存的决策；升级为大模型的决策超时时，
+拿到的是规则策略的备用答案，不能被缓存，否则之后的同样提问都不再调用模型。
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from agentscope.message import Msg
+
+from agents.player_agent import PlayerAgent
+from core.deadline import Deadline
+from core.escalation import EscalationPolicy
+from models.structured_models import VoteModel
+from werewolves.prompt import ChinesePrompts
+
+TEST_AGENT_NAME = "Player1"
+ALL_PLAYERS = [f"Player{i}" for i in range(1, 7)]
+
+
+class SleepingModel:
+    """一直不返回的模型，记录被调用和被取消的次数"""
+
+    def __init__(self):
+        self.n_calls = 0
+        self.n_cancelled = 0
+
+    async def __call__(self, messages, **kwargs):
+        self.n_calls += 1
+        try:
+            await asyncio.sleep(60)
+        except asyncio.CancelledError:
+            self.n_cancelled += 1
+            raise
+
+
+async def make_villager(model=None) -> PlayerAgent:
+    """开局并分配村民角色的无头智能体，有model时投票总是升级为模型决策"""
+    agent = PlayerAgent(name=TEST_AGENT_NAME, headless=True)
+    names = ", ".join(ALL_PLAYERS[:-1]) + ", and " + ALL_PLAYERS[-1]
+    for content in [
+        ChinesePrompts.to_all_new_game.format(names),
+        f"[{TEST_AGENT_NAME} ONLY] {TEST_AGENT_NAME}, your role is villager.",
+    ]:
+        await agent.observe(Msg(name="Moderator", content=content, role="assistant"))
+    if model is not None:
+        responder = agent.intelligent_responder
+        responder.model = model
+        responder.escalation_policy = EscalationPolicy(thresholds={'vote': 1.1}, min_budget=0)
+    return agent
+
+
+def vote_msg() -> Msg:
+    return Msg(
+        name="Moderator",
+        content=ChinesePrompts.to_all_vote.format(", ".join(ALL_PLAYERS)),
+        role="assistant"
+    )
+
+
+async def test_repeated_question_hits_cache():
+    """测试没有新信息的重复提问命中缓存"""
+    print("=" * 60)
+    print("测试: 重复提问命中缓存")
+    print("=" * 60)
+
+    agent = await make_villager()
+    responder = agent.intelligent_responder
+    first = await responder.generate_intelligent_response(vote_msg(), VoteModel)
+    second = await responder.generate_intelligent_response(vote_msg(), VoteModel)
+
+    assert responder.decision_cache.hits == 1
+    assert first.metadata['vote'] == second.metadata['vote']
+    print(f"[OK] 第二次提问命中缓存，投票给{second.metadata['vote']}")
+    return True
+
+
+async def test_timed_out_escalation_not_cached():
+    """测试升级决策超时后不缓存备用答案"""
+    print("=" * 60)
+    print("测试: 升级决策超时不缓存")
+    print("=" * 60)
+
+    model = SleepingModel()
+    agent = await make_villager(model)
+    responder = agent.intelligent_responder
+
+    # 模型调用的截止时间还要减去2秒的安全边际，约0.5秒后超时
+    deadline = Deadline(2.5)
+    response = await responder.generate_intelligent_response(vote_msg(), VoteModel, deadline=deadline)
+
+    assert model.n_calls == 1 and model.n_cancelled == 1, "模型调用没有被取消"
+    assert response.metadata.get('vote') in ALL_PLAYERS, "没有返回规则策略的备用答案"
+    assert deadline.timed_out, "内层超时没有报告给上层截止时间"
+    assert len(responder.decision_cache._entries) == 0, "超时的备用答案被缓存"
+
+    # 同样的提问仍然会再次调用模型
+    await responder.generate_intelligent_response(vote_msg(), VoteModel, deadline=Deadline(2.5))
+    assert model.n_calls == 2
+    print("[OK] 超时的备用答案没有缓存，重复提问再次调用模型")
+    return True
+
+
+async def main():
+    """运行所有测试"""
+    results = []
+    for name, test in [
+        ("重复提问命中缓存", test_repeated_question_hits_cache),
+        ("升级决策超时不缓存", test_timed_out_escalation_not_cached),
+    ]:
+        try:
+            results.append((name, await test()))
+        except Exception as e:
+            print(f"[FAIL] {name}: {e}")
+            results.append((name, False))
+
+    print("\n" + "=" * 60)
+    print("测试结果汇总")
+    print("=" * 60)
+    for name, result in results:
+        print(f"{'[PASS]' if result else '[FAIL]'}: {name}")
+
+    passed = sum(1 for _, result in results if result)
+    print(f"\n总计: {passed}/{len(results)} 测试通过")
+    return passed == len(results)
+
+
+if __name__ == "__main__":
+    success = asyncio.run(main())
+    sys.exit(0 if success else 1)
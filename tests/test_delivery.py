@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""批量投递测试
+
+批量投递时每个智能体在被调用前一次性observe排队的全部消息。同一种子的
+对局无论是否批量投递，结果和每个智能体记下的对话历史都应完全相同。
+"""
+
+import asyncio
+import functools
+import sys
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from agents.player_agent import PlayerAgent
+from werewolves.game import werewolves_game
+from werewolves.simulation import create_players
+
+SEEDS = [0, 1, 2]
+
+
+class CountingPlayerAgent(PlayerAgent):
+    """记录observe调用次数的智能体"""
+
+    def __init__(self, name: str, headless: bool = False):
+        super().__init__(name, headless=headless)
+        self.n_observes = 0
+
+    async def observe(self, msg) -> None:
+        self.n_observes += 1
+        await super().observe(msg)
+
+
+def history(agent: PlayerAgent) -> list:
+    """智能体记下的对话历史，不含时间戳"""
+    return [
+        (item.get('speaker'), item.get('content'), item.get('round'))
+        for item in agent.memory_manager.conversation_history
+    ]
+
+
+async def play(seed: int, batch_observations: bool) -> tuple:
+    """进行一局对局
+
+    Returns:
+        (对局结果, 每个智能体的对话历史和最终轮次, observe调用总次数)
+    """
+    players = create_players(functools.partial(CountingPlayerAgent, headless=True))
+    result = await werewolves_game(
+        players,
+        headless=True,
+        seed=seed,
+        batch_observations=batch_observations,
+    )
+    states = {agent.name: (history(agent), agent.current_round) for agent in players}
+    return result, states, sum(agent.n_observes for agent in players)
+
+
+async def test_batched_game_matches_unbatched():
+    """测试批量投递的对局与逐条投递的对局相同"""
+    print("=" * 60)
+    print("测试: 批量投递与逐条投递一致")
+    print("=" * 60)
+
+    for seed in SEEDS:
+        result, states, n_observes = await play(seed, batch_observations=False)
+        batched_result, batched_states, n_batched = await play(seed, batch_observations=True)
+
+        assert batched_result == result, f"种子{seed}: {batched_result} != {result}"
+        for name, state in states.items():
+            assert batched_states[name] == state, f"种子{seed}: {name}的对话历史不同"
+        assert n_batched < n_observes, f"种子{seed}: 批量投递没有减少observe次数"
+        print(f"[OK] 种子{seed}: {result}，observe {n_observes} -> {n_batched}次")
+    return True
+
+
+async def main():
+    """运行所有测试"""
+    results = []
+    for name, test in [
+        ("批量投递与逐条投递一致", test_batched_game_matches_unbatched),
+    ]:
+        try:
+            results.append((name, await test()))
+        except Exception as e:
+            print(f"[FAIL] {name}: {e}")
+            results.append((name, False))
+
+    print("\n" + "=" * 60)
+    print("测试结果汇总")
+    print("=" * 60)
+    for name, result in results:
+        print(f"{'[PASS]' if result else '[FAIL]'}: {name}")
+
+    passed = sum(1 for _, result in results if result)
+    print(f"\n总计: {passed}/{len(results)} 测试通过")
+    return passed == len(results)
+
+
+if __name__ == "__main__":
+    success = asyncio.run(main())
+    sys.exit(0 if success else 1)
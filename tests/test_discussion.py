@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""狼人夜间讨论测试
+
+并行讨论中所有狼人同时起草提议，一轮结束后互相告知；提议一致时讨论
+提前结束，每个狼人只收到其他狼人的提议，不会收到自己的提议。
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from agentscope.agent import AgentBase
+from agentscope.message import Msg
+
+from werewolves.delivery import BatchedMsgHub
+from werewolves.game import discussion_stage
+from werewolves.utils import MAX_DISCUSSION_ROUND
+
+
+class ScriptedWolf(AgentBase):
+    """按给定顺序逐轮提议击杀目标的狼人，记录收到的消息"""
+
+    def __init__(self, name: str, targets: list):
+        super().__init__()
+        self.name = name
+        self.targets = targets
+        self.n_calls = 0
+        self.observed: list = []
+
+    async def reply(self, msg=None, structured_model=None) -> Msg:
+        target = self.targets[min(self.n_calls, len(self.targets) - 1)]
+        self.n_calls += 1
+        return Msg(
+            self.name,
+            f"今晚刀{target}",
+            "assistant",
+            metadata={"reach_agreement": False, "target": target},
+        )
+
+    async def observe(self, msg) -> None:
+        self.observed.extend(msg if isinstance(msg, list) else [msg])
+
+    async def handle_interrupt(self, *args, **kwargs) -> Msg:
+        raise NotImplementedError
+
+
+CANDIDATES = [SimpleNamespace(name=f"Player{i}") for i in range(4, 10)]
+
+
+async def run_discussion(wolves: list) -> None:
+    """在狼人频道中进行一次并行讨论"""
+    async with BatchedMsgHub(participants=wolves) as hub:
+        await discussion_stage(wolves, CANDIDATES, hub, parallel=True)
+
+
+async def test_consensus_stops_early():
+    """测试提议一致时讨论提前结束"""
+    print("=" * 60)
+    print("测试: 提议一致时提前结束")
+    print("=" * 60)
+
+    wolves = [
+        ScriptedWolf("Player1", ["Player5", "Player7"]),
+        ScriptedWolf("Player2", ["Player6", "Player7"]),
+        ScriptedWolf("Player3", ["Player7"]),
+    ]
+    await run_discussion(wolves)
+
+    # 第一轮提议不一致，第二轮一致
+    assert MAX_DISCUSSION_ROUND > 2
+    assert [_.n_calls for _ in wolves] == [2, 2, 2]
+    print("[OK] 第二轮提议一致后结束，共2轮")
+    return True
+
+
+async def test_no_own_proposal_echoed():
+    """测试每个狼人只收到其他狼人的提议"""
+    print("=" * 60)
+    print("测试: 不回送自己的提议")
+    print("=" * 60)
+
+    wolves = [
+        ScriptedWolf("Player1", ["Player5", "Player7"]),
+        ScriptedWolf("Player2", ["Player6", "Player7"]),
+        ScriptedWolf("Player3", ["Player7"]),
+    ]
+    await run_discussion(wolves)
+
+    for wolf in wolves:
+        senders = [_.name for _ in wolf.observed]
+        assert wolf.name not in senders, f"{wolf.name}收到了自己的提议"
+        # 两轮，每轮收到另外两个狼人的提议，按座位顺序
+        others = [_.name for _ in wolves if _ is not wolf]
+        assert senders == others * 2, senders
+    print("[OK] 每个狼人只收到其他狼人的提议")
+    return True
+
+
+async def main():
+    """运行所有测试"""
+    results = []
+    for name, test in [
+        ("提议一致时提前结束", test_consensus_stops_early),
+        ("不回送自己的提议", test_no_own_proposal_echoed),
+    ]:
+        try:
+            results.append((name, await test()))
+        except Exception as e:
+            print(f"[FAIL] {name}: {e}")
+            results.append((name, False))
+
+    print("\n" + "=" * 60)
+    print("测试结果汇总")
+    print("=" * 60)
+    for name, result in results:
+        print(f"{'[PASS]' if result else '[FAIL]'}: {name}")
+
+    passed = sum(1 for _, result in results if result)
+    print(f"\n总计: {passed}/{len(results)} 测试通过")
+    return passed == len(results)
+
+
+if __name__ == "__main__":
+    success = asyncio.run(main())
+    sys.exit(0 if success else 1)
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""主持人消息解码器测试
+
+用英文和中文两种提示词逐个生成每个模板的消息，解码后应得到对应的模板
+和参数；平票、重新投票的消息不能被文字更少的 "{} 被淘汰" 类模板截走，
+重复的占位符必须取相同的值，不是由模板生成的文字不被解码。
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from agentscope.message import Msg
+
+from agents.player_agent import PlayerAgent
+from core.moderator_decoder import EventType, _TEMPLATE_SPECS, get_moderator_decoder
+from models.structured_models import WitchResurrectModel
+from werewolves.prompt import ChinesePrompts, EnglishPrompts
+from werewolves.utils import names_to_str
+
+PROMPTS = {'en': EnglishPrompts, 'zh': ChinesePrompts}
+PLAYERS = [f"Player{i}" for i in range(1, 10)]
+TALLY = {"Player2": 2, "Player5": 2, "Player7": 1}
+TALLY_STR = "Player2: 2, Player5: 2, Player7: 1"
+TRUE_ROLES_STR = (
+    "Player1, Player2, and Player3 are werewolves, "
+    "Player4, Player5, and Player6 are villagers, "
+    "Player7 is the seer, Player8 is the hunter, and Player9 is the witch."
+)
+TRUE_ROLES = {
+    **{name: 'werewolf' for name in PLAYERS[:3]},
+    **{name: 'villager' for name in PLAYERS[3:6]},
+    'Player7': 'seer',
+    'Player8': 'hunter',
+    'Player9': 'witch',
+}
+
+# 模板名 -> (格式化参数, 解码后应有的字段)
+SAMPLES = {
+    'to_all_new_game': (([names_to_str(PLAYERS)], {}), {'players': PLAYERS}),
+    'to_all_night': (([], {}), {}),
+    'to_wolves_discussion': (
+        ([names_to_str(PLAYERS[:3]), names_to_str(PLAYERS)], {}),
+        {'werewolves': PLAYERS[:3], 'players': PLAYERS},
+    ),
+    'to_wolves_vote': (([], {}), {}),
+    'to_wolves_res': (([TALLY_STR, "Player5"], {}), {'tally': TALLY, 'target': "Player5"}),
+    'to_wolves_res_tie': (([TALLY_STR], {}), {'tally': TALLY, 'target': None}),
+    'to_wolves_revote': (
+        ([TALLY_STR, names_to_str(["Player2", "Player5"])], {}),
+        {'tally': TALLY, 'tied': ["Player2", "Player5"]},
+    ),
+    'to_all_witch_turn': (([], {}), {}),
+    'to_witch_resurrect': (
+        ([], {'witch_name': "Player9", 'dead_name': "Player4"}),
+        {'player': "Player9", 'target': "Player4"},
+    ),
+    'to_witch_resurrect_no': (([], {}), {}),
+    'to_witch_resurrect_yes': (([], {}), {}),
+    'to_witch_poison': (([], {'witch_name': "Player9"}), {'player': "Player9"}),
+    'to_all_seer_turn': (([], {}), {}),
+    'to_seer': ((["Player7"], {}), {'player': "Player7"}),
+    'to_seer_result': (
+        ([], {'agent_name': "Player1", 'role': "werewolf"}),
+        {'target': "Player1", 'role': "werewolf"},
+    ),
+    'to_hunter': (([], {'name': "Player8"}), {'player': "Player8"}),
+    'to_all_hunter_shoot': ((["Player3"], {}), {'target': "Player3"}),
+    'to_all_day': (
+        ([names_to_str(["Player4", "Player6"])], {}),
+        {'victims': ["Player4", "Player6"]},
+    ),
+    'to_all_peace': (([], {}), {'victims': []}),
+    'to_dead_player': ((["Player4"], {}), {'target': "Player4"}),
+    'to_all_discuss': (([], {'names': names_to_str(PLAYERS[3:])}), {'players': PLAYERS[3:]}),
+    'to_all_vote': (([names_to_str(PLAYERS[3:])], {}), {'players': PLAYERS[3:]}),
+    'to_all_res': (([TALLY_STR, "Player5"], {}), {'tally': TALLY, 'target': "Player5"}),
+    'to_all_res_tie': (([TALLY_STR], {}), {'tally': TALLY, 'target': None}),
+    'to_all_revote': (
+        ([TALLY_STR, names_to_str(["Player2", "Player5"])], {}),
+        {'tally': TALLY, 'tied': ["Player2", "Player5"]},
+    ),
+    'to_all_wolf_win': (
+        ([], {'n_alive': 4, 'n_werewolves': 2, 'true_roles': TRUE_ROLES_STR}),
+        {'winner': 'werewolves', 'n_alive': 4, 'n_werewolves': 2, 'true_roles': TRUE_ROLES},
+    ),
+    'to_all_village_win': (
+        ([], {'true_roles': TRUE_ROLES_STR}),
+        {'winner': 'villagers', 'true_roles': TRUE_ROLES},
+    ),
+    'to_all_continue': (([], {}), {}),
+    'to_all_reflect': (([], {}), {}),
+}
+
+
+def check_event(content: str, name: str, language: str, fields: dict) -> None:
+    """解码一条消息，检查模板、语言和各字段"""
+    event = get_moderator_decoder().decode(content)
+    assert event is not None, f"{language} {name} 没有被解码"
+    assert (event.template, event.language) == (name, language), \
+        f"{language} {name} 被解码为 {event.language} {event.template}"
+    assert event.type == _TEMPLATE_SPECS[name][0]
+    for attr, expected in fields.items():
+        actual = getattr(event, attr)
+        assert actual == expected, f"{language} {name}.{attr}: {actual!r} != {expected!r}"
+
+
+def test_decode_every_template():
+    """测试两种语言的每个模板都能解码出正确的参数"""
+    print("=" * 60)
+    print("测试: 解码全部模板")
+    print("=" * 60)
+
+    # to_player_role由游戏直接拼出，只有英文一种
+    assert set(SAMPLES) == set(_TEMPLATE_SPECS) - {'to_player_role'}
+    n_decoded = 0
+    for language, prompts in PROMPTS.items():
+        for name, ((args, kwargs), fields) in SAMPLES.items():
+            content = getattr(prompts, name).format(*args, **kwargs)
+            check_event(content, name, language, fields)
+            n_decoded += 1
+
+    check_event(
+        "[Player3 ONLY] Player3, your role is seer.",
+        'to_player_role',
+        'en',
+        {'player': "Player3", 'role': "seer"},
+    )
+    print(f"[OK] {n_decoded + 1}条消息全部解码正确")
+    return True
+
+
+def test_tie_wins_over_elimination():
+    """测试平票和重新投票的消息不被淘汰模板截走"""
+    print("=" * 60)
+    print("测试: 平票优先于淘汰")
+    print("=" * 60)
+
+    # "投票结果为 {}，出现平票，无人被淘汰。" 也能被 "投票结果为 {}，{} 被淘汰。" 匹配
+    for language, prompts in PROMPTS.items():
+        for name in ['to_all_res_tie', 'to_all_revote', 'to_wolves_res_tie', 'to_wolves_revote']:
+            (args, kwargs), fields = SAMPLES[name]
+            check_event(getattr(prompts, name).format(*args, **kwargs), name, language, fields)
+    print("[OK] 平票和重新投票的消息解码为对应模板")
+    return True
+
+
+def test_repeated_placeholder():
+    """测试重复的占位符必须取相同的值"""
+    print("=" * 60)
+    print("测试: 重复占位符")
+    print("=" * 60)
+
+    decoder = get_moderator_decoder()
+    for language, prompts in PROMPTS.items():
+        names = names_to_str(PLAYERS[3:])
+        event = decoder.decode(prompts.to_all_discuss.format(names=names))
+        assert event is not None and event.players == PLAYERS[3:]
+
+        # 前后两处名单不同，不是由该模板生成的消息
+        mismatched = prompts.to_all_discuss.replace("{names}", names, 1).replace("{names}", "Player4")
+        assert decoder.decode(mismatched) is None, f"{language} 重复占位符取了不同的值"
+
+        content = prompts.to_witch_resurrect.replace("{witch_name}", "Player9", 1)
+        content = content.replace("{dead_name}", "Player4", 1).replace("{dead_name}", "Player5")
+        assert decoder.decode(content) is None, f"{language} 重复占位符取了不同的值"
+
+    assert decoder.decode("[Player3 ONLY] Player4, your role is seer.") is None
+    print("[OK] 重复占位符取不同值的消息不被解码")
+    return True
+
+
+def test_non_template_text():
+    """测试不是由模板生成的文字不被解码"""
+    print("=" * 60)
+    print("测试: 非模板文字")
+    print("=" * 60)
+
+    decoder = get_moderator_decoder()
+    for content in [
+        "",
+        "我觉得Player3很可疑，投票结果为 Player3: 2 时他被淘汰。",
+        "The voting result is Player1: 2. So Player1 has been voted out. Really?",
+        "投票结果为 Player1 二票，Player1 被淘汰。",
+    ]:
+        assert decoder.decode(content) is None, f"误解码: {content}"
+    assert decoder.decode("游戏继续。").type == EventType.CONTINUE
+    print("[OK] 非模板文字全部返回None")
+    return True
+
+
+async def ask_witch(content: str) -> Msg:
+    """向无头的女巫Player9询问是否救人"""
+    agent = PlayerAgent(name="Player9", headless=True)
+    for setup in [
+        ChinesePrompts.to_all_new_game.format(names_to_str(PLAYERS)),
+        "[Player9 ONLY] Player9, your role is witch.",
+    ]:
+        await agent.observe(Msg(name="Moderator", content=setup, role="assistant"))
+    msg = Msg(name="Moderator", content=content, role="assistant")
+    return await agent(msg, structured_model=WitchResurrectModel)
+
+
+def test_witch_reads_victim():
+    """测试女巫按模板读出被杀的玩家，而不是消息中先出现的自己的名字"""
+    print("=" * 60)
+    print("测试: 女巫读出被杀玩家")
+    print("=" * 60)
+
+    for language, prompts in PROMPTS.items():
+        content = prompts.to_witch_resurrect.format(witch_name="Player9", dead_name="Player4")
+        response = asyncio.run(ask_witch(content))
+        assert response.content not in ["不能救自己", "未获取被杀玩家信息"], \
+            f"{language} 被杀玩家读取错误: {response.content}"
+
+        content = prompts.to_witch_resurrect.format(witch_name="Player9", dead_name="Player9")
+        response = asyncio.run(ask_witch(content))
+        assert response.content == "不能救自己", f"{language} {response.content}"
+    print("[OK] 女巫读出被杀的玩家，只有自己被杀时不救")
+    return True
+
+
+def main():
+    """运行所有测试"""
+    results = []
+    for name, test in [
+        ("解码全部模板", test_decode_every_template),
+        ("平票优先于淘汰", test_tie_wins_over_elimination),
+        ("重复占位符", test_repeated_placeholder),
+        ("非模板文字", test_non_template_text),
+        ("女巫读出被杀玩家", test_witch_reads_victim),
+    ]:
+        try:
+            results.append((name, test()))
+        except Exception as e:
+            print(f"[FAIL] {name}: {e}")
+            results.append((name, False))
+
+    print("\n" + "=" * 60)
+    print("测试结果汇总")
+    print("=" * 60)
+    for name, result in results:
+        print(f"{'[PASS]' if result else '[FAIL]'}: {name}")
+
+    passed = sum(1 for _, result in results if result)
+    print(f"\n总计: {passed}/{len(results)} 测试通过")
+    return passed == len(results)
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
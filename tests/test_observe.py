@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""observe后台分析测试
+
+observe只做必要的部分，画像更新、投票记录等分析排入后台队列。连续observe
+多条消息、期间不让出事件循环时分析都还没有进行；随后的__call__先等待
+分析完成，决策应与每条消息都同步分析完的智能体完全相同。
+"""
+
+import asyncio
+import random
+import sys
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from agentscope.message import Msg
+
+from agents.player_agent import PlayerAgent
+from models.structured_models import VoteModel
+from werewolves.prompt import ChinesePrompts
+from werewolves.utils import names_to_str
+
+TEST_AGENT_NAME = "Player1"
+PLAYERS = [f"Player{i}" for i in range(1, 10)]
+DEAD = ["Player4", "Player5", "Player6"]
+
+
+def moderator(content: str, **metadata) -> Msg:
+    return Msg(name="Moderator", content=content, role="assistant", metadata=metadata or None)
+
+
+def transcript() -> list:
+    """第一晚到第一次放逐的消息"""
+    alive = [p for p in PLAYERS if p not in DEAD[:2]]
+    voters = [p for p in alive if p != "Player9"]
+    return [
+        moderator(ChinesePrompts.to_all_new_game.format(names_to_str(PLAYERS))),
+        moderator(f"[{TEST_AGENT_NAME} ONLY] {TEST_AGENT_NAME}, your role is villager."),
+        moderator(ChinesePrompts.to_all_night),
+        moderator(ChinesePrompts.to_all_day.format(names_to_str(DEAD[:2]))),
+        Msg(name="Player2", content="我是预言家，昨晚查验Player6是狼人。", role="assistant"),
+        Msg(name="Player3", content="我相信Player2，今天投Player6。", role="assistant"),
+        Msg(name="Player6", content="Player2在悍跳，我才是好人。", role="assistant"),
+        moderator(
+            ChinesePrompts.to_all_res.format("Player6: 5, Player2: 2", "Player6"),
+            vote_result={
+                'voters': voters,
+                'targets': ["Player2", "Player6"],
+                'matrix': [[1, 0] if p in ("Player6", "Player7") else [0, 1] for p in voters],
+                'winner': "Player6",
+                'tied': [],
+            },
+        ),
+    ]
+
+
+async def play(drain: bool) -> tuple:
+    """让智能体依次observe全部消息后投票
+
+    Args:
+        drain: 是否在每次observe后同步处理分析
+
+    Returns:
+        (智能体, 投票前是否还有未完成的分析, 投票前已有画像的玩家, 投票响应)
+    """
+    agent = PlayerAgent(name=TEST_AGENT_NAME, headless=True)
+    agent.set_rng(random.Random(0))
+    for msg in transcript():
+        # observe不会让出事件循环，后台任务在此期间没有机会运行
+        await agent.observe(msg)
+        if drain:
+            agent.drain_analysis()
+    pending = not agent._analysis_queue.empty()
+    profiled = set(agent.memory_manager.profiler.profiles)
+
+    vote_msg = Msg(name="Moderator", content="请投票。", role="assistant")
+    response = await agent(vote_msg, structured_model=VoteModel)
+    return agent, pending, profiled, response
+
+
+async def test_call_waits_for_queued_analysis():
+    """测试__call__的决策反映此前observe的全部消息"""
+    print("=" * 60)
+    print("测试: 决策反映全部消息")
+    print("=" * 60)
+
+    agent, pending, profiled, response = await play(drain=False)
+    assert pending, "observe期间后台分析已经运行，测试没有覆盖等待"
+    assert "Player2" not in profiled, "画像更新没有排入后台分析"
+
+    # __call__返回时全部分析都已完成
+    assert agent._analysis_queue.empty()
+    profiles = agent.memory_manager.profiler.profiles
+    assert {"Player2", "Player3", "Player6"} <= set(profiles)
+    strategy = agent.strategy_manager.get_current_strategy()
+    assert strategy.player_info["Player3"].voting_history == ["Player6"]
+    assert strategy.player_info["Player6"].voting_history == ["Player2"]
+
+    vote = response.metadata['vote']
+    assert vote in agent.roster.others(TEST_AGENT_NAME), f"投给了{vote}"
+
+    # 与每条消息都同步分析完的智能体决策相同
+    _, _, _, expected = await play(drain=True)
+    assert (response.content, response.metadata) == (expected.content, expected.metadata)
+    print(f"[OK] 等待{len(transcript())}条消息的分析后投票给{vote}，与同步分析一致")
+    return True
+
+
+async def main():
+    """运行所有测试"""
+    results = []
+    for name, test in [
+        ("决策反映全部消息", test_call_waits_for_queued_analysis),
+    ]:
+        try:
+            results.append((name, await test()))
+        except Exception as e:
+            print(f"[FAIL] {name}: {e}")
+            results.append((name, False))
+
+    print("\n" + "=" * 60)
+    print("测试结果汇总")
+    print("=" * 60)
+    for name, result in results:
+        print(f"{'[PASS]' if result else '[FAIL]'}: {name}")
+
+    passed = sum(1 for _, result in results if result)
+    print(f"\n总计: {passed}/{len(results)} 测试通过")
+    return passed == len(results)
+
+
+if __name__ == "__main__":
+    success = asyncio.run(main())
+    sys.exit(0 if success else 1)
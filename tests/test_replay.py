@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""对局回放测试
+
+无头对局记录到事件日志后回放，回放的每次调用都应与记录一致；
+中途崩溃后从检查点恢复的对局，回放时同样应与记录一致。
+"""
+
+import asyncio
+import functools
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from agents.player_agent import PlayerAgent
+from werewolves.event_log import GameEventLog
+from werewolves.game import resume_game, werewolves_game
+from werewolves.replay import replay_game
+from werewolves.simulation import create_players
+
+AGENT_FACTORY = functools.partial(PlayerAgent, headless=True)
+
+
+class GameCrash(Exception):
+    """模拟对局进程中途崩溃"""
+
+
+class CrashingPlayerAgent(PlayerAgent):
+    """第crash_at次被调用时崩溃的智能体"""
+
+    n_calls = 0
+    crash_at = 30
+
+    async def __call__(self, msg=None, **kwargs):
+        CrashingPlayerAgent.n_calls += 1
+        if CrashingPlayerAgent.n_calls == CrashingPlayerAgent.crash_at:
+            raise GameCrash(f"第{CrashingPlayerAgent.n_calls}次调用时崩溃")
+        return await super().__call__(msg, **kwargs)
+
+
+async def test_replay_game():
+    """测试回放完整对局"""
+    print("=" * 60)
+    print("测试: 回放完整对局")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        log_path = os.path.join(tmp_dir, "game.jsonl")
+        with GameEventLog(log_path) as event_log:
+            await werewolves_game(
+                create_players(AGENT_FACTORY),
+                headless=True,
+                seed=3,
+                event_log=event_log,
+            )
+
+        results = await replay_game(log_path, AGENT_FACTORY)
+
+    assert len(results) == 1
+    assert results[0].n_calls > 0
+    assert results[0].mismatches == [], results[0].mismatches
+    print(f"[OK] 回放{results[0].n_calls}次调用，全部一致")
+    return True
+
+
+async def test_replay_resumed_game():
+    """测试回放从检查点恢复的对局"""
+    print("=" * 60)
+    print("测试: 回放从检查点恢复的对局")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        log_path = os.path.join(tmp_dir, "game.jsonl")
+        checkpoint_path = os.path.join(tmp_dir, "checkpoint.json")
+
+        # 崩溃前后的两段对局记录在同一个日志中
+        CrashingPlayerAgent.n_calls = 0
+        with GameEventLog(log_path) as event_log:
+            try:
+                await werewolves_game(
+                    create_players(functools.partial(CrashingPlayerAgent, headless=True)),
+                    headless=True,
+                    seed=5,
+                    event_log=event_log,
+                    checkpoint_path=checkpoint_path,
+                )
+            except GameCrash:
+                pass
+            else:
+                raise AssertionError("对局没有崩溃")
+            assert os.path.exists(checkpoint_path), "没有留下检查点"
+
+            await resume_game(
+                create_players(AGENT_FACTORY),
+                checkpoint_path,
+                headless=True,
+                event_log=event_log,
+            )
+
+        results = await replay_game(log_path, AGENT_FACTORY)
+
+    assert len(results) == 2
+    for result in results:
+        assert result.n_calls > 0
+        assert result.mismatches == [], result.mismatches
+    print(f"[OK] 崩溃前回放{results[0].n_calls}次调用，"
+          f"恢复后回放{results[1].n_calls}次调用，全部一致")
+    return True
+
+
+async def main():
+    """运行所有测试"""
+    results = []
+    for name, test in [
+        ("回放完整对局", test_replay_game),
+        ("回放恢复的对局", test_replay_resumed_game),
+    ]:
+        try:
+            results.append((name, await test()))
+        except Exception as e:
+            print(f"[FAIL] {name}: {e}")
+            results.append((name, False))
+
+    print("\n" + "=" * 60)
+    print("测试结果汇总")
+    print("=" * 60)
+    for name, result in results:
+        print(f"{'[PASS]' if result else '[FAIL]'}: {name}")
+
+    passed = sum(1 for _, result in results if result)
+    print(f"\n总计: {passed}/{len(results)} 测试通过")
+    return passed == len(results)
+
+
+if __name__ == "__main__":
+    success = asyncio.run(main())
+    sys.exit(0 if success else 1)
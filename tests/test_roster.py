@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""存活名册测试
+
+名册按座位记录全部玩家的存活状态：开局建立，按死讯、放逐和主持人给出的
+存活玩家列表更新，可以从保存的列表恢复，已经交给调用方的列表不会被修改。
+消息处理器按主持人消息更新名册，对局中任何投票都不会投给投票者自己。
+"""
+
+import asyncio
+import functools
+import sys
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from agentscope.message import Msg
+
+from agents.player_agent import PlayerAgent
+from core.message_handler import MessageHandler
+from models.roster import Roster
+from werewolves.game import werewolves_game
+from werewolves.prompt import ChinesePrompts
+from werewolves.simulation import create_players
+from werewolves.utils import names_to_str
+
+PLAYERS = [f"Player{i}" for i in range(1, 10)]
+
+
+def test_start_and_mark_dead():
+    """测试开局建立名册和记录死亡"""
+    print("=" * 60)
+    print("测试: 开局与死亡")
+    print("=" * 60)
+
+    roster = Roster()
+    roster.start(PLAYERS)
+    assert roster.players == PLAYERS and roster.alive_players == PLAYERS
+    assert roster.dead_players == [] and len(roster) == 9
+
+    revision = roster.revision
+    assert roster.mark_dead("Player5") and roster.mark_dead("Player2")
+    assert not roster.mark_dead("Player5"), "重复的死讯改变了名册"
+    assert roster.revision == revision + 2
+    # 存活玩家按座位排列，死亡玩家按死亡顺序排列
+    assert roster.alive_players == [p for p in PLAYERS if p not in ("Player2", "Player5")]
+    assert roster.dead_players == ["Player5", "Player2"]
+    assert not roster.is_alive("Player5") and "Player5" not in roster
+    assert roster.knows("Player5") and not roster.knows("Player10")
+    assert roster.others("Player1") == [p for p in roster.alive_players if p != "Player1"]
+
+    # 名册外的玩家死亡时补上座位
+    assert roster.mark_dead("Player10")
+    assert roster.players[-1] == "Player10" and roster.dead_players[-1] == "Player10"
+
+    # 新的一局清空上一局的状态
+    roster.start(PLAYERS[:6])
+    assert roster.alive_players == PLAYERS[:6] and roster.dead_players == []
+    print("[OK] 开局、死亡与重新开局都正确")
+    return True
+
+
+def test_sync_alive():
+    """测试按主持人的存活玩家列表校正名册"""
+    print("=" * 60)
+    print("测试: 校正存活玩家")
+    print("=" * 60)
+
+    roster = Roster()
+    roster.start(PLAYERS)
+    roster.mark_dead("Player3")
+
+    revision = roster.revision
+    assert not roster.sync_alive(roster.alive_players)
+    assert roster.revision == revision, "没有变化时名册版本不应递增"
+
+    # 主持人的列表是权威的：Player3复活，Player7和Player8死亡
+    alive = [p for p in PLAYERS if p not in ("Player7", "Player8")]
+    assert roster.sync_alive(reversed(alive))
+    assert roster.alive_players == alive
+    assert roster.dead_players == ["Player7", "Player8"]
+    assert roster.revision == revision + 1
+    print("[OK] 名册按主持人的列表复活和淘汰玩家")
+    return True
+
+
+def test_restore():
+    """测试从保存的玩家列表恢复名册"""
+    print("=" * 60)
+    print("测试: 恢复名册")
+    print("=" * 60)
+
+    roster = Roster()
+    roster.start(PLAYERS)
+    for player in ["Player4", "Player1", "Player8"]:
+        roster.mark_dead(player)
+
+    restored = Roster()
+    restored.restore(roster.alive_players, roster.dead_players, roster.players)
+    assert restored.players == roster.players
+    assert restored.alive_players == roster.alive_players
+    assert restored.dead_players == roster.dead_players
+
+    # 没有座位顺序时，按存活、死亡玩家的顺序排座位
+    restored.restore(["Player2", "Player3"], ["Player1"])
+    assert restored.players == ["Player2", "Player3", "Player1"]
+    assert restored.alive_players == ["Player2", "Player3"]
+    assert restored.dead_players == ["Player1"]
+    print("[OK] 恢复后的名册与保存时一致")
+    return True
+
+
+def test_snapshots_not_modified():
+    """测试已经交给调用方的列表不会被名册修改"""
+    print("=" * 60)
+    print("测试: 列表快照不变")
+    print("=" * 60)
+
+    roster = Roster()
+    roster.start(PLAYERS)
+    players = roster.players
+    alive = roster.alive_players
+    dead = roster.dead_players
+    others = roster.others("Player1")
+
+    roster.mark_dead("Player6")
+    roster.sync_alive(PLAYERS[:5])
+    roster.mark_dead("Player10")
+
+    assert players == PLAYERS and alive == PLAYERS and dead == []
+    assert others == PLAYERS[1:]
+    assert roster.alive_players == PLAYERS[:5] and roster.players == [*PLAYERS, "Player10"]
+    print("[OK] 名册变化后，之前取出的列表保持不变")
+    return True
+
+
+def moderator(content: str) -> Msg:
+    return Msg(name="Moderator", content=content, role="assistant")
+
+
+def test_message_handler_transcript():
+    """测试消息处理器按解码的对局记录更新名册"""
+    print("=" * 60)
+    print("测试: 按对局记录更新名册")
+    print("=" * 60)
+
+    handler = MessageHandler("Player1")
+    transcript = [
+        (moderator(ChinesePrompts.to_all_new_game.format(names_to_str(PLAYERS))), []),
+        (moderator("[Player1 ONLY] Player1, your role is villager."), []),
+        (moderator(ChinesePrompts.to_all_night), []),
+        (moderator(ChinesePrompts.to_all_day.format(names_to_str(["Player4", "Player9"]))),
+         ["Player4", "Player9"]),
+        # 玩家发言中的"被淘汰"不是事件
+        (Msg(name="Player2", content="我觉得Player3被淘汰是迟早的事。", role="assistant"), []),
+        (moderator(ChinesePrompts.to_all_res.format("Player3: 4, Player5: 3", "Player3")),
+         ["Player3"]),
+        # 遗言提示重复报告已放逐的玩家，名册不变
+        (moderator(ChinesePrompts.to_dead_player.format("Player3")), ["Player3"]),
+        (moderator(ChinesePrompts.to_all_hunter_shoot.format("Player6")), ["Player6"]),
+        (moderator(ChinesePrompts.to_all_night), []),
+        (moderator(ChinesePrompts.to_all_peace), []),
+        (moderator(ChinesePrompts.to_all_res_tie.format("Player2: 2, Player5: 2")), []),
+    ]
+
+    dead = []
+    for msg, died in transcript:
+        parsed = handler.process_message(msg)
+        assert parsed['player_died'] == died, f"{msg.content}: {parsed['player_died']}"
+        dead.extend(p for p in died if p not in dead)
+        state = handler.get_game_state()
+        assert state['dead_players'] == dead
+        assert state['alive_players'] == [p for p in PLAYERS if p not in dead]
+
+    # 主持人给出的存活玩家列表校正名册
+    alive = ["Player1", "Player2", "Player5", "Player7"]
+    handler.process_message(moderator(ChinesePrompts.to_all_vote.format(names_to_str(alive))))
+    assert handler.roster.alive_players == alive
+    assert handler.roster.dead_players == [*dead, "Player8"]
+    print(f"[OK] {len(transcript) + 1}条消息后存活{alive}")
+    return True
+
+
+class VoteRecordingAgent(PlayerAgent):
+    """记录每次投票及投票时存活名册的智能体"""
+
+    votes: list = []
+
+    async def __call__(self, msg=None, **kwargs):
+        response = await super().__call__(msg, **kwargs)
+        metadata = response.metadata or {}
+        if 'vote' in metadata:
+            VoteRecordingAgent.votes.append(
+                (self.name, metadata['vote'], list(self.roster.alive_players))
+            )
+        return response
+
+
+def test_no_vote_targets_voter():
+    """测试对局中没有投票投给投票者自己"""
+    print("=" * 60)
+    print("测试: 不投自己")
+    print("=" * 60)
+
+    VoteRecordingAgent.votes = []
+    factory = functools.partial(VoteRecordingAgent, headless=True)
+    for seed in range(3):
+        asyncio.run(werewolves_game(create_players(factory), headless=True, seed=seed))
+
+    votes = VoteRecordingAgent.votes
+    assert votes, "没有记录到投票"
+    for voter, target, alive in votes:
+        assert target != voter, f"{voter}投给了自己"
+        assert target in alive, f"{voter}投给了不在存活名册中的{target}"
+    print(f"[OK] {len(votes)}次投票都投给其他存活玩家")
+    return True
+
+
+def main():
+    """运行所有测试"""
+    results = []
+    for name, test in [
+        ("开局与死亡", test_start_and_mark_dead),
+        ("校正存活玩家", test_sync_alive),
+        ("恢复名册", test_restore),
+        ("列表快照不变", test_snapshots_not_modified),
+        ("按对局记录更新名册", test_message_handler_transcript),
+        ("不投自己", test_no_vote_targets_voter),
+    ]:
+        try:
+            results.append((name, test()))
+        except Exception as e:
+            print(f"[FAIL] {name}: {e}")
+            results.append((name, False))
+
+    print("\n" + "=" * 60)
+    print("测试结果汇总")
+    print("=" * 60)
+    for name, result in results:
+        print(f"{'[PASS]' if result else '[FAIL]'}: {name}")
+
+    passed = sum(1 for _, result in results if result)
+    print(f"\n总计: {passed}/{len(results)} 测试通过")
+    return passed == len(results)
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
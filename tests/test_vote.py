@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""投票引擎测试
+
+平票按策略处理：RANDOM用传入的随机数生成器抽取，结果可复现；
+NO_ELIMINATION无人出局；REVOTE在平票的玩家中重新投票，再次平票时
+无人出局。投给非候选人的票按弃权处理。
+"""
+
+import asyncio
+import random
+import sys
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from agentscope.agent import AgentBase
+from agentscope.message import Msg
+
+from werewolves.delivery import BatchedMsgHub
+from werewolves.game import vote_stage
+from werewolves.prompt import ChinesePrompts
+from werewolves.vote import TiePolicy, tally_votes
+
+TIED_VOTES = {
+    "Player1": "Player3",
+    "Player2": "Player4",
+    "Player3": "Player4",
+    "Player4": "Player3",
+    "Player5": None,
+}
+
+
+class ScriptedVoter(AgentBase):
+    """按给定顺序逐轮投票的玩家，记录每轮的候选人和收到的消息"""
+
+    def __init__(self, name: str, targets: list):
+        super().__init__()
+        self.name = name
+        self.targets = targets
+        self.candidates: list = []
+        self.observed: list = []
+
+    async def reply(self, msg=None, structured_model=None) -> Msg:
+        target = self.targets[min(len(self.candidates), len(self.targets) - 1)]
+        self.candidates.append(list(structured_model.player_names))
+        return Msg(self.name, f"我投{target}", "assistant", metadata={"vote": target})
+
+    async def observe(self, msg) -> None:
+        self.observed.extend(msg if isinstance(msg, list) else [msg])
+
+    async def handle_interrupt(self, *args, **kwargs) -> Msg:
+        raise NotImplementedError
+
+
+async def run_vote(scripts: dict, candidates: list, tie_policy: TiePolicy) -> tuple:
+    """进行一次白天投票
+
+    Returns:
+        (投票的玩家, 投票结果)
+    """
+    voters = [ScriptedVoter(name, targets) for name, targets in scripts.items()]
+    by_name = {_.name: _ for _ in voters}
+    announcement = Msg("Moderator", ChinesePrompts.to_all_vote.format(", ".join(candidates)), "assistant")
+    async with BatchedMsgHub(participants=voters, enable_auto_broadcast=False) as hub:
+        _, result = await vote_stage(
+            voters,
+            [by_name[name] for name in candidates],
+            announcement,
+            hub,
+            ChinesePrompts.to_all_revote,
+            tie_policy,
+            random.Random(0),
+        )
+    return voters, result
+
+
+def test_random_tie_uses_rng():
+    """测试RANDOM平票用传入的随机数生成器抽取"""
+    print("=" * 60)
+    print("测试: 随机打破平票")
+    print("=" * 60)
+
+    winners = set()
+    for seed in range(20):
+        result = tally_votes(TIED_VOTES, TiePolicy.RANDOM, random.Random(seed))
+        # 平票的玩家按先达到最高票数的顺序排列
+        assert result.tied == ["Player4", "Player3"]
+        assert result.winner == random.Random(seed).choice(result.tied)
+        assert tally_votes(TIED_VOTES, TiePolicy.RANDOM, random.Random(seed)).winner == result.winner
+        winners.add(result.winner)
+    assert winners == {"Player3", "Player4"}
+    print("[OK] 同一种子抽到同一玩家，不同种子两名玩家都会被抽到")
+    return True
+
+
+def test_no_elimination_and_abstentions():
+    """测试NO_ELIMINATION平票无人出局，弃权不计入"""
+    print("=" * 60)
+    print("测试: 平票无人出局")
+    print("=" * 60)
+
+    result = tally_votes(TIED_VOTES, TiePolicy.NO_ELIMINATION)
+    assert result.winner is None and result.is_tie
+    assert result.voters == ["Player1", "Player2", "Player3", "Player4"]
+    assert result.targets == ["Player3", "Player4"]
+    assert result.matrix == [[1, 0], [0, 1], [0, 1], [1, 0]]
+    assert result.conditions() == "Player3: 2, Player4: 2"
+
+    # 没有平票时与策略无关
+    for policy in TiePolicy:
+        assert tally_votes({"Player1": "Player2", "Player2": "Player2"}, policy).winner == "Player2"
+    assert tally_votes({"Player1": None}).winner is None
+    print("[OK] 平票无人出局，弃权的玩家不在投票矩阵中")
+    return True
+
+
+async def test_revote_then_tie():
+    """测试REVOTE重新投票后再次平票时无人出局"""
+    print("=" * 60)
+    print("测试: 重新投票再次平票")
+    print("=" * 60)
+
+    scripts = {
+        "Player1": ["Player3", "Player3"],
+        "Player2": ["Player4", "Player4"],
+        "Player3": ["Player4", "Player4"],
+        "Player4": ["Player3", "Player3"],
+        "Player5": ["Player5", "Player3"],
+    }
+    voters, result = await run_vote(scripts, ["Player3", "Player4", "Player5"], TiePolicy.REVOTE)
+
+    # 第一轮Player3和Player4平票，第二轮只在两人中投票，Player5改投Player3
+    assert result.winner == "Player3", result
+    for voter in voters:
+        assert voter.candidates == [["Player3", "Player4", "Player5"], ["Player3", "Player4"]]
+        # 重新投票前公布第一轮的投票，平票结果随重新投票的提问一起给出
+        assert [_.name for _ in voter.observed] == list(scripts)
+
+    scripts["Player5"] = ["Player5", None]
+    voters, result = await run_vote(scripts, ["Player3", "Player4", "Player5"], TiePolicy.REVOTE)
+    assert result.winner is None and sorted(result.tied) == ["Player3", "Player4"], result
+    # 第二次平票后不再投票
+    assert all(len(voter.candidates) == 2 for voter in voters)
+    print("[OK] 重新投票只在平票玩家中进行，再次平票时无人出局")
+    return True
+
+
+async def test_non_candidate_votes_abstain():
+    """测试投给非候选人的票按弃权处理"""
+    print("=" * 60)
+    print("测试: 投给非候选人按弃权处理")
+    print("=" * 60)
+
+    scripts = {
+        "Player1": ["Player3"],
+        "Player2": ["Player9"],
+        "Player3": ["Player4"],
+        "Player4": ["Player9"],
+        "Player5": ["Player3"],
+    }
+    _, result = await run_vote(scripts, ["Player3", "Player4"], TiePolicy.NO_ELIMINATION)
+    assert result.winner == "Player3"
+    assert result.voters == ["Player1", "Player3", "Player5"]
+    assert "Player9" not in result.counts
+    print("[OK] 投给Player9的两票不计入，Player3以2:1出局")
+    return True
+
+
+async def main():
+    """运行所有测试"""
+    results = []
+    for name, test in [
+        ("随机打破平票", test_random_tie_uses_rng),
+        ("平票无人出局", test_no_elimination_and_abstentions),
+        ("重新投票再次平票", test_revote_then_tie),
+        ("投给非候选人按弃权处理", test_non_candidate_votes_abstain),
+    ]:
+        try:
+            result = test()
+            if asyncio.iscoroutine(result):
+                result = await result
+            results.append((name, result))
+        except Exception as e:
+            print(f"[FAIL] {name}: {e}")
+            results.append((name, False))
+
+    print("\n" + "=" * 60)
+    print("测试结果汇总")
+    print("=" * 60)
+    for name, result in results:
+        print(f"{'[PASS]' if result else '[FAIL]'}: {name}")
+
+    passed = sum(1 for _, result in results if result)
+    print(f"\n总计: {passed}/{len(results)} 测试通过")
+    return passed == len(results)
+
+
+if __name__ == "__main__":
+    success = asyncio.run(main())
+    sys.exit(0 if success else 1)
@@ -1,13 +1,31 @@
 # -*- coding: utf-8 -*-
-"""工具模块"""
+"""工具模块
 
-from .logger import WerewolfLogger, GameMetrics
-from .parser import EnvInfoParser
-from .official_compatibility import *
+子模块在首次访问时才导入，避免导入utils.logger时连带加载结构化模型等较重的模块。
+"""
+
+import importlib
+
+_LAZY_ATTRS = {
+    'WerewolfLogger': '.logger',
+    'GameMetrics': '.logger',
+    'EnvInfoParser': '.parser',
+    'OfficialCompatibilityAdapter': '.official_compatibility',
+    'OfficialModelFactory': '.official_compatibility',
+}
 
 __all__ = [
     'WerewolfLogger',
     'GameMetrics',
     'EnvInfoParser',
-    'APIAdapter'
-]
\ No newline at end of file
+    'OfficialCompatibilityAdapter',
+    'OfficialModelFactory'
+]
+
+
+def __getattr__(name: str):
+    """按需导入子模块中的类"""
+    if name in _LAZY_ATTRS:
+        module = importlib.import_module(_LAZY_ATTRS[name], __name__)
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -20,6 +20,12 @@ class WerewolfLogger:
             log_file: 日志文件路径，如果为None则只输出到控制台
         """
         self.logger = logging.getLogger(name)
+        
+        # 同名日志器（同一智能体的各个组件）只配置一次，
+        # 之后创建的实例直接复用，不再重复清除和添加处理器
+        if getattr(self.logger, '_werewolf_configured', False) and not log_file:
+            return
+        self.logger._werewolf_configured = True
         self.logger.setLevel(getattr(logging, log_level.upper()))
         
         # 清除已有的处理器
@@ -47,6 +53,14 @@ class WerewolfLogger:
             file_handler.setFormatter(formatter)
             self.logger.addHandler(file_handler)
     
+    def set_level(self, log_level: str) -> None:
+        """设置日志级别
+        
+        Args:
+            log_level: 日志级别，如 "INFO"、"WARNING"、"ERROR"
+        """
+        self.logger.setLevel(getattr(logging, log_level.upper()))
+    
     def debug(self, message: str, extra: Optional[Dict[str, Any]] = None) -> None:
         """记录调试信息"""
         self._log(logging.DEBUG, message, extra)
@@ -275,5 +289,14 @@ class GameMetrics:
         }
 
 
-# 全局日志器实例
-default_logger = WerewolfLogger("werewolf")
+_default_logger: Optional[WerewolfLogger] = None
+
+
+def __getattr__(name: str) -> Any:
+    """全局日志器实例default_logger在首次访问时才创建"""
+    global _default_logger
+    if name == "default_logger":
+        if _default_logger is None:
+            _default_logger = WerewolfLogger("werewolf")
+        return _default_logger
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -4,9 +4,16 @@
 import re
 import json
 import time
-from typing import Dict, List, Any, Optional, Tuple
+from collections import defaultdict, deque
+from typing import Deque, Dict, List, Any, Optional, Tuple
 from models.reasoning import GameObservation, PlayerInfo
 
+# 保留的历史条数，更早的记录被环形缓冲区挤出
+HISTORY_SIZE = 1000
+
+# 查找玩家最后行动时回看的历史条数
+LAST_ACTION_WINDOW = 10
+
 
 class EnvInfoParser:
     """环境信息解析器"""
@@ -17,7 +24,15 @@ class EnvInfoParser:
         self.alive_players = []
         self.dead_players = []
         self.player_roles = {}  # 已知的角色信息
-        self.game_history = []
+        self.game_history: Deque[Dict[str, Any]] = deque(maxlen=HISTORY_SIZE)
+        
+        # 随历史追加增量维护的索引，查询玩家信息时不再扫描历史。
+        # 序号是记录在全部历史中的位置，已记录的条数即下一条的序号
+        self._n_recorded = 0
+        # 玩家 -> 仍在历史中的投票（序号, 投票目标），按序号递增
+        self._vote_index: Dict[str, Deque[Tuple[int, str]]] = defaultdict(deque)
+        # 玩家 -> 最后一次行动（序号, 行动）
+        self._last_actions: Dict[str, Tuple[int, str]] = {}
         
     def parse_env_info(self, env_info: Any) -> GameObservation:
         """解析环境信息为结构化数据
@@ -279,11 +294,32 @@ class EnvInfoParser:
             'observation': observation_dict,
             'raw_info': raw_info
         }
-        self.game_history.append(history_entry)
         
-        # 限制历史长度
-        if len(self.game_history) > 1000:
-            self.game_history = self.game_history[-500:]
+        # 历史已满时最早的一条被挤出，它的投票也移出索引
+        if len(self.game_history) == self.game_history.maxlen:
+            evicted_seq = self._n_recorded - len(self.game_history)
+            evicted_votes = self.game_history[0]['raw_info'].get('votes')
+            if isinstance(evicted_votes, dict):
+                for voter in evicted_votes:
+                    votes = self._vote_index.get(voter)
+                    while votes and votes[0][0] <= evicted_seq:
+                        votes.popleft()
+                    if votes is not None and not votes:
+                        del self._vote_index[voter]
+        
+        seq = self._n_recorded
+        self.game_history.append(history_entry)
+        self._n_recorded += 1
+        
+        # 更新投票和行动索引
+        votes = raw_info.get('votes')
+        if isinstance(votes, dict):
+            for voter, target in votes.items():
+                self._vote_index[voter].append((seq, str(target)))
+        actions = raw_info.get('actions')
+        if isinstance(actions, dict):
+            for player, action in actions.items():
+                self._last_actions[player] = (seq, str(action))
     
     def get_player_info(self, player_name: str) -> PlayerInfo:
         """获取玩家信息"""
@@ -321,12 +357,7 @@ class EnvInfoParser:
         base_score = 0.5
         
         # 根据历史行为调整
-        for entry in self.game_history[-20:]:  # 只看最近20条记录
-            raw_info = entry.get('raw_info', {})
-            # 这里可以根据具体的行为模式调整信任分数
-            # 暂时返回基础分数
-            pass
-        
+        # 这里可以根据最近的行为模式调整信任分数，暂时返回基础分数
         return base_score
     
     def _calculate_suspicion_level(self, player_name: str) -> float:
@@ -339,22 +370,15 @@ class EnvInfoParser:
         return base_suspicion
     
     def _get_last_action(self, player_name: str) -> Optional[str]:
-        """获取最后行动"""
-        # 从历史中查找该玩家的最后行动
-        for entry in reversed(self.game_history[-10:]):
-            raw_info = entry.get('raw_info', {})
-            if 'actions' in raw_info and player_name in raw_info['actions']:
-                return str(raw_info['actions'][player_name])
+        """获取最后行动（只看最近LAST_ACTION_WINDOW条历史）"""
+        last_action = self._last_actions.get(player_name)
+        if last_action and last_action[0] >= self._n_recorded - LAST_ACTION_WINDOW:
+            return last_action[1]
         return None
     
     def _get_voting_history(self, player_name: str) -> List[str]:
-        """获取投票历史"""
-        voting_history = []
-        for entry in self.game_history:
-            raw_info = entry.get('raw_info', {})
-            if 'votes' in raw_info and player_name in raw_info['votes']:
-                voting_history.append(str(raw_info['votes'][player_name]))
-        return voting_history
+        """获取投票历史（仍在历史中的全部投票）"""
+        return [target for _, target in self._vote_index.get(player_name, ())]
     
     def update_role_info(self, player_name: str, role: str) -> None:
         """更新角色信息"""
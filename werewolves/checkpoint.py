@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+"""Mid-game checkpoints of the werewolf game.
+
+A game with a checkpoint path saves its state at every phase boundary,
+i.e. before each night and before each day discussion, together with the
+`state_dict` of every agent. `werewolves.game.resume_game` continues a
+game from its last checkpoint, e.g. after the process was preempted.
+"""
+import json
+import os
+import random
+from dataclasses import asdict, dataclass, field
+from typing import Any
+
+from werewolves.utils import Players
+
+from agentscope.agent import ReActAgent
+
+
+@dataclass
+class GameCheckpoint:
+    """The state of a game at a phase boundary."""
+
+    seats: list[str]
+    """The player names in seat order."""
+
+    roles: list[str]
+    """The roles in seat order."""
+
+    alive: list[str]
+    """The names of the alive players."""
+
+    healing: bool
+    """Whether the witch still has the healing potion."""
+
+    poison: bool
+    """Whether the witch still has the poison potion."""
+
+    first_day: bool
+    """Whether it is the first day, when the killed player can leave a last
+    message."""
+
+    round_idx: int
+    """The index of the current round, starting from 0."""
+
+    phase: str
+    """The phase to run next, `"night"` or `"day"`."""
+
+    rng_state: list[Any]
+    """The state of the game's random generator."""
+
+    seed: int | None = None
+    """The seed of the game."""
+
+    tie_policy: str = "random"
+    """The tie policy of the votes."""
+
+    agent_states: dict[str, dict] = field(default_factory=dict)
+    """The `state_dict` of each agent, by name."""
+
+    @classmethod
+    def capture(
+        cls,
+        players: Players,
+        round_idx: int,
+        phase: str,
+        healing: bool,
+        poison: bool,
+        first_day: bool,
+        rng: random.Random,
+        seed: int | None,
+        tie_policy: str,
+    ) -> "GameCheckpoint":
+        """Capture the state of a running game and of its agents."""
+        return cls(
+            seats=[_.name for _ in players.all_players],
+            roles=[players.name_to_role[_.name] for _ in players.all_players],
+            alive=[_.name for _ in players.current_alive],
+            healing=healing,
+            poison=poison,
+            first_day=first_day,
+            round_idx=round_idx,
+            phase=phase,
+            rng_state=list(rng.getstate()),
+            seed=seed,
+            tie_policy=tie_policy,
+            agent_states={
+                _.name: _.state_dict() for _ in players.all_players
+            },
+        )
+
+    def restore_players(self, agents: list[ReActAgent]) -> Players:
+        """Rebuild the roster from the given agents, which are matched to
+        the seats by name, and load their states.
+
+        Args:
+            agents (`list[ReActAgent]`):
+                The agents of the game, in any order.
+
+        Returns:
+            `Players`:
+                The roster, with the dead players eliminated.
+        """
+        name_to_agent = {_.name: _ for _ in agents}
+        if set(name_to_agent) != set(self.seats):
+            raise ValueError(
+                f"The agents {sorted(name_to_agent)} do not match the players "
+                f"of the checkpoint {sorted(self.seats)}.",
+            )
+
+        players = Players()
+        for name, role in zip(self.seats, self.roles):
+            agent = name_to_agent[name]
+            if name in self.agent_states:
+                agent.load_state_dict(self.agent_states[name])
+            players.add_player(agent, role)
+
+        alive = set(self.alive)
+        players.update_players([_ for _ in self.seats if _ not in alive])
+        return players
+
+    def restore_rng(self) -> random.Random:
+        """Rebuild the game's random generator."""
+        version, internal_state, gauss_next = self.rng_state
+        rng = random.Random()
+        rng.setstate((version, tuple(internal_state), gauss_next))
+        return rng
+
+
+def save_checkpoint(path: str, checkpoint: GameCheckpoint) -> None:
+    """Save a checkpoint atomically, so that a crash while saving never
+    leaves a truncated file behind.
+
+    Args:
+        path (`str`):
+            The path of the checkpoint file.
+        checkpoint (`GameCheckpoint`):
+            The checkpoint to save.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as file:
+        json.dump(asdict(checkpoint), file, ensure_ascii=False, default=str)
+    os.replace(tmp_path, path)
+
+
+def load_checkpoint(path: str) -> GameCheckpoint | None:
+    """Load a checkpoint.
+
+    Args:
+        path (`str`):
+            The path of the checkpoint file.
+
+    Returns:
+        `GameCheckpoint | None`:
+            The checkpoint, or `None` if there is no checkpoint at `path`.
+    """
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as file:
+        return GameCheckpoint(**json.load(file))
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""Batched delivery of the game's messages to the agents.
+
+By default every message broadcast by the moderator is observed right away,
+so an agent runs its `observe` once per message. In a batched game the
+messages are queued per agent instead, and an agent observes all of its
+queued messages as one list right before it is called, so that it can
+process all that happened since its last turn in one pass. An agent never
+observes a message out of order, since its queue is also flushed before
+it can receive a message outside of the queue, i.e. the replies of the
+other agents in a `MsgHub` with auto broadcast.
+"""
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, Sequence
+
+from agentscope.agent import AgentBase
+from agentscope.message import Msg
+from agentscope.pipeline import MsgHub
+
+
+class ObservationBatch:
+    """The messages queued for each agent."""
+
+    def __init__(self) -> None:
+        self._pending: dict[str, tuple[AgentBase, list[Msg]]] = {}
+
+    def add(self, agent: AgentBase, msg: Msg | list[Msg]) -> None:
+        """Queue a message, or a list of messages, for an agent."""
+        if agent.id not in self._pending:
+            self._pending[agent.id] = (agent, [])
+        if isinstance(msg, list):
+            self._pending[agent.id][1].extend(msg)
+        else:
+            self._pending[agent.id][1].append(msg)
+
+    async def flush(self, agents: Sequence[AgentBase] | None = None) -> None:
+        """Deliver the queued messages of the given agents, or of all the
+        agents, each agent observing its messages in one call."""
+        if agents is None:
+            ids = list(self._pending)
+        else:
+            ids = [_.id for _ in agents if _.id in self._pending]
+        for agent_id in ids:
+            agent, msgs = self._pending.pop(agent_id)
+            await agent.observe(msgs)
+
+
+_current_batch: ContextVar[ObservationBatch | None] = ContextVar(
+    "werewolves_observation_batch",
+    default=None,
+)
+
+
+@asynccontextmanager
+async def batched_delivery(enabled: bool = True) -> AsyncIterator[None]:
+    """Batch the messages delivered within the context, and deliver the
+    rest of them when leaving it. Nothing is batched if not `enabled`."""
+    if not enabled:
+        yield
+        return
+
+    batch = ObservationBatch()
+    token = _current_batch.set(batch)
+    try:
+        yield
+        await batch.flush()
+    finally:
+        _current_batch.reset(token)
+
+
+async def deliver(
+    agents: Sequence[AgentBase],
+    msg: Msg | list[Msg],
+) -> None:
+    """Let the agents observe a message, right away or, in a batched game,
+    with the rest of their queued messages."""
+    batch = _current_batch.get()
+    for agent in agents:
+        if batch is None:
+            await agent.observe(msg)
+        else:
+            batch.add(agent, msg)
+
+
+async def flush_observations(
+    agents: Sequence[AgentBase] | None = None,
+) -> None:
+    """Deliver the queued messages of the given agents, or of all the
+    agents, in a batched game."""
+    batch = _current_batch.get()
+    if batch is not None:
+        await batch.flush(agents)
+
+
+class BatchedMsgHub(MsgHub):
+    """A `MsgHub` whose broadcasts are delivered through `deliver`.
+
+    The replies of the participants are still broadcast right away when
+    auto broadcast is enabled, so the queued messages of the participants
+    are flushed before, when entering the hub, or by `flush`, which must be
+    awaited before auto broadcast is enabled again.
+    """
+
+    async def __aenter__(self) -> "BatchedMsgHub":
+        await super().__aenter__()
+        if self.enable_auto_broadcast:
+            await self.flush()
+        return self
+
+    async def broadcast(self, msg: list[Msg] | Msg) -> None:
+        """Deliver the message to all participants."""
+        await deliver(self.participants, msg)
+
+    async def flush(self) -> None:
+        """Deliver the queued messages of the participants."""
+        await flush_observations(self.participants)
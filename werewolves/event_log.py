@@ -0,0 +1,242 @@
+# -*- coding: utf-8 -*-
+"""The append-only event log of the werewolf game.
+
+A game being recorded emits one event per role assignment, message
+delivered to an agent, agent call, vote and phase result, with its time
+since the game started. The events are appended to a JSONL file, or to a
+binary file where each event is a JSON payload prefixed with its length as
+a 4-byte big-endian integer. See `werewolves.replay` to replay a log.
+"""
+import json
+import struct
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator
+
+from pydantic import BaseModel
+
+from werewolves.delivery import flush_observations
+
+from agentscope.agent import AgentBase
+from agentscope.message import Msg
+
+_LENGTH = struct.Struct(">I")
+
+_HOOK_NAME = "werewolves_event_log"
+
+_current_log: ContextVar["GameEventLog | None"] = ContextVar(
+    "werewolves_event_log",
+    default=None,
+)
+
+
+def dump_msg(msg: Msg | list[Msg] | None) -> Any:
+    """Convert a message, or a list of messages, to a JSON-serializable
+    object."""
+    if msg is None:
+        return None
+    if isinstance(msg, list):
+        return [_.to_dict() for _ in msg]
+    return msg.to_dict()
+
+
+def load_msg(data: Any) -> Msg | list[Msg] | None:
+    """The inverse of `dump_msg`."""
+    if data is None:
+        return None
+    if isinstance(data, list):
+        return [Msg.from_dict(_) for _ in data]
+    return Msg.from_dict(data)
+
+
+class GameEventLog:
+    """An append-only log of game events."""
+
+    def __init__(self, path: str, binary: bool = False) -> None:
+        """Open the log for appending.
+
+        Args:
+            path (`str`):
+                The path of the log file. Several games can be appended to
+                the same file, each starting with a `game_start` event.
+            binary (`bool`, defaults to `False`):
+                Write length-prefixed JSON payloads instead of JSONL.
+        """
+        self.path = path
+        self.binary = binary
+        self._file = (
+            open(path, "ab")
+            if binary
+            else open(path, "a", encoding="utf-8")
+        )
+        self._seq = 0
+        self._start_time = time.perf_counter()
+
+    def emit(self, event: str, **data: Any) -> None:
+        """Append an event.
+
+        Args:
+            event (`str`):
+                The type of the event, e.g. `"vote"`.
+            **data (`Any`):
+                The JSON-serializable fields of the event.
+        """
+        if event == "game_start":
+            self._start_time = time.perf_counter()
+        record = {
+            "seq": self._seq,
+            "t": round(time.perf_counter() - self._start_time, 6),
+            "event": event,
+            **data,
+        }
+        self._seq += 1
+        payload = json.dumps(
+            record,
+            ensure_ascii=False,
+            separators=(",", ":"),
+            default=str,
+        )
+        if self.binary:
+            encoded = payload.encode("utf-8")
+            self._file.write(_LENGTH.pack(len(encoded)) + encoded)
+        else:
+            self._file.write(payload + "\n")
+
+    def close(self) -> None:
+        """Flush and close the log file."""
+        self._file.close()
+
+    def __enter__(self) -> "GameEventLog":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def attach(self, agents: list[AgentBase]) -> None:
+        """Record every message delivered to the given agents, through
+        their `pre_observe` hooks."""
+
+        def _observe_hook(agent: AgentBase, kwargs: dict[str, Any]) -> None:
+            self.emit(
+                "observe",
+                agent=agent.name,
+                msg=dump_msg(kwargs.get("msg")),
+            )
+
+        for agent in agents:
+            agent.register_instance_hook(
+                "pre_observe",
+                _HOOK_NAME,
+                _observe_hook,
+            )
+
+    def detach(self, agents: list[AgentBase]) -> None:
+        """Stop recording the messages delivered to the given agents."""
+        for agent in agents:
+            agent.remove_instance_hook("pre_observe", _HOOK_NAME)
+
+
+@contextmanager
+def record_game(
+    event_log: GameEventLog | None,
+    agents: list[AgentBase],
+) -> Iterator[None]:
+    """Record the game played within the context into `event_log`. Nothing
+    is recorded if `event_log` is `None`."""
+    if event_log is None:
+        yield
+        return
+
+    token = _current_log.set(event_log)
+    event_log.attach(agents)
+    try:
+        yield
+    finally:
+        event_log.detach(agents)
+        _current_log.reset(token)
+
+
+def emit_event(event: str, **data: Any) -> None:
+    """Append an event to the log of the current game, if it is recorded."""
+    event_log = _current_log.get()
+    if event_log is not None:
+        event_log.emit(event, **data)
+
+
+async def call_agent(
+    agent: AgentBase,
+    msg: Msg | list[Msg] | None = None,
+    structured_model: type[BaseModel] | None = None,
+) -> Msg:
+    """Call an agent, and record the call if the current game is recorded.
+    In a batched game, the agent first observes its queued messages.
+
+    Args:
+        agent (`AgentBase`):
+            The agent to call.
+        msg (`Msg | list[Msg] | None`, optional):
+            The input message.
+        structured_model (`type[BaseModel] | None`, optional):
+            The structured output model, if any.
+
+    Returns:
+        `Msg`:
+            The reply of the agent.
+    """
+    await flush_observations([agent])
+
+    kwargs = {}
+    if structured_model is not None:
+        kwargs["structured_model"] = structured_model
+
+    event_log = _current_log.get()
+    if event_log is None:
+        return await agent(msg, **kwargs)
+
+    start_time = time.perf_counter()
+    reply = await agent(msg, **kwargs)
+    event_log.emit(
+        "call",
+        agent=agent.name,
+        msg=dump_msg(msg),
+        structured_model=(
+            None
+            if structured_model is None
+            else {
+                "name": structured_model.__name__,
+                "player_names": list(
+                    getattr(structured_model, "player_names", ()),
+                ),
+            }
+        ),
+        reply=dump_msg(reply),
+        duration=round(time.perf_counter() - start_time, 6),
+    )
+    return reply
+
+
+def read_events(path: str, binary: bool = False) -> Iterator[dict[str, Any]]:
+    """Read the events of a log file in order.
+
+    Args:
+        path (`str`):
+            The path of the log file.
+        binary (`bool`, defaults to `False`):
+            Whether the log is length-prefixed binary instead of JSONL.
+
+    Yields:
+        `dict[str, Any]`:
+            The events.
+    """
+    if not binary:
+        with open(path, encoding="utf-8") as file:
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+        return
+
+    with open(path, "rb") as file:
+        while header := file.read(_LENGTH.size):
+            (length,) = _LENGTH.unpack(header)
+            yield json.loads(file.read(length).decode("utf-8"))
@@ -1,14 +1,18 @@
 # -*- coding: utf-8 -*-
 # pylint: disable=too-many-branches, too-many-statements, no-name-in-module
 """A werewolf game implemented by agentscope."""
-import numpy as np
+import asyncio
+import os
+import random
+from copy import deepcopy
 
 from werewolves.utils import (
-    majority_vote,
     names_to_str,
     EchoAgent,
+    GameResult,
     MAX_GAME_ROUND,
     MAX_DISCUSSION_ROUND,
+    ROLE_TABLES,
     Players,
 )
 from werewolves.structured_model import (
@@ -19,6 +23,25 @@ from werewolves.structured_model import (
     get_seer_model,
     get_hunter_model,
 )
+from werewolves.vote import TiePolicy, VoteResult, tally_votes
+from werewolves.sink import NullSink, OutputSink, closing_sink
+from werewolves.checkpoint import (
+    GameCheckpoint,
+    load_checkpoint,
+    save_checkpoint,
+)
+from werewolves.delivery import (
+    BatchedMsgHub,
+    batched_delivery,
+    deliver,
+    flush_observations,
+)
+from werewolves.event_log import (
+    GameEventLog,
+    call_agent,
+    emit_event,
+    record_game,
+)
 from werewolves.prompt import EnglishPrompts as Prompts
 
 # Uncomment the following line to use Chinese prompts
@@ -26,11 +49,8 @@ from werewolves.prompt import ChinesePrompts as Prompts
 
 
 from agentscope.agent import ReActAgent
-from agentscope.pipeline import (
-    MsgHub,
-    sequential_pipeline,
-    fanout_pipeline,
-)
+from agentscope.message import Msg
+from agentscope.pipeline import MsgHub
 
 
 moderator = EchoAgent()
@@ -39,11 +59,12 @@ moderator = EchoAgent()
 async def hunter_stage(
     hunter_agent: ReActAgent,
     players: Players,
+    moderator: EchoAgent = moderator,
 ) -> str | None:
     """Because the hunter's stage may happen in two places: killed at night
     or voted during the day, we define a function here to avoid duplication."""
-    global moderator
-    msg_hunter = await hunter_agent(
+    msg_hunter = await call_agent(
+        hunter_agent,
         await moderator(Prompts.to_hunter.format(name=hunter_agent.name)),
         structured_model=get_hunter_model(players.current_alive),
     )
@@ -52,217 +73,713 @@ async def hunter_stage(
     return None
 
 
-async def werewolves_game(agents: list[ReActAgent]) -> None:
-    """The main entry of the werewolf game
-
-    Args:
-        agents (`list[ReActAgent]`):
-            A list of 9 agents.
+async def witch_stage(
+    players: Players,
+    killed_player: str | None,
+    healing: bool,
+    poison: bool,
+    msg_seer_turn: Msg,
+    moderator: EchoAgent = moderator,
+) -> tuple[str | None, str | None, bool, bool]:
+    """The witch's turn at night. It ends by announcing the seer's turn to
+    the alive players except the seer, who hears it in `seer_stage`.
+
+    Returns:
+        `tuple[str | None, str | None, bool, bool]`:
+            The killed player after the witch's healing, the poisoned
+            player, and whether the healing and poison potions are left.
     """
-    assert len(agents) == 9, "The werewolf game needs exactly 9 players."
+    poisoned_player = None
+    for agent in players.witch:
+        # Cannot heal witch herself
+        msg_witch_resurrect = None
+        if healing and killed_player not in (None, agent.name):
+            msg_witch_resurrect = await call_agent(
+                agent,
+                await moderator(
+                    Prompts.to_witch_resurrect.format(
+                        witch_name=agent.name,
+                        dead_name=killed_player,
+                    ),
+                ),
+                structured_model=WitchResurrectModel,
+            )
+            if msg_witch_resurrect.metadata.get("resurrect"):
+                killed_player = None
+                healing = False
+
+        # Has poison potion and hasn't used the healing potion
+        if poison and not (
+            msg_witch_resurrect and msg_witch_resurrect.metadata["resurrect"]
+        ):
+            msg_witch_poison = await call_agent(
+                agent,
+                await moderator(
+                    Prompts.to_witch_poison.format(
+                        witch_name=agent.name,
+                    ),
+                ),
+                structured_model=get_poison_model(players.current_alive),
+            )
+            if msg_witch_poison.metadata.get("poison"):
+                poisoned_player = msg_witch_poison.metadata.get("name")
+                poison = False
 
-    # Init the players' status
-    players = Players()
+    seers = {_.name for _ in players.seer}
+    for agent in players.current_alive:
+        if agent.name not in seers:
+            await deliver([agent], msg_seer_turn)
 
-    # If the witch has healing and poison potion
-    healing, poison = True, True
+    return killed_player, poisoned_player, healing, poison
 
-    # If it's the first day, the dead can leave a message
-    first_day = True
 
-    # Broadcast the game begin message
-    async with MsgHub(participants=agents) as greeting_hub:
-        await greeting_hub.broadcast(
+async def seer_stage(
+    players: Players,
+    msg_seer_turn: Msg,
+    moderator: EchoAgent = moderator,
+) -> None:
+    """The seer's turn at night, which only involves the seer, so that it
+    can run concurrently with the witch's turn."""
+    for agent in players.seer:
+        await deliver([agent], msg_seer_turn)
+        msg_seer = await call_agent(
+            agent,
             await moderator(
-                Prompts.to_all_new_game.format(names_to_str(agents)),
+                Prompts.to_seer.format(
+                    agent.name,
+                    names_to_str(players.current_alive),
+                ),
             ),
+            structured_model=get_seer_model(players.current_alive),
         )
+        if msg_seer.metadata.get("name"):
+            player = msg_seer.metadata["name"]
+            await deliver(
+                [agent],
+                await moderator(
+                    Prompts.to_seer_result.format(
+                        agent_name=player,
+                        role=players.name_to_role[player],
+                    ),
+                ),
+            )
 
-    # Assign roles to the agents
-    roles = ["werewolf"] * 3 + ["villager"] * 3 + ["seer", "witch", "hunter"]
-    np.random.shuffle(agents)
-    np.random.shuffle(roles)
 
-    for agent, role in zip(agents, roles):
-        # Tell the agent its role
-        await agent.observe(
-            await moderator(
-                f"[{agent.name} ONLY] {agent.name}, your role is {role}.",
+def proposal_consensus(
+    proposals: list[Msg],
+    candidates: list[ReActAgent],
+) -> str | None:
+    """The target of the werewolves' proposals if they all name the same
+    candidate, otherwise `None`."""
+    targets = {(_.metadata or {}).get("target") for _ in proposals}
+    if len(targets) == 1:
+        target = targets.pop()
+        if target in {_.name for _ in candidates}:
+            return target
+    return None
+
+
+async def discussion_stage(
+    werewolves: list[ReActAgent],
+    candidates: list[ReActAgent],
+    hub: MsgHub,
+    parallel: bool = False,
+) -> None:
+    """The werewolves' discussion at night, in `hub` with auto broadcast
+    enabled.
+
+    By default the werewolves speak one after another, for at most
+    `MAX_DISCUSSION_ROUND` rounds, and the discussion stops once the last
+    speaker of a round reaches an agreement. With `parallel`, all the
+    werewolves draft their proposals concurrently in each round, and the
+    proposals of the round are broadcast together once all are drafted.
+    The discussion stops as soon as all of them reach an agreement or name
+    the same target, so that it takes one to `MAX_DISCUSSION_ROUND` rounds
+    of parallel calls.
+    """
+    n_werewolves = len(werewolves)
+    if not parallel:
+        for _ in range(1, MAX_DISCUSSION_ROUND * n_werewolves + 1):
+            res = await call_agent(
+                werewolves[_ % n_werewolves],
+                structured_model=DiscussionModel,
+            )
+            if _ % n_werewolves == 0 and res.metadata.get(
+                "reach_agreement",
+            ):
+                break
+        return
+
+    # The drafts of a round must not see each other, so they are delivered
+    # manually, in seat order. As with auto broadcast, each participant
+    # receives the others' proposals but not its own
+    hub.set_auto_broadcast(False)
+    for _ in range(MAX_DISCUSSION_ROUND):
+        proposals = await asyncio.gather(
+            *[
+                call_agent(agent, structured_model=DiscussionModel)
+                for agent in werewolves
+            ],
+        )
+        for agent in hub.participants:
+            others = [_ for _ in proposals if _.name != agent.name]
+            if others:
+                await deliver([agent], others)
+        if all(
+            (_.metadata or {}).get("reach_agreement") for _ in proposals
+        ) or proposal_consensus(proposals, candidates):
+            break
+    await flush_observations(werewolves)
+    hub.set_auto_broadcast(True)
+
+
+async def speech_stage(
+    speakers: list[ReActAgent],
+    speculative: bool = False,
+) -> None:
+    """The day discussion, where the speakers speak one after another, each
+    given the previous speech.
+
+    With `speculative`, the next speaker drafts its speech from what it
+    knows so far while the current one is speaking, through its
+    `draft_speech` method if it has one. When called, the speaker revises
+    its draft against the previous speech, or throws it away if the messages
+    it received in between invalidate it, so that the discussion takes about
+    as long as its slowest speech instead of the sum of all of them. If a
+    speaker fails, the pending draft is cancelled before the error propagates.
+    """
+    msg_speech = None
+    draft_task = None
+    for i, agent in enumerate(speakers):
+        next_draft_task = None
+        if speculative and i + 1 < len(speakers):
+            draft_speech = getattr(speakers[i + 1], "draft_speech", None)
+            if draft_speech is not None:
+                next_draft_task = asyncio.create_task(draft_speech())
+
+        try:
+            if draft_task is not None:
+                await draft_task
+            msg_speech = await call_agent(agent, msg_speech)
+        except BaseException:
+            if next_draft_task is not None:
+                next_draft_task.cancel()
+                await asyncio.gather(next_draft_task, return_exceptions=True)
+            raise
+        draft_task = next_draft_task
+
+
+async def vote_stage(
+    voters: list[ReActAgent],
+    candidates: list[ReActAgent],
+    announcement: Msg,
+    hub: MsgHub,
+    revote_prompt: str,
+    tie_policy: TiePolicy,
+    rng: random.Random,
+    moderator: EchoAgent = moderator,
+) -> tuple[list[Msg], VoteResult]:
+    """Collect and tally the votes of the werewolves at night or of all the
+    alive players during the day.
+
+    A vote for a player that is not a candidate counts as an abstention.
+    With `TiePolicy.REVOTE`, the votes of a tie are broadcast to `hub`
+    together with `revote_prompt`, and the voters vote again among the
+    tied players. A second tie eliminates nobody.
+
+    Returns:
+        `tuple[list[Msg], VoteResult]`:
+            The vote messages of the last round, which are not broadcast
+            yet, and its result.
+    """
+    candidate_names = {_.name for _ in candidates}
+    # The voters vote one after another, each on its own copy of the
+    # announcement
+    msgs_vote = [
+        await call_agent(
+            agent,
+            deepcopy(announcement),
+            structured_model=get_vote_model(candidates),
+        )
+        for agent in voters
+    ]
+    votes = {_.name: _.metadata.get("vote") for _ in msgs_vote}
+    result = tally_votes(
+        {k: v if v in candidate_names else None for k, v in votes.items()},
+        tie_policy,
+        rng,
+    )
+    if not (result.is_tie and tie_policy == TiePolicy.REVOTE):
+        return msgs_vote, result
+
+    # Reveal the tie and let the voters vote again among the tied players
+    await hub.broadcast(msgs_vote)
+    return await vote_stage(
+        voters,
+        [_ for _ in candidates if _.name in result.tied],
+        await moderator(
+            revote_prompt.format(
+                result.conditions(),
+                names_to_str(result.tied),
             ),
+            metadata={"vote_result": result.to_dict()},
+        ),
+        hub,
+        revote_prompt,
+        TiePolicy.NO_ELIMINATION,
+        rng,
+        moderator,
+    )
+
+
+def seed_agents(
+    agents: list[ReActAgent],
+    seed: int | None,
+) -> random.Random:
+    """Create the random generator of a game, and derive one generator for
+    each agent that accepts it via `set_rng`, in the given order. Each
+    agent gets its own generator, so its choices do not depend on when the
+    other agents draw their random numbers.
+
+    Args:
+        agents (`list[ReActAgent]`):
+            The agents of the game.
+        seed (`int | None`):
+            The seed of the game. If `None`, the agents keep their own
+            generators.
+
+    Returns:
+        `random.Random`:
+            The random generator of the game.
+    """
+    rng = random.Random(seed)
+    for agent in agents:
+        agent_rng = random.Random(rng.getrandbits(64))
+        if seed is not None and hasattr(agent, "set_rng"):
+            agent.set_rng(agent_rng)
+    return rng
+
+
+async def werewolves_game(
+    agents: list[ReActAgent],
+    headless: bool = False,
+    seed: int | None = None,
+    tie_policy: TiePolicy = TiePolicy.RANDOM,
+    event_log: GameEventLog | None = None,
+    output: OutputSink | None = None,
+    checkpoint_path: str | None = None,
+    parallel_discussion: bool = False,
+    speculative_speech: bool = False,
+    batch_observations: bool = False,
+) -> GameResult:
+    """The main entry of the werewolf game
+
+    Args:
+        agents (`list[ReActAgent]`):
+            The agents, whose number must be one of `ROLE_TABLES`, i.e.
+            6, 9, 12, 15 or 18.
+        headless (`bool`, defaults to `False`):
+            Run the game without any console output, i.e. the moderator,
+            the agents and the role table are not printed. Used for fast
+            rule-only simulations.
+        seed (`int | None`, optional):
+            The seed of the game. It determines the role assignment and,
+            for the agents that accept a random generator via `set_rng`,
+            every random choice they make. If `None`, the game is not
+            reproducible.
+        tie_policy (`TiePolicy`, defaults to `TiePolicy.RANDOM`):
+            How a tie in the werewolves' vote or the day vote is resolved.
+            Random draws use the game's seeded random generator.
+        event_log (`GameEventLog | None`, optional):
+            The log to record the game into, which can be replayed with
+            `werewolves.replay.replay_game`.
+        output (`OutputSink | None`, optional):
+            The sink of the moderator's messages and the role table, e.g. a
+            `BufferedFileSink` or a `QueueSink`, closed when the game is
+            over, however it ends. If `None`, they go to the console,
+            unless `headless`.
+        checkpoint_path (`str | None`, optional):
+            The file to checkpoint the game into before each night and each
+            day discussion, with the `state_dict` of every agent, so that
+            `resume_game` can continue the game from its last phase. The
+            file is removed once the game is over.
+        parallel_discussion (`bool`, defaults to `False`):
+            Let the werewolves draft their proposals concurrently at night,
+            and stop their discussion as soon as they agree, see
+            `discussion_stage`.
+        speculative_speech (`bool`, defaults to `False`):
+            Let each player draft its speech in the day discussion while
+            the previous one is speaking, see `speech_stage`.
+        batch_observations (`bool`, defaults to `False`):
+            Queue the messages of each agent and deliver them as one list
+            right before the agent is called, see `werewolves.delivery`.
+
+    Returns:
+        `GameResult`:
+            The winning side and the number of rounds played.
+    """
+    assert len(agents) in ROLE_TABLES, (
+        f"The werewolf game supports {', '.join(map(str, ROLE_TABLES))} "
+        f"players, got {len(agents)}."
+    )
+
+    with record_game(event_log, agents):
+        emit_event(
+            "game_start",
+            players=[_.name for _ in agents],
+            seed=seed,
+            tie_policy=tie_policy.value,
         )
-        players.add_player(agent, role)
+        async with closing_sink(output), batched_delivery(batch_observations):
+            game_result = await _play_game(
+                agents,
+                headless,
+                seed,
+                tie_policy,
+                output,
+                checkpoint_path,
+                parallel_discussion,
+                speculative_speech,
+            )
+        emit_event(
+            "game_end",
+            winner=game_result.winner,
+            rounds=game_result.rounds,
+        )
+    return game_result
+
+
+async def resume_game(
+    agents: list[ReActAgent],
+    checkpoint_path: str,
+    headless: bool = False,
+    event_log: GameEventLog | None = None,
+    output: OutputSink | None = None,
+    parallel_discussion: bool = False,
+    speculative_speech: bool = False,
+    batch_observations: bool = False,
+) -> GameResult:
+    """Continue a game from its last checkpoint, written by
+    `werewolves_game` with `checkpoint_path`. The game keeps its seed and
+    tie policy, and keeps checkpointing into the same file.
+
+    Args:
+        agents (`list[ReActAgent]`):
+            The agents, with the same names as in the checkpointed game,
+            e.g. freshly created ones. Their states are loaded from the
+            checkpoint.
+        checkpoint_path (`str`):
+            The checkpoint file.
+        headless (`bool`, defaults to `False`):
+            Run the game without any console output.
+        event_log (`GameEventLog | None`, optional):
+            The log to record the rest of the game into.
+        output (`OutputSink | None`, optional):
+            The sink of the moderator's messages, closed when the game is
+            over, however it ends.
+        parallel_discussion (`bool`, defaults to `False`):
+            Let the werewolves draft their proposals concurrently at night.
+        speculative_speech (`bool`, defaults to `False`):
+            Let each player draft its speech while the previous one speaks.
+        batch_observations (`bool`, defaults to `False`):
+            Deliver the messages of each agent in batches.
+
+    Returns:
+        `GameResult`:
+            The winning side and the number of rounds played, counting the
+            rounds before the checkpoint.
+    """
+    checkpoint = load_checkpoint(checkpoint_path)
+    if checkpoint is None:
+        raise FileNotFoundError(
+            f"No checkpoint to resume from at {checkpoint_path}.",
+        )
+
+    with record_game(event_log, agents):
+        emit_event(
+            "game_resume",
+            players=checkpoint.seats,
+            seed=checkpoint.seed,
+            tie_policy=checkpoint.tie_policy,
+            round=checkpoint.round_idx + 1,
+            phase=checkpoint.phase,
+            agent_states=checkpoint.agent_states,
+        )
+        async with closing_sink(output), batched_delivery(batch_observations):
+            game_result = await _play_game(
+                agents,
+                headless,
+                checkpoint.seed,
+                TiePolicy(checkpoint.tie_policy),
+                output,
+                checkpoint_path,
+                parallel_discussion,
+                speculative_speech,
+                resume=checkpoint,
+            )
+        emit_event(
+            "game_end",
+            winner=game_result.winner,
+            rounds=game_result.rounds,
+        )
+    return game_result
+
+
+async def _play_game(
+    agents: list[ReActAgent],
+    headless: bool,
+    seed: int | None,
+    tie_policy: TiePolicy,
+    output: OutputSink | None,
+    checkpoint_path: str | None = None,
+    parallel_discussion: bool = False,
+    speculative_speech: bool = False,
+    resume: GameCheckpoint | None = None,
+) -> GameResult:
+    """Play the game, see `werewolves_game` for the arguments. If `resume`
+    is given, the game continues from that checkpoint."""
+
+    # Each game has its own moderator, which writes to the given sink, or
+    # to the console unless in headless mode. In headless mode the players
+    # are silenced as well, so that the game is not bound by console I/O
+    if output is None and headless:
+        output = NullSink()
+    moderator = EchoAgent(sink=output)
+    if headless:
+        for agent in agents:
+            agent.set_console_output_enabled(False)
+
+    if resume is not None:
+        # Continue from the checkpoint: the agents' states, the roster and
+        # the random generator are restored, and the agents keep their seats
+        rng = resume.restore_rng()
+        players = resume.restore_players(agents)
+        agents[:] = players.all_players
+        healing, poison = resume.healing, resume.poison
+        first_day = resume.first_day
+        start_round, phase = resume.round_idx, resume.phase
+
+    else:
+        # All the randomness of the game comes from this generator
+        rng = seed_agents(agents, seed)
+
+        # Init the players' status
+        players = Players()
+
+        # If the witch has healing and poison potion
+        healing, poison = True, True
+
+        # If it's the first day, the dead can leave a message
+        first_day = True
+
+        # Broadcast the game begin message
+        async with BatchedMsgHub(participants=agents) as greeting_hub:
+            await greeting_hub.broadcast(
+                await moderator(
+                    Prompts.to_all_new_game.format(names_to_str(agents)),
+                ),
+            )
 
-    # Printing the roles
-    players.print_roles()
+        # Assign roles to the agents
+        roles = list(ROLE_TABLES[len(agents)])
+        rng.shuffle(agents)
+        rng.shuffle(roles)
+
+        for agent, role in zip(agents, roles):
+            # Tell the agent its role
+            await deliver(
+                [agent],
+                await moderator(
+                    f"[{agent.name} ONLY] {agent.name}, your role is {role}.",
+                ),
+            )
+            players.add_player(agent, role)
+            emit_event("role", agent=agent.name, role=role)
+
+        # Printing the roles
+        players.print_roles(output)
+
+        start_round, phase = 0, "night"
+
+    async def save(round_idx: int, next_phase: str) -> None:
+        """Checkpoint the game before the given phase."""
+        if checkpoint_path is not None:
+            # The agents' states must include the queued messages
+            await flush_observations()
+            save_checkpoint(
+                checkpoint_path,
+                GameCheckpoint.capture(
+                    players,
+                    round_idx,
+                    next_phase,
+                    healing,
+                    poison,
+                    first_day,
+                    rng,
+                    seed,
+                    tie_policy.value,
+                ),
+            )
 
     # GAME BEGIN!
-    for _ in range(MAX_GAME_ROUND):
+    n_rounds = start_round
+    for round_idx in range(start_round, MAX_GAME_ROUND):
+        n_rounds = round_idx + 1
         # Create a MsgHub for all players to broadcast messages
-        async with MsgHub(
+        async with BatchedMsgHub(
             participants=players.current_alive,
             enable_auto_broadcast=False,  # manual broadcast only
             name="alive_players",
         ) as alive_players_hub:
-            # Night phase
-            await alive_players_hub.broadcast(
-                await moderator(Prompts.to_all_night),
-            )
-            killed_player, poisoned_player, shot_player = None, None, None
-
-            # Werewolves discuss
-            async with MsgHub(
-                players.werewolves,
-                enable_auto_broadcast=True,
-                announcement=await moderator(
-                    Prompts.to_wolves_discussion.format(
-                        names_to_str(players.werewolves),
-                        names_to_str(players.current_alive),
-                    ),
-                ),
-                name="werewolves",
-            ) as werewolves_hub:
-                # Discussion
-                n_werewolves = len(players.werewolves)
-                for _ in range(1, MAX_DISCUSSION_ROUND * n_werewolves + 1):
-                    res = await players.werewolves[_ % n_werewolves](
-                        structured_model=DiscussionModel,
-                    )
-                    if _ % n_werewolves == 0 and res.metadata.get(
-                        "reach_agreement",
-                    ):
-                        break
+            if phase == "night":
+                await save(round_idx, "night")
 
-                # Werewolves vote
-                # Disable auto broadcast to avoid following other's votes
-                werewolves_hub.set_auto_broadcast(False)
-                msgs_vote = await fanout_pipeline(
-                    players.werewolves,
-                    msg=await moderator(content=Prompts.to_wolves_vote),
-                    structured_model=get_vote_model(players.current_alive),
-                    enable_gather=False,
-                )
-                killed_player, votes = majority_vote(
-                    [_.metadata.get("vote") for _ in msgs_vote],
-                )
-                # Postpone the broadcast of voting
-                await werewolves_hub.broadcast(
-                    [
-                        *msgs_vote,
-                        await moderator(
-                            Prompts.to_wolves_res.format(votes, killed_player),
-                        ),
-                    ],
+                # Night phase
+                await alive_players_hub.broadcast(
+                    await moderator(Prompts.to_all_night),
                 )
+                killed_player, poisoned_player, shot_player = None, None, None
 
-            # Witch's turn
-            await alive_players_hub.broadcast(
-                await moderator(Prompts.to_all_witch_turn),
-            )
-            msg_witch_poison = None
-            for agent in players.witch:
-                # Cannot heal witch herself
-                msg_witch_resurrect = None
-                if healing and killed_player != agent.name:
-                    msg_witch_resurrect = await agent(
-                        await moderator(
-                            Prompts.to_witch_resurrect.format(
-                                witch_name=agent.name,
-                                dead_name=killed_player,
-                            ),
+                # Werewolves discuss
+                async with BatchedMsgHub(
+                    players.werewolves,
+                    enable_auto_broadcast=True,
+                    announcement=await moderator(
+                        Prompts.to_wolves_discussion.format(
+                            names_to_str(players.werewolves),
+                            names_to_str(players.current_alive),
                         ),
-                        structured_model=WitchResurrectModel,
+                    ),
+                    name="werewolves",
+                ) as werewolves_hub:
+                    # Discussion
+                    await discussion_stage(
+                        players.werewolves,
+                        players.current_alive,
+                        werewolves_hub,
+                        parallel_discussion,
                     )
-                    if msg_witch_resurrect.metadata.get("resurrect"):
-                        killed_player = None
-                        healing = False
-
-                # Has poison potion and hasn't used the healing potion
-                if poison and not (
-                    msg_witch_resurrect
-                    and msg_witch_resurrect.metadata["resurrect"]
-                ):
-                    msg_witch_poison = await agent(
-                        await moderator(
-                            Prompts.to_witch_poison.format(
-                                witch_name=agent.name,
+
+                    # Werewolves vote
+                    # Disable auto broadcast to avoid following other's votes
+                    werewolves_hub.set_auto_broadcast(False)
+                    msgs_vote, vote_result = await vote_stage(
+                        players.werewolves,
+                        players.current_alive,
+                        await moderator(content=Prompts.to_wolves_vote),
+                        werewolves_hub,
+                        Prompts.to_wolves_revote,
+                        tie_policy,
+                        rng,
+                        moderator,
+                    )
+                    killed_player = vote_result.winner
+                    emit_event(
+                        "vote",
+                        phase="night",
+                        round=n_rounds,
+                        result=vote_result.to_dict(),
+                    )
+                    # Postpone the broadcast of voting
+                    await werewolves_hub.broadcast(
+                        [
+                            *msgs_vote,
+                            await moderator(
+                                Prompts.to_wolves_res.format(
+                                    vote_result.conditions(),
+                                    killed_player,
+                                )
+                                if killed_player
+                                else Prompts.to_wolves_res_tie.format(
+                                    vote_result.conditions(),
+                                ),
+                                metadata={
+                                    "vote_result": vote_result.to_dict(),
+                                },
                             ),
-                        ),
-                        structured_model=get_poison_model(
-                            players.current_alive,
-                        ),
+                        ],
                     )
-                    if msg_witch_poison.metadata.get("poison"):
-                        poisoned_player = msg_witch_poison.metadata.get("name")
-                        poison = False
 
-            # Seer's turn
-            await alive_players_hub.broadcast(
-                await moderator(Prompts.to_all_seer_turn),
-            )
-            for agent in players.seer:
-                msg_seer = await agent(
-                    await moderator(
-                        Prompts.to_seer.format(
-                            agent.name,
-                            names_to_str(players.current_alive),
-                        ),
-                    ),
-                    structured_model=get_seer_model(players.current_alive),
+                # The seer's check does not depend on the witch's decisions, so
+                # the witch's turn and the seer's turn run concurrently. Each
+                # agent still receives the announcements in the original order
+                await alive_players_hub.broadcast(
+                    await moderator(Prompts.to_all_witch_turn),
                 )
-                if msg_seer.metadata.get("name"):
-                    player = msg_seer.metadata["name"]
-                    await agent.observe(
-                        await moderator(
-                            Prompts.to_seer_result.format(
-                                agent_name=player,
-                                role=players.name_to_role[player],
-                            ),
+                msg_seer_turn = await moderator(Prompts.to_all_seer_turn)
+                (killed_player, poisoned_player, healing, poison), _ = (
+                    await asyncio.gather(
+                        witch_stage(
+                            players,
+                            killed_player,
+                            healing,
+                            poison,
+                            msg_seer_turn,
+                            moderator,
                         ),
+                        seer_stage(players, msg_seer_turn, moderator),
                     )
+                )
 
-            # Hunter's turn
-            for agent in players.hunter:
-                # If killed and not by witch's poison
-                if (
-                    killed_player == agent.name
-                    and poisoned_player != agent.name
-                ):
-                    shot_player = await hunter_stage(agent, players)
+                # Hunter's turn
+                for agent in players.hunter:
+                    # If killed and not by witch's poison
+                    if (
+                        killed_player == agent.name
+                        and poisoned_player != agent.name
+                    ):
+                        shot_player = await hunter_stage(
+                            agent,
+                            players,
+                            moderator,
+                        )
 
-            # Update alive players
-            dead_tonight = [killed_player, poisoned_player, shot_player]
-            players.update_players(dead_tonight)
+                # Update alive players
+                dead_tonight = [killed_player, poisoned_player, shot_player]
+                emit_event(
+                    "night",
+                    round=n_rounds,
+                    killed=killed_player,
+                    poisoned=poisoned_player,
+                    shot=shot_player,
+                )
+                players.update_players(dead_tonight)
 
-            # Day phase
-            if len([_ for _ in dead_tonight if _]) > 0:
-                await alive_players_hub.broadcast(
-                    await moderator(
-                        Prompts.to_all_day.format(
-                            names_to_str([_ for _ in dead_tonight if _]),
+                # Day phase
+                if len([_ for _ in dead_tonight if _]) > 0:
+                    await alive_players_hub.broadcast(
+                        await moderator(
+                            Prompts.to_all_day.format(
+                                names_to_str([_ for _ in dead_tonight if _]),
+                            ),
                         ),
-                    ),
-                )
+                    )
+
+                    # The killed player leave a last message in first night
+                    if killed_player and first_day:
+                        msg_moderator = await moderator(
+                            Prompts.to_dead_player.format(killed_player),
+                        )
+                        await alive_players_hub.broadcast(msg_moderator)
+                        # Leave a message
+                        last_msg = await call_agent(
+                            players.name_to_agent[killed_player],
+                        )
+                        await alive_players_hub.broadcast(last_msg)
 
-                # The killed player leave a last message in first night
-                if killed_player and first_day:
-                    msg_moderator = await moderator(
-                        Prompts.to_dead_player.format(killed_player),
+                else:
+                    await alive_players_hub.broadcast(
+                        await moderator(Prompts.to_all_peace),
                     )
-                    await alive_players_hub.broadcast(msg_moderator)
-                    # Leave a message
-                    last_msg = await players.name_to_agent[killed_player]()
-                    await alive_players_hub.broadcast(last_msg)
 
-            else:
-                await alive_players_hub.broadcast(
-                    await moderator(Prompts.to_all_peace),
-                )
+                # Check winning
+                res = players.check_winning()
+                if res:
+                    await moderator(res)
+                    break
 
-            # Check winning
-            res = players.check_winning()
-            if res:
-                await moderator(res)
-                break
+                # The night is over, the day discussion starts here
+                await save(round_idx, "day")
 
             # Discussion
             await alive_players_hub.broadcast(
@@ -273,31 +790,48 @@ async def werewolves_game(agents: list[ReActAgent]) -> None:
                 ),
             )
             # Open the auto broadcast to enable discussion
+            await alive_players_hub.flush()
             alive_players_hub.set_auto_broadcast(True)
-            await sequential_pipeline(players.current_alive)
+            await speech_stage(players.current_alive, speculative_speech)
             # Disable auto broadcast to avoid leaking info
             alive_players_hub.set_auto_broadcast(False)
 
             # Voting
-            msgs_vote = await fanout_pipeline(
+            msgs_vote, vote_result = await vote_stage(
+                players.current_alive,
                 players.current_alive,
                 await moderator(
                     Prompts.to_all_vote.format(
                         names_to_str(players.current_alive),
                     ),
                 ),
-                structured_model=get_vote_model(players.current_alive),
-                enable_gather=False,
+                alive_players_hub,
+                Prompts.to_all_revote,
+                tie_policy,
+                rng,
+                moderator,
             )
-            voted_player, votes = majority_vote(
-                [_.metadata.get("vote") for _ in msgs_vote],
+            voted_player = vote_result.winner
+            emit_event(
+                "vote",
+                phase="day",
+                round=n_rounds,
+                result=vote_result.to_dict(),
             )
             # Broadcast the voting messages together to avoid influencing
             # each other
             voting_msgs = [
                 *msgs_vote,
                 await moderator(
-                    Prompts.to_all_res.format(votes, voted_player),
+                    Prompts.to_all_res.format(
+                        vote_result.conditions(),
+                        voted_player,
+                    )
+                    if voted_player
+                    else Prompts.to_all_res_tie.format(
+                        vote_result.conditions(),
+                    ),
+                    metadata={"vote_result": vote_result.to_dict()},
                 ),
             ]
 
@@ -306,7 +840,8 @@ async def werewolves_game(agents: list[ReActAgent]) -> None:
                 prompt_msg = await moderator(
                     Prompts.to_dead_player.format(voted_player),
                 )
-                last_msg = await players.name_to_agent[voted_player](
+                last_msg = await call_agent(
+                    players.name_to_agent[voted_player],
                     prompt_msg,
                 )
                 voting_msgs.extend([prompt_msg, last_msg])
@@ -317,7 +852,7 @@ async def werewolves_game(agents: list[ReActAgent]) -> None:
             shot_player = None
             for agent in players.hunter:
                 if voted_player == agent.name:
-                    shot_player = await hunter_stage(agent, players)
+                    shot_player = await hunter_stage(agent, players, moderator)
                     if shot_player:
                         await alive_players_hub.broadcast(
                             await moderator(
@@ -329,21 +864,36 @@ async def werewolves_game(agents: list[ReActAgent]) -> None:
 
             # Update alive players
             dead_today = [voted_player, shot_player]
+            emit_event(
+                "day",
+                round=n_rounds,
+                voted=voted_player,
+                shot=shot_player,
+            )
             players.update_players(dead_today)
 
             # Check winning
             res = players.check_winning()
             if res:
-                async with MsgHub(players.all_players) as all_players_hub:
+                async with BatchedMsgHub(
+                    players.all_players,
+                ) as all_players_hub:
                     res_msg = await moderator(res)
                     await all_players_hub.broadcast(res_msg)
                 break
 
         # The day ends
         first_day = False
+        phase = "night"
 
     # Game over, each player reflects
-    await fanout_pipeline(
-        agents=agents,
-        msg=await moderator(Prompts.to_all_reflect),
+    msg_reflect = await moderator(Prompts.to_all_reflect)
+    await asyncio.gather(
+        *[call_agent(agent, deepcopy(msg_reflect)) for agent in agents],
     )
+
+    # The game is over, there is nothing left to resume
+    if checkpoint_path is not None and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+
+    return GameResult(winner=players.get_winner(), rounds=n_rounds)
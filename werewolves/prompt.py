@@ -35,6 +35,16 @@ class EnglishPrompts:
         "eliminate {}."
     )
 
+    to_wolves_res_tie = (
+        "[WEREWOLVES ONLY] The voting result is {}. It is a tie, so nobody "
+        "is eliminated tonight."
+    )
+
+    to_wolves_revote = (
+        "[WEREWOLVES ONLY] The voting result is {}. It is a tie between {}, "
+        "please vote again among them."
+    )
+
     to_all_witch_turn = (
         "Witch's turn, witch open your eyes and decide your action tonight..."
     )
@@ -106,6 +116,15 @@ class EnglishPrompts:
 
     to_all_res = "The voting result is {}. So {} has been voted out."
 
+    to_all_res_tie = (
+        "The voting result is {}. It is a tie, so nobody is voted out."
+    )
+
+    to_all_revote = (
+        "The voting result is {}. It is a tie between {}, please vote again "
+        "among them."
+    )
+
     to_all_wolf_win = (
         "There are {n_alive} players alive, and {n_werewolves} of them are "
         "werewolves. "
@@ -146,6 +165,10 @@ class ChinesePrompts:
 
     to_wolves_res = "[仅狼人可见] 投票结果为 {}，你们选择淘汰 {}。"
 
+    to_wolves_res_tie = "[仅狼人可见] 投票结果为 {}，出现平票，今晚无人被淘汰。"
+
+    to_wolves_revote = "[仅狼人可见] 投票结果为 {}，{} 平票，请在他们之中重新投票。"
+
     to_all_witch_turn = "轮到女巫行动，女巫请睁眼并决定今晚的操作..."
     to_witch_resurrect = (
         "[仅女巫可见] {witch_name}，你是女巫，今晚{dead_name}被淘汰。"
@@ -178,6 +201,10 @@ class ChinesePrompts:
 
     to_all_res = "投票结果为 {}，{} 被淘汰。"
 
+    to_all_res_tie = "投票结果为 {}，出现平票，无人被淘汰。"
+
+    to_all_revote = "投票结果为 {}，{} 平票，请在他们之中重新投票。"
+
     to_all_wolf_win = (
         "当前存活玩家共{n_alive}人，其中{n_werewolves}人为狼人。"
         "游戏结束，狼人获胜🐺🎉！"
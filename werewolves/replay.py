@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+"""Replay recorded games without a live game or model.
+
+The replayer feeds the recorded messages of each agent back into its
+`observe` and `__call__` in the recorded order, and compares the replies
+with the recorded ones. With the same seed and rule-driven agents, a replay
+reproduces the game exactly, so a mismatch points to a behaviour change.
+A game resumed from a checkpoint is replayed with fresh agents loaded with
+the checkpointed states, which its `game_resume` event carries.
+"""
+import time
+from dataclasses import dataclass, field
+from typing import Any
+
+from werewolves.event_log import load_msg, read_events
+from werewolves.game import seed_agents
+from werewolves.simulation import AgentFactory
+from werewolves.structured_model import get_structured_model
+
+from agentscope.message import Msg
+
+
+@dataclass
+class ReplayResult:
+    """The result of replaying one game."""
+
+    n_events: int = 0
+    """The number of replayed events."""
+
+    n_calls: int = 0
+    """The number of replayed agent calls."""
+
+    mismatches: list[dict[str, Any]] = field(default_factory=list)
+    """The calls whose reply differs from the recorded one, with the
+    event's `seq`, the agent, and the recorded and replayed outputs."""
+
+    duration: float = 0.0
+    """The wall time of the replay in seconds."""
+
+
+def _call_output(
+    msg: Msg | None,
+    structured_model: dict[str, Any] | None,
+) -> Any:
+    """The part of a reply that is compared: the structured output if a
+    structured model was requested, otherwise the content."""
+    if msg is None:
+        return None
+    if structured_model is None:
+        return msg.content
+    model = get_structured_model(
+        structured_model["name"],
+        structured_model["player_names"],
+    )
+    metadata = msg.metadata or {}
+    return {key: metadata.get(key) for key in model.model_fields}
+
+
+async def replay_game(
+    path: str,
+    agent_factory: AgentFactory,
+    binary: bool = False,
+) -> list[ReplayResult]:
+    """Replay the games recorded in a log file.
+
+    Args:
+        path (`str`):
+            The path of the log, written by `GameEventLog`.
+        agent_factory (`AgentFactory`):
+            A callable that builds an agent from its name, e.g.
+            `functools.partial(PlayerAgent, headless=True)`. Fresh agents
+            are created for each game, and seeded as in the recorded game,
+            or, for a resumed game, loaded with the checkpointed states.
+        binary (`bool`, defaults to `False`):
+            Whether the log is length-prefixed binary instead of JSONL.
+
+    Returns:
+        `list[ReplayResult]`:
+            The result of each recorded game.
+    """
+    results: list[ReplayResult] = []
+    agents = {}
+    result = ReplayResult()
+    start_time = time.perf_counter()
+    for event in read_events(path, binary):
+        kind = event["event"]
+        if kind == "game_start":
+            agents = {name: agent_factory(name) for name in event["players"]}
+            seed_agents(list(agents.values()), event["seed"])
+            result = ReplayResult()
+            results.append(result)
+            start_time = time.perf_counter()
+
+        elif kind == "game_resume":
+            agents = {name: agent_factory(name) for name in event["players"]}
+            for name, state in event.get("agent_states", {}).items():
+                agents[name].load_state_dict(state)
+            result = ReplayResult()
+            results.append(result)
+            start_time = time.perf_counter()
+
+        elif kind == "observe":
+            await agents[event["agent"]].observe(load_msg(event["msg"]))
+
+        elif kind == "call":
+            structured_model = event["structured_model"]
+            kwargs = {}
+            if structured_model is not None:
+                kwargs["structured_model"] = get_structured_model(
+                    structured_model["name"],
+                    structured_model["player_names"],
+                )
+            reply = await agents[event["agent"]](
+                load_msg(event["msg"]),
+                **kwargs,
+            )
+            result.n_calls += 1
+
+            expected = _call_output(load_msg(event["reply"]), structured_model)
+            actual = _call_output(reply, structured_model)
+            if expected != actual:
+                result.mismatches.append(
+                    {
+                        "seq": event["seq"],
+                        "agent": event["agent"],
+                        "expected": expected,
+                        "actual": actual,
+                    },
+                )
+
+        elif kind == "game_end":
+            result.duration = time.perf_counter() - start_time
+
+        result.n_events += 1
+    return results
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""Headless simulation of the werewolf game.
+
+The helpers in this module run complete games without any console output,
+so that rule-driven agents can be evaluated against real game dynamics at
+a high throughput.
+"""
+import time
+from typing import Callable
+
+from werewolves.game import werewolves_game
+
+from agentscope.agent import ReActAgent
+
+AgentFactory = Callable[[str], ReActAgent]
+
+
+def create_players(
+    agent_factory: AgentFactory,
+    n_players: int = 9,
+    name_prefix: str = "Player",
+) -> list[ReActAgent]:
+    """Create the players of one game.
+
+    Args:
+        agent_factory (`AgentFactory`):
+            A callable that builds an agent from its name, e.g.
+            `lambda name: PlayerAgent(name, headless=True)`.
+        n_players (`int`, defaults to `9`):
+            The number of players.
+        name_prefix (`str`, defaults to `"Player"`):
+            The prefix of the player names.
+
+    Returns:
+        `list[ReActAgent]`:
+            The created players, named `{name_prefix}1` to
+            `{name_prefix}{n_players}`.
+    """
+    return [agent_factory(f"{name_prefix}{_ + 1}") for _ in range(n_players)]
+
+
+async def simulate_game(
+    agent_factory: AgentFactory,
+    n_players: int = 9,
+    seed: int | None = None,
+) -> float:
+    """Play one headless game with freshly created players.
+
+    Args:
+        agent_factory (`AgentFactory`):
+            A callable that builds an agent from its name.
+        n_players (`int`, defaults to `9`):
+            The number of players.
+        seed (`int | None`, optional):
+            The seed of the game, see `werewolves_game`.
+
+    Returns:
+        `float`:
+            The wall time of the game in seconds.
+    """
+    players = create_players(agent_factory, n_players)
+    start_time = time.perf_counter()
+    await werewolves_game(players, headless=True, seed=seed)
+    return time.perf_counter() - start_time
+
+
+async def simulate_games(
+    agent_factory: AgentFactory,
+    n_games: int,
+    n_players: int = 9,
+    seed: int | None = None,
+) -> list[float]:
+    """Play several headless games one after another.
+
+    Args:
+        agent_factory (`AgentFactory`):
+            A callable that builds an agent from its name.
+        n_games (`int`):
+            The number of games to play.
+        n_players (`int`, defaults to `9`):
+            The number of players in each game.
+        seed (`int | None`, optional):
+            The base seed. If given, the `i`-th game is played with seed
+            `seed + i`, so that the same games can be replayed, e.g. to
+            compare two versions of an agent.
+
+    Returns:
+        `list[float]`:
+            The wall time of each game in seconds.
+    """
+    return [
+        await simulate_game(
+            agent_factory,
+            n_players,
+            None if seed is None else seed + _,
+        )
+        for _ in range(n_games)
+    ]
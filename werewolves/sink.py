@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+"""The output sinks of the moderator.
+
+By default the moderator prints each message to the console, which blocks
+the event loop on every write. A sink replaces the console for one game:
+its `write` never blocks, and the buffered text is written out by `close`,
+which the game awaits once it is over, however it ends.
+"""
+import asyncio
+import sys
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, TextIO
+
+from agentscope import logger
+
+
+class OutputSink:
+    """The base class of the sinks, which discards everything."""
+
+    def write(self, text: str) -> None:
+        """Write one line of text without blocking.
+
+        Args:
+            text (`str`):
+                The text, without the trailing newline.
+        """
+
+    async def flush(self) -> None:
+        """Write out the buffered text."""
+
+    async def close(self) -> None:
+        """Flush and release the sink."""
+        await self.flush()
+
+
+class NullSink(OutputSink):
+    """Discard the output, e.g. for headless tournaments."""
+
+
+class ConsoleSink(OutputSink):
+    """Print the output right away, as the moderator does by default."""
+
+    def write(self, text: str) -> None:
+        """Print the text."""
+        print(text)
+
+
+class BufferedFileSink(OutputSink):
+    """Buffer the output in memory and append it to a file in large
+    chunks."""
+
+    def __init__(self, path: str, buffer_size: int = 1 << 16) -> None:
+        """Open the file for appending.
+
+        Args:
+            path (`str`):
+                The path of the output file.
+            buffer_size (`int`, defaults to `65536`):
+                The number of characters buffered before they are written
+                to the file.
+        """
+        self.path = path
+        self.buffer_size = buffer_size
+        self._file = open(path, "a", encoding="utf-8")
+        self._buffer: list[str] = []
+        self._size = 0
+
+    def write(self, text: str) -> None:
+        """Buffer the text, and write the buffer out once it is full."""
+        self._buffer.append(text)
+        self._size += len(text) + 1
+        if self._size >= self.buffer_size:
+            self._write_buffer()
+
+    def _write_buffer(self) -> None:
+        """Write the buffer to the file."""
+        if self._buffer:
+            self._file.write("\n".join(self._buffer) + "\n")
+            self._buffer.clear()
+            self._size = 0
+
+    async def flush(self) -> None:
+        """Write the buffer to the file and flush it."""
+        self._write_buffer()
+        self._file.flush()
+
+    async def close(self) -> None:
+        """Flush and close the file."""
+        if self._file.closed:
+            return
+        await self.flush()
+        self._file.close()
+
+
+class QueueSink(OutputSink):
+    """Queue the output for a writer task, which writes it to a stream in a
+    worker thread, so that slow streams never block the event loop."""
+
+    def __init__(self, stream: TextIO | None = None) -> None:
+        """Initialize the sink. The writer task starts with the first
+        write, in the running event loop.
+
+        Args:
+            stream (`TextIO | None`, optional):
+                The stream to write to, defaults to `sys.stdout`.
+        """
+        self.stream = stream or sys.stdout
+        self._queue: asyncio.Queue[str] = asyncio.Queue()
+        self._writer: asyncio.Task | None = None
+
+    def write(self, text: str) -> None:
+        """Queue the text."""
+        if self._writer is None:
+            self._writer = asyncio.get_running_loop().create_task(
+                self._write_loop(),
+            )
+        self._queue.put_nowait(text)
+
+    async def _write_loop(self) -> None:
+        """Write the queued text in batches. A batch that cannot be written,
+        e.g. to a closed stream, is logged and dropped, so that the rest of
+        the queue is still drained and `flush` never waits forever."""
+        while True:
+            lines = [await self._queue.get()]
+            while not self._queue.empty():
+                lines.append(self._queue.get_nowait())
+            try:
+                await asyncio.to_thread(self._write_lines, lines)
+            except Exception as e:
+                logger.error(
+                    "Failed to write %d lines of output: %s",
+                    len(lines),
+                    e,
+                )
+            finally:
+                for _ in lines:
+                    self._queue.task_done()
+
+    def _write_lines(self, lines: list[str]) -> None:
+        """Write the lines to the stream, in a worker thread."""
+        self.stream.write("\n".join(lines) + "\n")
+        self.stream.flush()
+
+    async def flush(self) -> None:
+        """Wait until the queued text is written."""
+        await self._queue.join()
+
+    async def close(self) -> None:
+        """Flush and stop the writer task."""
+        await self.flush()
+        if self._writer is not None:
+            self._writer.cancel()
+            try:
+                await self._writer
+            except asyncio.CancelledError:
+                pass
+            self._writer = None
+
+
+@asynccontextmanager
+async def closing_sink(sink: OutputSink | None) -> AsyncIterator[None]:
+    """Close the sink when leaving the context, whether the game within it
+    ends normally or raises. Nothing is done if `sink` is `None`."""
+    try:
+        yield
+    finally:
+        if sink is not None:
+            await sink.close()
@@ -1,33 +1,76 @@
 # -*- coding: utf-8 -*-
-"""The structured output models used in the werewolf game."""
-from typing import Literal
+"""The structured output models used in the werewolf game.
+
+The models that depend on the alive players are built once per tuple of
+player names and cached, together with their JSON schemas, since the same
+models are requested by every voter and every night action of a round.
+"""
+import copy
+from functools import lru_cache
+from typing import Any, ClassVar, Literal, Sequence
 
 from pydantic import BaseModel, Field
 from agentscope.agent import AgentBase
 
+# The number of cached models of each kind. The alive players differ from
+# one round to the next and their order from one game to the next, so the
+# cache is bounded
+MODEL_CACHE_SIZE = 256
+
+
+class CachedSchemaModel(BaseModel):
+    """A model that generates its default JSON schema only once."""
+
+    @classmethod
+    def model_json_schema(cls, *args: Any, **kwargs: Any) -> dict[str, Any]:
+        """Return the JSON schema, cached for the default arguments. A copy
+        is returned since the callers may modify it."""
+        if args or kwargs:
+            return super().model_json_schema(*args, **kwargs)
+        return copy.deepcopy(_default_json_schema(cls))
+
+
+@lru_cache(maxsize=4 * MODEL_CACHE_SIZE)
+def _default_json_schema(model: type[BaseModel]) -> dict[str, Any]:
+    """Generate the JSON schema of a model with the default arguments."""
+    return super(CachedSchemaModel, model).model_json_schema()
 
-class DiscussionModel(BaseModel):
+
+class DiscussionModel(CachedSchemaModel):
     """The output format for discussion."""
 
     reach_agreement: bool = Field(
         description="Whether you have reached an agreement or not",
     )
+    target: str | None = Field(
+        default=None,
+        description="The name of the player you propose to kill tonight, "
+        "if any",
+    )
 
 
 def get_vote_model(agents: list[AgentBase]) -> type[BaseModel]:
     """Get the vote model by player names."""
+    return _vote_model(tuple(_.name for _ in agents))
+
 
-    class VoteModel(BaseModel):
+@lru_cache(maxsize=MODEL_CACHE_SIZE)
+def _vote_model(names: tuple[str, ...]) -> type[BaseModel]:
+    """Build the vote model of the given player names."""
+
+    class VoteModel(CachedSchemaModel):
         """The vote output format."""
 
-        vote: Literal[tuple(_.name for _ in agents)] = Field(  # type: ignore
+        player_names: ClassVar[tuple[str, ...]] = names
+
+        vote: Literal[names] = Field(  # type: ignore
             description="The name of the player you want to vote for",
         )
 
     return VoteModel
 
 
-class WitchResurrectModel(BaseModel):
+class WitchResurrectModel(CachedSchemaModel):
     """The output format for witch resurrect action."""
 
     resurrect: bool = Field(
@@ -37,16 +80,22 @@ class WitchResurrectModel(BaseModel):
 
 def get_poison_model(agents: list[AgentBase]) -> type[BaseModel]:
     """Get the poison model by player names."""
+    return _poison_model(tuple(_.name for _ in agents))
 
-    class WitchPoisonModel(BaseModel):
+
+@lru_cache(maxsize=MODEL_CACHE_SIZE)
+def _poison_model(names: tuple[str, ...]) -> type[BaseModel]:
+    """Build the poison model of the given player names."""
+
+    class WitchPoisonModel(CachedSchemaModel):
         """The output format for witch poison action."""
 
+        player_names: ClassVar[tuple[str, ...]] = names
+
         poison: bool = Field(
             description="Do you want to use the poison potion",
         )
-        name: Literal[  # type: ignore
-            tuple(_.name for _ in agents)
-        ] | None = Field(
+        name: Literal[names] | None = Field(  # type: ignore
             description="The name of the player you want to poison, if you "
             "don't want to poison anyone, just leave it empty",
             default=None,
@@ -57,11 +106,19 @@ def get_poison_model(agents: list[AgentBase]) -> type[BaseModel]:
 
 def get_seer_model(agents: list[AgentBase]) -> type[BaseModel]:
     """Get the seer model by player names."""
+    return _seer_model(tuple(_.name for _ in agents))
 
-    class SeerModel(BaseModel):
+
+@lru_cache(maxsize=MODEL_CACHE_SIZE)
+def _seer_model(names: tuple[str, ...]) -> type[BaseModel]:
+    """Build the seer model of the given player names."""
+
+    class SeerModel(CachedSchemaModel):
         """The output format for seer action."""
 
-        name: Literal[tuple(_.name for _ in agents)] = Field(  # type: ignore
+        player_names: ClassVar[tuple[str, ...]] = names
+
+        name: Literal[names] = Field(  # type: ignore
             description="The name of the player you want to check",
         )
 
@@ -70,19 +127,60 @@ def get_seer_model(agents: list[AgentBase]) -> type[BaseModel]:
 
 def get_hunter_model(agents: list[AgentBase]) -> type[BaseModel]:
     """Get the hunter model by player agents."""
+    return _hunter_model(tuple(_.name for _ in agents))
 
-    class HunterModel(BaseModel):
+
+@lru_cache(maxsize=MODEL_CACHE_SIZE)
+def _hunter_model(names: tuple[str, ...]) -> type[BaseModel]:
+    """Build the hunter model of the given player names."""
+
+    class HunterModel(CachedSchemaModel):
         """The output format for hunter action."""
 
+        player_names: ClassVar[tuple[str, ...]] = names
+
         shoot: bool = Field(
             description="Whether you want to use the shooting ability or not",
         )
-        name: Literal[  # type: ignore
-            tuple(_.name for _ in agents)
-        ] | None = Field(
+        name: Literal[names] | None = Field(  # type: ignore
             description="The name of the player you want to shoot, if you "
             "don't want to the ability, just leave it empty",
             default=None,
         )
 
     return HunterModel
+
+
+def get_structured_model(
+    name: str,
+    player_names: Sequence[str] = (),
+) -> type[BaseModel]:
+    """Get a structured model by its class name, e.g. to rebuild the models
+    of a recorded game.
+
+    Args:
+        name (`str`):
+            The class name of the model, e.g. `"VoteModel"`.
+        player_names (`Sequence[str]`, defaults to `()`):
+            The player names of the models that depend on the alive
+            players, i.e. their `player_names`.
+
+    Returns:
+        `type[BaseModel]`:
+            The model class.
+    """
+    static_models = {
+        "DiscussionModel": DiscussionModel,
+        "WitchResurrectModel": WitchResurrectModel,
+    }
+    builders = {
+        "VoteModel": _vote_model,
+        "WitchPoisonModel": _poison_model,
+        "SeerModel": _seer_model,
+        "HunterModel": _hunter_model,
+    }
+    if name in static_models:
+        return static_models[name]
+    if name in builders:
+        return builders[name](tuple(player_names))
+    raise ValueError(f"Unknown structured model: {name}")
@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+"""Multi-process tournament runner for the werewolf game.
+
+The games of a tournament are split into chunks, and each chunk is played
+by one worker process in its own event loop. Each worker has its own
+checkpoint namespace, so the players of a worker keep learning across the
+games they play, without racing with other workers on the same file.
+"""
+import asyncio
+import multiprocessing
+import os
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any
+
+from werewolves.game import werewolves_game
+from werewolves.simulation import AgentFactory, create_players
+
+import agentscope
+from agentscope.session import JSONSession
+
+
+def _split_games(n_games: int, n_workers: int) -> list[int]:
+    """Split `n_games` into at most `n_workers` nearly equal chunks."""
+    n_workers = max(1, min(n_workers, n_games))
+    base, extra = divmod(n_games, n_workers)
+    return [base + (1 if _ < extra else 0) for _ in range(n_workers)]
+
+
+async def _play_chunk(
+    worker_id: int,
+    n_games: int,
+    agent_factory: AgentFactory,
+    n_players: int,
+    checkpoint_dir: str,
+    seeds: list[int | None],
+) -> list[dict[str, Any]]:
+    """Play `n_games` games in the current process, loading and saving the
+    players' states in the worker's own checkpoint namespace. The `i`-th
+    game is played with `seeds[i]`."""
+    session = JSONSession(
+        save_dir=os.path.join(checkpoint_dir, f"worker_{worker_id}"),
+    )
+    results = []
+    for game_idx in range(n_games):
+        players = create_players(agent_factory, n_players)
+        await session.load_session_state(
+            session_id="players_checkpoint",
+            **{player.name: player for player in players},
+        )
+
+        start_time = time.perf_counter()
+        game_result = await werewolves_game(
+            players,
+            headless=True,
+            seed=seeds[game_idx],
+        )
+        duration = time.perf_counter() - start_time
+
+        await session.save_session_state(
+            session_id="players_checkpoint",
+            **{player.name: player for player in players},
+        )
+        results.append(
+            {
+                "worker_id": worker_id,
+                "game_idx": game_idx,
+                "seed": seeds[game_idx],
+                "winner": game_result.winner,
+                "rounds": game_result.rounds,
+                "duration": duration,
+                # Only agents that record their latencies, e.g. PlayerAgent
+                "latencies": {
+                    player.name: list(getattr(player, "call_latencies", []))
+                    for player in players
+                },
+            },
+        )
+    return results
+
+
+def _run_chunk(
+    worker_id: int,
+    n_games: int,
+    agent_factory: AgentFactory,
+    n_players: int,
+    checkpoint_dir: str,
+    seeds: list[int | None],
+) -> list[dict[str, Any]]:
+    """The entry of a worker process."""
+    # Keep the per-game checkpoint logs off the console
+    agentscope.setup_logger(level="WARNING")
+    return asyncio.run(
+        _play_chunk(
+            worker_id,
+            n_games,
+            agent_factory,
+            n_players,
+            checkpoint_dir,
+            seeds,
+        ),
+    )
+
+
+def merge_results(
+    game_results: list[dict[str, Any]],
+    wall_time: float,
+) -> dict[str, Any]:
+    """Merge the per-game results of a tournament into one report.
+
+    Args:
+        game_results (`list[dict[str, Any]]`):
+            The results of all games, as returned by the workers.
+        wall_time (`float`):
+            The wall time of the whole tournament in seconds.
+
+    Returns:
+        `dict[str, Any]`:
+            The report with the number of games, the wins of each side, the
+            average rounds and duration, the throughput and the latency
+            statistics of each agent.
+    """
+    n_games = len(game_results)
+    wins: dict[str, int] = {}
+    latencies: dict[str, list[float]] = {}
+    for result in game_results:
+        winner = result["winner"] or "none"
+        wins[winner] = wins.get(winner, 0) + 1
+        for name, values in result["latencies"].items():
+            latencies.setdefault(name, []).extend(values)
+
+    agent_latency = {}
+    for name, values in sorted(latencies.items()):
+        if not values:
+            continue
+        values.sort()
+        agent_latency[name] = {
+            "calls": len(values),
+            "mean": statistics.fmean(values),
+            "p95": values[min(len(values) - 1, int(len(values) * 0.95))],
+            "max": values[-1],
+        }
+
+    return {
+        "games": n_games,
+        "wins": wins,
+        "avg_rounds": (
+            statistics.fmean(_["rounds"] for _ in game_results)
+            if game_results
+            else 0.0
+        ),
+        "avg_duration": (
+            statistics.fmean(_["duration"] for _ in game_results)
+            if game_results
+            else 0.0
+        ),
+        "wall_time": wall_time,
+        "games_per_second": n_games / wall_time if wall_time > 0 else 0.0,
+        "agent_latency": agent_latency,
+    }
+
+
+def run_tournament(
+    n_games: int,
+    agent_factory: AgentFactory,
+    n_workers: int | None = None,
+    n_players: int = 9,
+    checkpoint_dir: str = "./checkpoints/tournament",
+    seed: int | None = None,
+) -> dict[str, Any]:
+    """Run a tournament of headless games across a process pool.
+
+    Args:
+        n_games (`int`):
+            The total number of games.
+        agent_factory (`AgentFactory`):
+            A picklable callable that builds an agent from its name, e.g.
+            `functools.partial(PlayerAgent, headless=True)`.
+        n_workers (`int | None`, optional):
+            The number of worker processes, defaults to the CPU count.
+        n_players (`int`, defaults to `9`):
+            The number of players in each game.
+        checkpoint_dir (`str`, defaults to `"./checkpoints/tournament"`):
+            The root directory of the checkpoints. Worker `i` saves its
+            players' states under `{checkpoint_dir}/worker_{i}`.
+        seed (`int | None`, optional):
+            The base seed. If given, the `i`-th game of the tournament is
+            played with seed `seed + i`, whichever worker plays it.
+
+    Returns:
+        `dict[str, Any]`:
+            The merged report, see `merge_results`.
+    """
+    chunks = _split_games(n_games, n_workers or os.cpu_count() or 1)
+    seeds = [None if seed is None else seed + _ for _ in range(n_games)]
+    offsets = [sum(chunks[:_]) for _ in range(len(chunks))]
+
+    start_time = time.perf_counter()
+    game_results = []
+    # Use "spawn" so that the workers never inherit a running event loop
+    with ProcessPoolExecutor(
+        max_workers=len(chunks),
+        mp_context=multiprocessing.get_context("spawn"),
+    ) as executor:
+        futures = [
+            executor.submit(
+                _run_chunk,
+                worker_id,
+                n_chunk_games,
+                agent_factory,
+                n_players,
+                checkpoint_dir,
+                seeds[offset : offset + n_chunk_games],
+            )
+            for worker_id, (n_chunk_games, offset) in enumerate(
+                zip(chunks, offsets),
+            )
+        ]
+        for future in futures:
+            game_results.extend(future.result())
+
+    return merge_results(game_results, time.perf_counter() - start_time)
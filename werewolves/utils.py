@@ -1,11 +1,11 @@
 # -*- coding: utf-8 -*-
 """Utility functions for the werewolf game."""
 from collections import defaultdict
+from dataclasses import dataclass
 from typing import Any
 
-import numpy as np
-
 from werewolves.prompt import EnglishPrompts as Prompts
+from werewolves.sink import OutputSink
 
 from agentscope.message import Msg
 from agentscope.agent import ReActAgent, AgentBase
@@ -14,14 +14,36 @@ MAX_GAME_ROUND = 30
 MAX_DISCUSSION_ROUND = 3
 
 
-def majority_vote(votes: list[str]) -> tuple:
-    """Return the vote with the most counts."""
-    result = max(set(votes), key=votes.count)
-    names, counts = np.unique(votes, return_counts=True)
-    conditions = ", ".join(
-        [f"{name}: {count}" for name, count in zip(names, counts)],
+def _role_table(n_werewolves: int, n_villagers: int) -> tuple[str, ...]:
+    """The roles of a game with one seer, one witch and one hunter."""
+    return (
+        ("werewolf",) * n_werewolves
+        + ("villager",) * n_villagers
+        + ("seer", "witch", "hunter")
     )
-    return result, conditions
+
+
+ROLE_TABLES: dict[int, tuple[str, ...]] = {
+    6: _role_table(2, 1),
+    9: _role_table(3, 3),
+    12: _role_table(4, 5),
+    15: _role_table(5, 7),
+    18: _role_table(6, 9),
+}
+"""The roles of each supported number of players, with about one third of
+werewolves."""
+
+
+@dataclass
+class GameResult:
+    """The outcome of one werewolf game."""
+
+    winner: str | None
+    """The winning side, `"werewolves"` or `"villagers"`, or `None` if the
+    game reaches `MAX_GAME_ROUND` without a winner."""
+
+    rounds: int
+    """The number of rounds (night and day) played."""
 
 
 def names_to_str(agents: list[str] | list[ReActAgent]) -> str:
@@ -46,18 +68,50 @@ def names_to_str(agents: list[str] | list[ReActAgent]) -> str:
 class EchoAgent(AgentBase):
     """Echo agent that repeats the input message."""
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        verbose: bool = True,
+        sink: OutputSink | None = None,
+    ) -> None:
+        """Initialize the moderator.
+
+        Args:
+            verbose (`bool`, defaults to `True`):
+                Whether to print the moderator's messages to the console.
+                Set it to `False` for headless simulations.
+            sink (`OutputSink | None`, optional):
+                The sink that receives the moderator's messages instead of
+                the console.
+        """
         super().__init__()
         self.name = "Moderator"
+        self.sink = sink
+        self.set_console_output_enabled(verbose and sink is None)
 
-    async def reply(self, content: str) -> Msg:
-        """Repeat the input content with its name and role."""
+    async def reply(
+        self,
+        content: str,
+        metadata: dict[str, Any] | None = None,
+    ) -> Msg:
+        """Repeat the input content with its name and role.
+
+        Args:
+            content (`str`):
+                The content to announce.
+            metadata (`dict[str, Any] | None`, optional):
+                The structured data attached to the announcement, e.g. the
+                vote result.
+        """
         msg = Msg(
             self.name,
             content,
             role="assistant",
+            metadata=metadata,
         )
-        await self.print(msg)
+        if self.sink is not None:
+            self.sink.write(f"{self.name}: {content}")
+        else:
+            await self.print(msg)
         return msg
 
     async def handle_interrupt(
@@ -72,7 +126,17 @@ class EchoAgent(AgentBase):
 
 
 class Players:
-    """Maintain the players' status."""
+    """Maintain the players' status.
+
+    Each player is indexed by its seat, i.e. the order in which it was
+    added, and the alive players of each role are kept as bitsets over the
+    seats. Eliminating a player and counting the alive players of a role
+    are O(1), and the lists of alive players are only rebuilt when they
+    are read after a change.
+    """
+
+    roles = ("werewolf", "villager", "seer", "hunter", "witch")
+    """The supported roles."""
 
     def __init__(self) -> None:
         """Initialize the players."""
@@ -80,14 +144,18 @@ class Players:
         self.name_to_role = {}
         self.role_to_names = defaultdict(list)
         self.name_to_agent = {}
-        self.werewolves = []
-        self.villagers = []
-        self.seer = []
-        self.hunter = []
-        self.witch = []
-        self.current_alive = []
+        self.name_to_id = {}
         self.all_players = []
 
+        # Bit `i` is set if the player of seat `i` is alive
+        self.alive_mask = 0
+        self.role_masks = dict.fromkeys(self.roles, 0)
+        self.n_alive_by_role = dict.fromkeys(self.roles, 0)
+
+        # The lists built from the bitsets, dropped when a player dies
+        self._alive_cache: dict[str | None, list[ReActAgent]] = {}
+        self._true_roles: str | None = None
+
     def add_player(self, player: ReActAgent, role: str) -> None:
         """Add a player to the game.
 
@@ -97,70 +165,146 @@ class Players:
             role (`str`):
                 The role of the player.
         """
+        if role not in self.role_masks:
+            raise ValueError(f"Unknown role: {role}")
+
+        bit = 1 << len(self.all_players)
+        self.name_to_id[player.name] = len(self.all_players)
         self.name_to_role[player.name] = role
         self.name_to_agent[player.name] = player
         self.role_to_names[role].append(player.name)
         self.all_players.append(player)
-        if role == "werewolf":
-            self.werewolves.append(player)
-        elif role == "villager":
-            self.villagers.append(player)
-        elif role == "seer":
-            self.seer.append(player)
-        elif role == "hunter":
-            self.hunter.append(player)
-        elif role == "witch":
-            self.witch.append(player)
-        else:
-            raise ValueError(f"Unknown role: {role}")
-        self.current_alive.append(player)
 
-    def update_players(self, dead_players: list[ReActAgent]) -> None:
+        self.alive_mask |= bit
+        self.role_masks[role] |= bit
+        self.n_alive_by_role[role] += 1
+        self._alive_cache.clear()
+        self._true_roles = None
+
+    def update_players(self, dead_players: list[str]) -> None:
         """Update the current alive players.
 
         Args:
-            dead_players (`list[ReActAgent]`):
-                A list of dead players to be removed.
+            dead_players (`list[str]`):
+                The names of the dead players to be removed. Unknown and
+                already dead players are ignored.
         """
-        self.werewolves = [
-            _ for _ in self.werewolves if _.name not in dead_players
-        ]
-        self.villagers = [
-            _ for _ in self.villagers if _.name not in dead_players
-        ]
-        self.seer = [_ for _ in self.seer if _.name not in dead_players]
-        self.hunter = [_ for _ in self.hunter if _.name not in dead_players]
-        self.witch = [_ for _ in self.witch if _.name not in dead_players]
-        self.current_alive = [
-            _ for _ in self.current_alive if _.name not in dead_players
+        for name in dead_players:
+            idx = self.name_to_id.get(name)
+            if idx is None or not self.alive_mask >> idx & 1:
+                continue
+            self.alive_mask &= ~(1 << idx)
+            self.n_alive_by_role[self.name_to_role[name]] -= 1
+            self._alive_cache.clear()
+
+    def is_alive(self, name: str) -> bool:
+        """Whether the player with the given name is alive."""
+        idx = self.name_to_id.get(name)
+        return idx is not None and bool(self.alive_mask >> idx & 1)
+
+    @property
+    def n_alive(self) -> int:
+        """The number of alive players."""
+        return sum(self.n_alive_by_role.values())
+
+    def _alive(self, role: str | None = None) -> list[ReActAgent]:
+        """The alive players of the given role, or all the alive players if
+        `role` is `None`, in seat order."""
+        if role not in self._alive_cache:
+            mask = self.alive_mask
+            if role is not None:
+                mask &= self.role_masks[role]
+            self._alive_cache[role] = [
+                player
+                for idx, player in enumerate(self.all_players)
+                if mask >> idx & 1
+            ]
+        return self._alive_cache[role]
+
+    @property
+    def current_alive(self) -> list[ReActAgent]:
+        """The alive players."""
+        return self._alive()
+
+    @property
+    def werewolves(self) -> list[ReActAgent]:
+        """The alive werewolves."""
+        return self._alive("werewolf")
+
+    @property
+    def villagers(self) -> list[ReActAgent]:
+        """The alive villagers."""
+        return self._alive("villager")
+
+    @property
+    def seer(self) -> list[ReActAgent]:
+        """The alive seer, as a list."""
+        return self._alive("seer")
+
+    @property
+    def hunter(self) -> list[ReActAgent]:
+        """The alive hunter, as a list."""
+        return self._alive("hunter")
+
+    @property
+    def witch(self) -> list[ReActAgent]:
+        """The alive witch, as a list."""
+        return self._alive("witch")
+
+    def print_roles(self, sink: OutputSink | None = None) -> None:
+        """Print the roles of all players.
+
+        Args:
+            sink (`OutputSink | None`, optional):
+                The sink to write the roles to, defaults to the console.
+        """
+        lines = ["Roles:"] + [
+            f" - {name}: {role}" for name, role in self.name_to_role.items()
         ]
+        if sink is None:
+            print("\n".join(lines))
+        else:
+            for line in lines:
+                sink.write(line)
 
-    def print_roles(self) -> None:
-        """Print the roles of all players."""
-        print("Roles:")
-        for name, role in self.name_to_role.items():
-            print(f" - {name}: {role}")
+    def get_winner(self) -> str | None:
+        """Return the winning side, `"werewolves"` or `"villagers"`, or
+        `None` if the game goes on."""
+        n_werewolves = self.n_alive_by_role["werewolf"]
+        n_alive = self.n_alive
+        if n_werewolves * 2 >= n_alive:
+            return "werewolves"
+        if n_alive and not n_werewolves:
+            return "villagers"
+        return None
 
     def check_winning(self) -> str | None:
         """Check if the game is over and return the winning message."""
+        winner = self.get_winner()
+        if winner is None:
+            return None
 
-        # Prepare true roles string
-        true_roles = (
-            f'{names_to_str(self.role_to_names["werewolf"])} are werewolves, '
-            f'{names_to_str(self.role_to_names["villager"])} are villagers, '
-            f'{names_to_str(self.role_to_names["seer"])} is the seer, '
-            f'{names_to_str(self.role_to_names["hunter"])} is the hunter, '
-            f'and {names_to_str(self.role_to_names["witch"])} is the witch.'
-        )
+        # The roles never change during a game, so the true roles string
+        # is built only once
+        if self._true_roles is None:
+            self._true_roles = (
+                f'{names_to_str(self.role_to_names["werewolf"])} are '
+                "werewolves, "
+                f'{names_to_str(self.role_to_names["villager"])} are '
+                "villagers, "
+                f'{names_to_str(self.role_to_names["seer"])} is the seer, '
+                f'{names_to_str(self.role_to_names["hunter"])} is the '
+                "hunter, "
+                f'and {names_to_str(self.role_to_names["witch"])} is the '
+                "witch."
+            )
 
-        if len(self.werewolves) * 2 >= len(self.current_alive):
+        if winner == "werewolves":
             return Prompts.to_all_wolf_win.format(
-                n_alive=len(self.current_alive),
-                n_werewolves=len(self.werewolves),
-                true_roles=true_roles,
+                n_alive=self.n_alive,
+                n_werewolves=self.n_alive_by_role["werewolf"],
+                true_roles=self._true_roles,
             )
-        if self.current_alive and not self.werewolves:
-            return Prompts.to_all_village_win.format(
-                true_roles=true_roles,
-            )
-        return None
+        return Prompts.to_all_village_win.format(
+            true_roles=self._true_roles,
+        )
@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+"""The vote engine of the werewolf game, shared by the werewolves' night
+vote and the day vote."""
+import random
+from collections import Counter
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any
+
+
+class TiePolicy(str, Enum):
+    """How a tie for the most votes is resolved."""
+
+    NO_ELIMINATION = "no_elimination"
+    """Nobody is eliminated."""
+
+    REVOTE = "revote"
+    """The voters vote again among the tied players. The engine only
+    reports the tie, the revote is run by the game."""
+
+    RANDOM = "random"
+    """One of the tied players is drawn with the given random generator."""
+
+
+@dataclass
+class VoteResult:
+    """The result of one vote."""
+
+    votes: dict[str, str]
+    """The mapping from voter to target. Abstentions are left out."""
+
+    counts: Counter = field(default_factory=Counter)
+    """The number of votes of each target, in the order of their first
+    vote."""
+
+    winner: str | None = None
+    """The eliminated player, or `None` if nobody is eliminated."""
+
+    tied: list[str] = field(default_factory=list)
+    """The players tied for the most votes, empty if there is no tie."""
+
+    @property
+    def is_tie(self) -> bool:
+        """Whether several players are tied for the most votes."""
+        return len(self.tied) > 1
+
+    @property
+    def voters(self) -> list[str]:
+        """The rows of the vote matrix."""
+        return list(self.votes)
+
+    @property
+    def targets(self) -> list[str]:
+        """The columns of the vote matrix."""
+        return list(self.counts)
+
+    @property
+    def matrix(self) -> list[list[int]]:
+        """The voter x target matrix, where `matrix[i][j]` is 1 if
+        `voters[i]` voted for `targets[j]` and 0 otherwise."""
+        columns = {target: idx for idx, target in enumerate(self.counts)}
+        matrix = []
+        for target in self.votes.values():
+            row = [0] * len(columns)
+            row[columns[target]] = 1
+            matrix.append(row)
+        return matrix
+
+    def conditions(self) -> str:
+        """The vote counts as a string, e.g. `"Player1: 2, Player3: 1"`."""
+        return ", ".join(
+            f"{name}: {count}" for name, count in sorted(self.counts.items())
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        """The JSON-serializable form of the result, attached to the
+        moderator's announcement so that the agents can record the votes."""
+        return {
+            "voters": self.voters,
+            "targets": self.targets,
+            "matrix": self.matrix,
+            "winner": self.winner,
+            "tied": self.tied,
+        }
+
+
+def tally_votes(
+    votes: dict[str, str | None],
+    tie_policy: TiePolicy = TiePolicy.RANDOM,
+    rng: random.Random | None = None,
+) -> VoteResult:
+    """Tally the votes in a single pass.
+
+    Args:
+        votes (`dict[str, str | None]`):
+            The mapping from voter to target. A `None` target is an
+            abstention.
+        tie_policy (`TiePolicy`, defaults to `TiePolicy.RANDOM`):
+            How a tie for the most votes is resolved.
+        rng (`random.Random | None`, optional):
+            The random generator used by `TiePolicy.RANDOM`. Pass the
+            game's generator to make the draw reproducible.
+
+    Returns:
+        `VoteResult`:
+            The tally, the eliminated player and the tied players.
+    """
+    valid_votes: dict[str, str] = {}
+    counts: Counter = Counter()
+    leaders: list[str] = []
+    best = 0
+    for voter, target in votes.items():
+        if target is None:
+            continue
+        valid_votes[voter] = target
+        counts[target] += 1
+        if counts[target] > best:
+            best = counts[target]
+            leaders = [target]
+        elif counts[target] == best:
+            leaders.append(target)
+
+    result = VoteResult(votes=valid_votes, counts=counts)
+    if len(leaders) == 1:
+        result.winner = leaders[0]
+    elif leaders:
+        result.tied = leaders
+        if tie_policy == TiePolicy.RANDOM:
+            result.winner = (rng or random).choice(leaders)
+    return result